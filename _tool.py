@@ -2,31 +2,82 @@ import copy
 import dataclasses
 import logging
 import enum
+import functools
 import inspect
+import os
+import re
+import time
 import types
 import typing
 from typing import (
     Any,
+    Callable,
     Dict,
+    Iterable,
+    Iterator,
     List,
+    Set,
     Tuple,
     Optional,
     get_args,
     get_origin,
-    get_type_hints,
 )
 
-import yaml
+from utils import DEFAULT_KEY_CASE, get_key_converter, word_key
+from gen_types import GeneratorConfig, ServiceFragment
+from compact import CompactResult, compact_document
+from dedup import DedupResult, deduplicate_schemas
+from discovery import EndpointDiscovery
+from registry import EndpointRegistry
+from fragment_cache import FragmentCache
+from stats import BuildStats, EndpointCost
+from output_sink import AtomicFileSink
+from schema_cache import ResolvedSchema, SchemaResolverCache, clone_schema, schema_cache
+from typeinfo import type_hints
 
-from utils import deep_change_keys_by_format, snake_case_to_camel_case
-from gen_types import GeneratorConfig
+
+def _timed_call(func: Callable, *args) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
 
 
 class SearchEndpointDeclaration(enum.Enum):
     OneEndpointConfig = "OneEndpointConfig"
+    EndpointConfigList = "EndpointConfigList"
+    PackageScan = "PackageScan"
+    DirectoryScan = "DirectoryScan"
+    Registry = "Registry"
+
+
+class OutputFormat(enum.Enum):
+    Yaml = "yaml"
+    Json = "json"
+    JsonPretty = "json-pretty"
+
+
+OUTPUT_EXTENSIONS = {
+    OutputFormat.Yaml: ".yaml",
+    OutputFormat.Json: ".json",
+    OutputFormat.JsonPretty: ".json",
+}
+
+
+_PATH_TEMPLATE_PARAMETER = re.compile(r"\{([^}/+]+)\+?\}")
+
+
+def path_template_names(httpPath: str) -> Dict[str, str]:
+    """Parameter names of ``httpPath`` by their word_key."""
+    return {
+        word_key(name): name for name in _PATH_TEMPLATE_PARAMETER.findall(httpPath)
+    }
 
 
 class OpenApiGenerator:
+    # Shared by every generator in the process so that dataclasses reused
+    # across endpoints are only reflected once per run.
+    resolver_cache: SchemaResolverCache = schema_cache
+
     def __init__(
         self,
         openapi_version: str = "3.1.0",
@@ -34,6 +85,25 @@ class OpenApiGenerator:
         output_openapi_file: str = "output_openapi.yaml",
         to_camel_case_schemas: bool = True,
         endpoint_config: GeneratorConfig | None = None,
+        endpoint_configs: List[GeneratorConfig] | None = None,
+        endpoint_registry: EndpointRegistry | None = None,
+        scan_package: str | None = None,
+        scan_directory: str | None = None,
+        scan_workers: int = 8,
+        scan_exclude: List[str] | None = None,
+        discovery_index_file: str | None = None,
+        fragment_cache_file: str | None = None,
+        stream_output: bool = False,
+        dedup_schemas: bool = False,
+        split_output: bool = False,
+        split_workers: int = 8,
+        skip_unchanged_writes: bool = False,
+        compact_output: bool = False,
+        precompress: Dict[str, int] | List[str] | None = None,
+        output_format: OutputFormat | List[OutputFormat] = OutputFormat.Yaml,
+        schema_key_case: str = DEFAULT_KEY_CASE,
+        collect_stats: bool = False,
+        stats_file: str | None = None,
     ):
         if search_endpoint_declaration not in SearchEndpointDeclaration:
             raise ValueError(
@@ -50,6 +120,49 @@ class OpenApiGenerator:
                 )
             self.endpoint_config = [endpoint_config]
 
+        elif (
+            search_endpoint_declaration
+            == SearchEndpointDeclaration.EndpointConfigList
+        ):
+            if not endpoint_configs:
+                raise ValueError(
+                    "endpoint_configs is required when using EndpointConfigList search endpoint declaration."
+                )
+            self.endpoint_config = list(endpoint_configs)
+
+        elif search_endpoint_declaration == SearchEndpointDeclaration.PackageScan:
+            if not scan_package:
+                raise ValueError(
+                    "scan_package is required when using PackageScan search endpoint declaration."
+                )
+            self.endpoint_config = None
+
+        elif search_endpoint_declaration == SearchEndpointDeclaration.DirectoryScan:
+            if not scan_directory:
+                raise ValueError(
+                    "scan_directory is required when using DirectoryScan search endpoint declaration."
+                )
+            self.endpoint_config = None
+
+        elif search_endpoint_declaration == SearchEndpointDeclaration.Registry:
+            if endpoint_registry is None:
+                raise ValueError(
+                    "endpoint_registry is required when using Registry search "
+                    "endpoint declaration."
+                )
+            self.endpoint_config = None
+
+        self.endpoint_registry = endpoint_registry
+        self.scan_package = scan_package
+        self.scan_directory = scan_directory
+        self.scan_workers = scan_workers
+        self.scan_exclude = scan_exclude or []
+        self.discovery_index_file = discovery_index_file
+
+        self.fragment_cache = (
+            FragmentCache(fragment_cache_file) if fragment_cache_file else None
+        )
+
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
 
@@ -57,6 +170,50 @@ class OpenApiGenerator:
         self.openapi_build = None
 
         self.to_camel_case_schemas = to_camel_case_schemas
+        # Naming convention applied to property and component names when
+        # to_camel_case_schemas is on; see utils.KEY_CASE_CONVERSIONS.
+        self.schema_key_case = schema_key_case
+        self.key_converter = get_key_converter(schema_key_case)
+        self.stream_output = stream_output
+        self.dedup_schemas = dedup_schemas
+        # Write a root document plus per-domain path and per-schema files
+        # next to it instead of one file; see split.py.
+        self.split_output = split_output
+        self.split_workers = split_workers
+        # Every output file is written through a temporary file and renamed;
+        # with skip_unchanged_writes, unchanged files are not replaced at all.
+        # precompress ({"gz": 9, "xz": 6} or ["gz"] for default levels) also
+        # writes compressed siblings of every file in the same pass.
+        self.output_sink = AtomicFileSink(
+            skip_unchanged=skip_unchanged_writes, compress=precompress
+        )
+        self.dedup_result: DedupResult | None = None
+        # Prune empty mappings, share repeated responses and parameters and
+        # write YAML in flow style; see compact.py.
+        self.compact_output = compact_output
+        self.compact_result: CompactResult | None = None
+
+        self.output_formats: List[OutputFormat] = []
+        for fmt in (
+            output_format
+            if isinstance(output_format, (list, tuple))
+            else [output_format]
+        ):
+            # Values such as "yaml" are accepted too, and normalized here so
+            # the writers can compare against the members.
+            try:
+                self.output_formats.append(OutputFormat(fmt))
+            except ValueError:
+                raise ValueError(
+                    f"Invalid output format: {fmt!r}; expected one of "
+                    f"{', '.join(f.value for f in OutputFormat)}."
+                ) from None
+        self.output_files = self.build_output_files()
+
+        # BuildStats of the last generate() call, or None when disabled.
+        self.collect_stats = collect_stats or bool(stats_file)
+        self.stats_file = stats_file
+        self.stats: BuildStats | None = None
 
     @staticmethod
     def is_optional(tp: Any) -> bool:
@@ -68,74 +225,168 @@ class OpenApiGenerator:
 
     @staticmethod
     def type_to_schema(
-        _target_type: Any, known_defs: Dict[str, Any]
+        _target_type: Any,
+        known_defs: Dict[str, Any],
+        key_format: Optional[Callable[[str], str]] = None,
     ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
 
+        resolved = OpenApiGenerator.resolve_type(_target_type)
+        OpenApiGenerator.ensure_definitions(
+            resolved.dependencies, known_defs, key_format
+        )
+        return clone_schema(resolved.schema, key_format), known_defs
+
+    @staticmethod
+    def resolve_type(_target_type: Any) -> ResolvedSchema:
+        cached = OpenApiGenerator.resolver_cache.get_type(_target_type)
+        if cached is not None:
+            return cached
+
+        resolved = OpenApiGenerator._reflect_type(_target_type)
+        OpenApiGenerator.resolver_cache.put_type(_target_type, resolved)
+        return resolved
+
+    @staticmethod
+    def _reflect_type(_target_type: Any) -> ResolvedSchema:
+
         if get_origin(_target_type) in (typing.Union, types.UnionType):
             args = [a for a in get_args(_target_type) if a is not type(None)]
 
             if len(args) == 1:
-                return OpenApiGenerator.type_to_schema(args[0], known_defs)
-            return {
-                "oneOf": [
-                    OpenApiGenerator.type_to_schema(a, known_defs)[0] for a in args
-                ]
-            }, known_defs
+                return OpenApiGenerator.resolve_type(args[0])
+            variants = [OpenApiGenerator.resolve_type(a) for a in args]
+            return ResolvedSchema(
+                {"oneOf": [v.schema for v in variants]},
+                tuple(d for v in variants for d in v.dependencies),
+            )
 
         if get_origin(_target_type) in (list, typing.List):
             item_type = get_args(_target_type)[0]
-            items_schema, defs = OpenApiGenerator.type_to_schema(item_type, known_defs)
-            return {"type": "array", "items": items_schema}, defs
+            items = OpenApiGenerator.resolve_type(item_type)
+            return ResolvedSchema(
+                {"type": "array", "items": items.schema}, items.dependencies
+            )
+
+        if _target_type is dict or get_origin(_target_type) in (dict, typing.Dict):
+            # Responses carry mappings as JSON objects (see serializers.py).
+            args = get_args(_target_type)
+            if len(args) == 2 and args[1] is not Any:
+                values = OpenApiGenerator.resolve_type(args[1])
+                return ResolvedSchema(
+                    {"type": "object", "additionalProperties": values.schema},
+                    values.dependencies,
+                )
+            return ResolvedSchema({"type": "object"})
 
         if inspect.isclass(_target_type) and issubclass(_target_type, enum.Enum):
-            return {
-                "type": "string",
-                "enum": [e.value for e in _target_type],
-            }, known_defs
+            return ResolvedSchema(
+                {"type": "string", "enum": [e.value for e in _target_type]}
+            )
 
         if dataclasses.is_dataclass(_target_type):
 
             name = getattr(_target_type, "__name__", type(_target_type).__name__)
-            if name not in known_defs:
-                schema, _ = OpenApiGenerator.dataclass_to_openapi_schema(
-                    _target_type, known_defs
-                )
-                known_defs[name] = schema
-            return {"$ref": f"#/components/schemas/{name}"}, known_defs
+            return ResolvedSchema(
+                {"$ref": f"#/components/schemas/{name}"}, (_target_type,)
+            )
 
         if _target_type is str:
-            return {"type": "string"}, known_defs
+            return ResolvedSchema({"type": "string"})
         if _target_type is int:
-            return {"type": "integer"}, known_defs
+            return ResolvedSchema({"type": "integer"})
         if _target_type is float:
-            return {"type": "number"}, known_defs
+            return ResolvedSchema({"type": "number"})
         if _target_type is bool:
-            return {"type": "boolean"}, known_defs
+            return ResolvedSchema({"type": "boolean"})
 
-        return {"type": "string"}, known_defs
+        return ResolvedSchema({"type": "string"})
 
     @staticmethod
-    def dataclass_to_openapi_schema(
-        cls: Any, root_types: Optional[Dict[str, Any]] = None
-    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
-        if root_types is None:
-            root_types = {}
+    def resolve_definition(cls: Any) -> ResolvedSchema:
+        cached = OpenApiGenerator.resolver_cache.get_definition(cls)
+        if cached is not None:
+            return cached
+
         props = {}
         required = []
-        for field in dataclasses.fields(cls):
+        dependencies = []
+        for field, field_type in type_hints.field_types(cls):
             if field.name.startswith("_"):
                 continue
-            field_type = field.type
-            prop_schema, defs = OpenApiGenerator.type_to_schema(field_type, root_types)
-            props[field.name] = prop_schema
+            resolved = OpenApiGenerator.resolve_type(field_type)
+            props[field.name] = resolved.schema
+            dependencies.extend(resolved.dependencies)
             if not OpenApiGenerator.is_optional(field_type):
                 required.append(field.name)
-            root_types.update(defs)
 
         schema = {"type": "object", "properties": props}
         if required:
             schema["required"] = required
 
+        resolved = ResolvedSchema(schema, tuple(dependencies))
+        OpenApiGenerator.resolver_cache.put_definition(cls, resolved)
+        return resolved
+
+    @staticmethod
+    def ensure_definition(
+        cls: Any,
+        known_defs: Dict[str, Any],
+        key_format: Optional[Callable[[str], str]] = None,
+    ) -> None:
+        OpenApiGenerator.ensure_definitions((cls,), known_defs, key_format)
+
+    @staticmethod
+    def ensure_definitions(
+        classes: Iterable[Any],
+        known_defs: Dict[str, Any],
+        key_format: Optional[Callable[[str], str]] = None,
+        pending: Optional[Set[str]] = None,
+    ) -> None:
+        """Define ``classes`` and every dataclass they reference.
+
+        The graph is walked depth-first with an explicit stack, and each
+        definition is inserted after the ones it references. A class is
+        pending, a placeholder for its ``$ref``, from the moment it is reached
+        until it is defined; references back to a pending class end there, so
+        every class and field is visited once whatever the depth or the number
+        of cycles.
+        """
+        pending = set() if pending is None else pending
+        stack: List[Tuple[Any, Iterator[Any]]] = [(None, iter(classes))]
+        while stack:
+            current, dependencies = stack[-1]
+            for dependency in dependencies:
+                name = getattr(dependency, "__name__", type(dependency).__name__)
+                if name in known_defs or name in pending:
+                    continue
+                pending.add(name)
+                resolved = OpenApiGenerator.resolve_definition(dependency)
+                stack.append((dependency, iter(resolved.dependencies)))
+                break
+            else:
+                stack.pop()
+                if current is None:
+                    continue
+                name = getattr(current, "__name__", type(current).__name__)
+                resolved = OpenApiGenerator.resolve_definition(current)
+                known_defs[name] = clone_schema(resolved.schema, key_format)
+                pending.discard(name)
+
+    @staticmethod
+    def dataclass_to_openapi_schema(
+        cls: Any,
+        root_types: Optional[Dict[str, Any]] = None,
+        key_format: Optional[Callable[[str], str]] = None,
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        if root_types is None:
+            root_types = {}
+        resolved = OpenApiGenerator.resolve_definition(cls)
+        # The root is defined last, so references back to it stay refs.
+        OpenApiGenerator.ensure_definitions(
+            resolved.dependencies, root_types, key_format, pending={cls.__name__}
+        )
+
+        schema = clone_schema(resolved.schema, key_format)
         root_types[cls.__name__] = schema
         return schema, root_types
 
@@ -161,7 +412,9 @@ class OpenApiGenerator:
     def getSchemas(self) -> Dict[str, Any]:
         return self.openapi_build.get("components", {}).get("schemas", {})
 
-    def setSchemas(self, schemas: Dict[str, Any]) -> None:
+    def setSchemas(self, schemas: Dict[str, Any], cased: bool = False) -> None:
+        if self.stats is not None:
+            start = time.perf_counter()
         if "components" not in self.openapi_build:
             self.openapi_build["components"] = {}
         if (
@@ -170,13 +423,19 @@ class OpenApiGenerator:
         ):
             self.openapi_build["components"]["schemas"] = {}
 
-        if self.to_camel_case_schemas:
-            schemas = deep_change_keys_by_format(schemas, snake_case_to_camel_case)
+        if self.to_camel_case_schemas and not cased:
+            schemas = {
+                name: clone_schema(schema, self.key_converter)
+                for name, schema in schemas.items()
+            }
             self.openapi_build["components"]["schemas"].update(schemas)
 
         else:
             self.openapi_build["components"]["schemas"].update(schemas)
 
+        if self.stats is not None:
+            self.stats.add_time("set_schemas", time.perf_counter() - start)
+
     def addPath(self, newPath):
         if newPath not in self.getPaths():
             self.getPaths()[newPath] = {}
@@ -184,206 +443,540 @@ class OpenApiGenerator:
     def getPath(self, path):
         return self.getPaths()[path]
 
-    def process_services(self, services_info: List[GeneratorConfig]) -> None:
-        for service in services_info:
+    @staticmethod
+    def build_service_fragment(
+        service: GeneratorConfig, key_format: Optional[Callable[[str], str]] = None
+    ) -> ServiceFragment:
+        service_name = service.serviceName
+
+        httpPath = (
+            service.httpPath
+            if service.httpPath.startswith("/")
+            else f"/{service.httpPath}"
+        )
 
-            service_name = service.serviceName
+        inputSchema = service.serviceInput
 
-            httpPath = (
-                service.httpPath
-                if service.httpPath.startswith("/")
-                else f"/{service.httpPath}"
-            )
-            httpMethod = service.httpMethod.lower()
+        if not inputSchema:
+            raise ValueError(f"Input schema not found for service {service_name}")
 
-            self.addPath(httpPath)
+        outputSchema = service.serviceOutput
 
-            targetPath = self.getPath(httpPath)
+        if not outputSchema:
+            raise ValueError(f"Output schema not found for service {service_name}")
 
-            targetPath[httpMethod] = {
-                "operationId": service.operationId,
-                "summary": service.description,
-                "responses": {},
-            }
+        # Property names are cased while the schemas are cloned out of the
+        # resolver cache, so every node is cased once and setSchemas does not
+        # need to walk the defs again. Component names stay the class names
+        # every $ref points at.
+        _, inputDefs = OpenApiGenerator.dataclass_to_openapi_schema(
+            inputSchema, key_format=key_format
+        )
+        _, outputDefs = OpenApiGenerator.dataclass_to_openapi_schema(
+            outputSchema, key_format=key_format
+        )
+        # The request's own fields (queryStringParameters, pathParameters,
+        # bodyInput, domainName) are what merge_service_fragment looks up;
+        # they are structure, not published property names.
+        inputProperties = {
+            name: clone_schema(prop, key_format)
+            for name, prop in OpenApiGenerator.resolve_definition(inputSchema)
+            .schema["properties"]
+            .items()
+        }
 
-            httpMethodInfo = targetPath[httpMethod]
-            inputSchema = service.serviceInput
+        inspectBody = type_hints.hints(outputSchema).get("bodyOutput")
+        inspectContent = [
+            field
+            for field in dataclasses.fields(inspectBody)
+            if field.name == "_contentType"
+        ][0].default
+
+        return ServiceFragment(
+            serviceName=service_name,
+            operationId=service.operationId,
+            summary=service.description,
+            httpPath=httpPath,
+            httpMethod=service.httpMethod.lower(),
+            domainName=getattr(inputSchema, "domainName", "_").capitalize(),
+            inputName=inputSchema.__name__,
+            inputProperties=inputProperties,
+            inputDefs=inputDefs,
+            hasBodyInput=bool(inputSchema.bodyInput),
+            outputName=outputSchema.__name__,
+            outputIsDataclass=dataclasses.is_dataclass(outputSchema),
+            outputDefs=outputDefs,
+            bodyOutputName=inspectBody.__name__,
+            bodyContentType=inspectContent,
+        )
 
-            if not inputSchema:
-                raise ValueError(f"Input schema not found for service {service_name}")
+    @staticmethod
+    def build_service_fragments(
+        services_info: List[GeneratorConfig],
+        jobs: int | None = 1,
+        key_format: Optional[Callable[[str], str]] = None,
+        timings: List[float] | None = None,
+    ) -> List[ServiceFragment]:
+        build = functools.partial(
+            OpenApiGenerator.build_service_fragment, key_format=key_format
+        )
+        if timings is not None:
+            build = functools.partial(_timed_call, build)
+        if jobs is None:
+            jobs = os.cpu_count() or 1
+        if jobs <= 1 or len(services_info) <= 1:
+            results = [build(service) for service in services_info]
+        else:
+            workers = min(jobs, len(services_info))
+            chunksize = max(1, len(services_info) // (workers * 4))
+            # Imported here: multiprocessing is slow to import and most builds
+            # run serially.
+            from concurrent.futures import ProcessPoolExecutor
 
-            domainName = getattr(inputSchema, "domainName", "_").capitalize()
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(build, services_info, chunksize=chunksize))
 
-            outputSchema = service.serviceOutput
+        if timings is None:
+            return results
+        timings.extend(seconds for _, seconds in results)
+        return [fragment for fragment, _ in results]
 
-            if not outputSchema:
-                raise ValueError(f"Output schema not found for service {service_name}")
+    def merge_service_fragment(self, fragment: ServiceFragment) -> None:
+        httpPath = fragment.httpPath
+        httpMethod = fragment.httpMethod
 
-            _schema, defs = OpenApiGenerator.dataclass_to_openapi_schema(inputSchema)
-            print(_schema["properties"])
-            self.setSchemas(_schema["properties"])
-            if "domainName" in self.getSchemas():
-                self.getSchemas().pop("domainName")
+        self.addPath(httpPath)
 
-            if "pathPatameters" in self.getSchemas():
-                if "$ref" in self.getSchemas()["pathPatameters"]:
-                    self.getSchemas().pop("pathPatameters")
+        targetPath = self.getPath(httpPath)
 
-            if "queryStringParameters" in self.getSchemas():
-                if "$ref" in self.getSchemas()["queryStringParameters"]:
-                    self.getSchemas().pop("queryStringParameters")
+        targetPath[httpMethod] = {
+            "operationId": fragment.operationId,
+            "summary": fragment.summary,
+            "responses": {},
+        }
+
+        httpMethodInfo = targetPath[httpMethod]
 
-            self.setSchemas(defs)
+        domainName = fragment.domainName
 
-            _schema, defs = OpenApiGenerator.dataclass_to_openapi_schema(outputSchema)
+        self.logger.debug(fragment.inputProperties)
+        self.setSchemas(fragment.inputProperties, cased=True)
+        if "domainName" in self.getSchemas():
+            self.getSchemas().pop("domainName")
 
-            self.setSchemas(defs)
+        if "pathPatameters" in self.getSchemas():
+            if "$ref" in self.getSchemas()["pathPatameters"]:
+                self.getSchemas().pop("pathPatameters")
 
-            httpMethodInfo["parameters"] = []
-            parameters = {}
-            queryParamsTarget = (
-                "queryStringParameters"
-                if "queryStringParameters" in self.getSchemas()
-                and not "$ref" in self.getSchemas()["queryStringParameters"]
-                else "QueryStringParameters"
+        if "queryStringParameters" in self.getSchemas():
+            if "$ref" in self.getSchemas()["queryStringParameters"]:
+                self.getSchemas().pop("queryStringParameters")
+
+        self.setSchemas(fragment.inputDefs, cased=True)
+
+        # Of this first copy only the body schema survives (it is renamed
+        # below); it must not be the object set again later, or the YAML
+        # output would alias the two.
+        outputDefs = dict(fragment.outputDefs)
+        if fragment.bodyOutputName in outputDefs:
+            outputDefs[fragment.bodyOutputName] = clone_schema(
+                outputDefs[fragment.bodyOutputName]
+            )
+        self.setSchemas(outputDefs, cased=True)
+
+        httpMethodInfo["parameters"] = []
+        parameters = {}
+        queryParamsTarget = (
+            "queryStringParameters"
+            if "queryStringParameters" in self.getSchemas()
+            and not "$ref" in self.getSchemas()["queryStringParameters"]
+            else "QueryStringParameters"
+        )
+        if queryParamsTarget in self.getSchemas():
+            queryParametersKey = f"{domainName}QueryStringParameters"
+            self.getSchemas()[queryParametersKey] = self.getSchemas().pop(
+                queryParamsTarget
             )
-            if queryParamsTarget in self.getSchemas():
-                queryParametersKey = f"{domainName}QueryStringParameters"
-                self.getSchemas()[queryParametersKey] = self.getSchemas().pop(
-                    queryParamsTarget
-                )
 
-                parameters[queryParametersKey] = {
-                    "name": queryParametersKey,
-                    "in": "query",
-                    "required": False,
-                    "schema": {"$ref": f"#/components/schemas/{queryParametersKey}"},
-                }
+            parameters[queryParametersKey] = {
+                "name": queryParametersKey,
+                "in": "query",
+                "required": False,
+                "schema": {"$ref": f"#/components/schemas/{queryParametersKey}"},
+            }
+
+            httpMethodInfo["parameters"].append(
+                {"$ref": f"#/components/parameters/{queryParametersKey}"}
+            )
+
+            if "queryStringParameters" in self.getSchemas():
+                self.getSchemas().pop("queryStringParameters")
+                pass
+
+        pathParamTarget = (
+            "pathParameters"
+            if "pathParameters" in self.getSchemas()
+            and not "$ref" in self.getSchemas()["pathParameters"]
+            else "PathParameters"
+        )
+        pathParametersKey = None
+        if pathParamTarget in self.getSchemas():
+            pathParametersKey = f"{domainName}PathParameters"
+            self.getSchemas()[pathParametersKey] = self.getSchemas().pop(
+                pathParamTarget
+            )
 
+            _properties = self.getSchemas()[pathParametersKey]["properties"]
+
+            templateNames = path_template_names(httpPath)
+            for key, value in _properties.items():
+                self.getSchemas()[f"{pathParametersKey}{key}"] = copy.deepcopy(value)
+                parameters[f"{pathParametersKey}{key}"] = {
+                    # Named as in the path template, whatever the key case.
+                    "name": templateNames.get(word_key(key), key),
+                    "in": "path",
+                    "required": True,
+                    "schema": {
+                        "$ref": f"#/components/schemas/{f'{pathParametersKey}{key}'}"
+                    },
+                }
                 httpMethodInfo["parameters"].append(
-                    {"$ref": f"#/components/parameters/{queryParametersKey}"}
+                    {"$ref": f"#/components/parameters/{f'{pathParametersKey}{key}'}"}
                 )
+            if "pathParameters" in self.getSchemas():
+                self.getSchemas().pop("pathParameters")
 
-                if "queryStringParameters" in self.getSchemas():
-                    self.getSchemas().pop("queryStringParameters")
-                    pass
+            self.getSchemas().pop(pathParametersKey)
 
-            pathParamTarget = (
-                "pathParameters"
-                if "pathParameters" in self.getSchemas()
-                and not "$ref" in self.getSchemas()["pathParameters"]
-                else "PathParameters"
-            )
-            pathParametersKey = None
-            if pathParamTarget in self.getSchemas():
-                pathParametersKey = f"{domainName}PathParameters"
-                self.getSchemas()[pathParametersKey] = self.getSchemas().pop(
-                    pathParamTarget
-                )
+        bodyInputKey = None
+        bodyInputTarget = (
+            "bodyInput"
+            if "bodyInput" in self.getSchemas()
+            and not "$ref" in self.getSchemas()["bodyInput"]
+            else "BodyInput"
+        )
+        if bodyInputTarget in self.getSchemas():
+            bodyInputKey = f"{domainName}BodyInput"
+            self.getSchemas()[bodyInputKey] = self.getSchemas().pop(bodyInputTarget)
+            if "bodyInput" in self.getSchemas():
+                self.getSchemas().pop("bodyInput")
 
-                _properties = self.getSchemas()[pathParametersKey]["properties"]
+        if fragment.inputName in self.getSchemas():
 
-                for key, value in _properties.items():
-                    self.getSchemas()[f"{pathParametersKey}{key}"] = copy.deepcopy(
-                        value
-                    )
-                    parameters[f"{pathParametersKey}{key}"] = {
-                        "name": f"{key}",
-                        "in": "path",
-                        "required": True,
-                        "schema": {
-                            "$ref": f"#/components/schemas/{f'{pathParametersKey}{key}'}"
-                        },
-                    }
-                    httpMethodInfo["parameters"].append(
-                        {
-                            "$ref": f"#/components/parameters/{f'{pathParametersKey}{key}'}"
-                        }
-                    )
-                if "pathParameters" in self.getSchemas():
-                    self.getSchemas().pop("pathParameters")
+            self.getSchemas().pop(fragment.inputName)
 
-                self.getSchemas().pop(pathParametersKey)
+        if fragment.hasBodyInput:
+            if bodyInputKey is None:
+                raise ValueError(
+                    f"Body input schema not found for service {fragment.serviceName}"
+                )
 
-            bodyInputTarget = (
-                "bodyInput"
-                if "bodyInput" in self.getSchemas()
-                and not "$ref" in self.getSchemas()["bodyInput"]
-                else "BodyInput"
-            )
-            if bodyInputTarget in self.getSchemas():
-                bodyInputKey = f"{domainName}BodyInput"
-                self.getSchemas()[bodyInputKey] = self.getSchemas().pop(bodyInputTarget)
-                if "bodyInput" in self.getSchemas():
-                    self.getSchemas().pop("bodyInput")
+            request_body = {
+                "description": "Request body",
+                "content": {
+                    "application/json": {
+                        "schema": {"$ref": f"#/components/schemas/{bodyInputKey}"}
+                    }
+                },
+            }
+            httpMethodInfo["requestBody"] = request_body
 
-            if service.serviceInput.__name__ in self.getSchemas():
+        self.getComponents()["parameters"] |= parameters
 
-                self.getSchemas().pop(service.serviceInput.__name__)
+        httpMethodInfo["responses"] = {}
+        _name = fragment.outputName
 
-            if service.serviceInput.bodyInput:
+        httpMethodInfo["responses"][_name] = {}
 
-                request_body = {
-                    "description": "Request body",
-                    "content": {
-                        "application/json": {
-                            "schema": {"$ref": f"#/components/schemas/{bodyInputKey}"}
-                        }
-                    },
-                }
-                httpMethodInfo["requestBody"] = request_body
+        if fragment.outputIsDataclass:
+            self.setSchemas(fragment.outputDefs, cased=True)
 
-            self.getComponents()["parameters"] |= parameters
+        self.getSchemas().pop(_name)
 
-            if service.serviceOutput:
-                httpMethodInfo["responses"] = {}
-                _name = service.serviceOutput.__name__
+        bodyOutputName = fragment.bodyOutputName
+        self.getSchemas()[f"{domainName}{bodyOutputName}"] = self.getSchemas().pop(
+            bodyOutputName
+        )
 
-                httpMethodInfo["responses"][_name] = {}
+        httpMethodInfo["responses"] = {}
+        httpMethodInfo["responses"][200] = {}
+        httpMethodInfo["responses"][200]["content"] = {}
+        httpMethodInfo["responses"][200]["description"] = "Success"
+        _content = httpMethodInfo["responses"][200]["content"]
+        _content[fragment.bodyContentType] = {
+            "schema": {"$ref": f"#/components/schemas/{domainName}{bodyOutputName}"}
+        }
 
-                if dataclasses.is_dataclass(service.serviceOutput):
-                    _, defs = OpenApiGenerator.dataclass_to_openapi_schema(
-                        service.serviceOutput
+    def process_services(
+        self, services_info: List[GeneratorConfig], jobs: int | None = 1
+    ) -> None:
+        # Reflection is the expensive part and is independent per service, so
+        # it can run on a process pool. Merging mutates the shared build and is
+        # replayed serially in declaration order, which keeps the output
+        # identical whatever the number of jobs.
+        stats = self.stats
+        if stats is None:
+            for fragment in self.build_fragments(services_info, jobs):
+                self.merge_service_fragment(fragment)
+            return
+
+        timings = [0.0] * len(services_info)
+        with stats.phase("reflection"):
+            fragments = self.build_fragments(services_info, jobs, timings)
+        with stats.phase("merge"):
+            for fragment, reflection_seconds in zip(fragments, timings):
+                start = time.perf_counter()
+                self.merge_service_fragment(fragment)
+                stats.endpoints.append(
+                    EndpointCost(
+                        operationId=fragment.operationId,
+                        httpMethod=fragment.httpMethod,
+                        httpPath=fragment.httpPath,
+                        reflectionSeconds=reflection_seconds,
+                        mergeSeconds=time.perf_counter() - start,
                     )
-                    self.setSchemas(defs)
-
-                self.getSchemas().pop(_name)
-
-                inspectBody = get_type_hints(service.serviceOutput)
-
-                inspectBody = inspectBody.get("bodyOutput")
-                self.getSchemas()[
-                    f"{domainName}{inspectBody.__name__}"
-                ] = self.getSchemas().pop(inspectBody.__name__)
-                inspectContent = [
-                    field
-                    for field in dataclasses.fields(inspectBody)
-                    if field.name == "_contentType"
-                ][0].default
-
-                httpMethodInfo["responses"] = {}
-                httpMethodInfo["responses"][200] = {}
-                httpMethodInfo["responses"][200]["content"] = {}
-                httpMethodInfo["responses"][200]["description"] = "Success"
-                _content = httpMethodInfo["responses"][200]["content"]
-                _content[inspectContent] = {
-                    "schema": {
-                        "$ref": f"#/components/schemas/{domainName}{inspectBody.__name__}"
-                    }
-                }
+                )
+        stats.count("endpoints", len(fragments))
+
+    def schema_key_format(self) -> Optional[Callable[[str], str]]:
+        return self.key_converter if self.to_camel_case_schemas else None
+
+    def fragment_options(self) -> Dict[str, Any]:
+        return {
+            "openapi_version": self.openapi_version,
+            "to_camel_case_schemas": self.to_camel_case_schemas,
+            "schema_key_case": self.schema_key_case,
+        }
+
+    def build_fragments(
+        self,
+        services_info: List[GeneratorConfig],
+        jobs: int | None = 1,
+        timings: List[float] | None = None,
+    ) -> List[ServiceFragment]:
+        # When given, timings must hold one slot per service and receives the
+        # reflection time of each one (0 for fragments served from the cache).
+        if self.fragment_cache is None:
+            built_timings = [] if timings is not None else None
+            fragments = OpenApiGenerator.build_service_fragments(
+                services_info, jobs, self.schema_key_format(), built_timings
+            )
+            if timings is not None:
+                timings[:] = built_timings
+            return fragments
+
+        keys, fragments = self.fragment_cache.lookup_all(
+            services_info, self.fragment_options()
+        )
+        dirty = [idx for idx, fragment in enumerate(fragments) if fragment is None]
+        built_timings = [] if timings is not None else None
+        built = OpenApiGenerator.build_service_fragments(
+            [services_info[idx] for idx in dirty],
+            jobs,
+            self.schema_key_format(),
+            built_timings,
+        )
+        for pos, (idx, fragment) in enumerate(zip(dirty, built)):
+            self.fragment_cache.put(keys[idx], fragment)
+            fragments[idx] = fragment
+            if timings is not None:
+                timings[idx] = built_timings[pos]
+        self.fragment_cache.save()
+
+        if self.stats is not None:
+            self.stats.count("fragment_cache_hits", len(fragments) - len(dirty))
+            self.stats.count("fragment_cache_misses", len(dirty))
+
+        self.logger.info(
+            "Fragment cache: %d reused, %d rebuilt",
+            len(fragments) - len(dirty),
+            len(dirty),
+        )
+        return fragments
+
+    def discover_endpoints(self) -> List[GeneratorConfig]:
+        discovery = EndpointDiscovery(
+            max_workers=self.scan_workers,
+            index_file=self.discovery_index_file,
+            exclude=self.scan_exclude,
+        )
+        if self.search_endpoint_declaration == SearchEndpointDeclaration.PackageScan:
+            return discovery.discover_package(self.scan_package)
+        return discovery.discover_directory(self.scan_directory)
+
+    def get_endpoint_configs(self) -> List[GeneratorConfig]:
+        if self.endpoint_config is None:
+            if self.search_endpoint_declaration == SearchEndpointDeclaration.Registry:
+                self.endpoint_config = self.endpoint_registry.configs()
+            else:
+                self.endpoint_config = self.discover_endpoints()
+        return self.endpoint_config
 
-    def generate(self):
+    def generate(self, jobs: int | None = 1):
 
         if self.openapi_build is None:
             raise ValueError("OpenAPI build is not initialized.")
 
-        if (
-            self.search_endpoint_declaration
-            == SearchEndpointDeclaration.OneEndpointConfig
-        ):
-            self.process_services(self.endpoint_config)
+        self.stats = BuildStats() if self.collect_stats else None
+        if self.stats is None:
+            self.process_services(self.get_endpoint_configs(), jobs=jobs)
+            if self.dedup_schemas:
+                self.deduplicate()
+            if self.compact_output:
+                self.compact()
+            self.write_output()
+            return
+
+        stats = self.stats
+        resolver_hits = self.resolver_cache.hits
+        resolver_misses = self.resolver_cache.misses
+        hint_misses, hint_seconds = type_hints.misses, type_hints.seconds
+        start = time.perf_counter()
+
+        with stats.phase("discovery"):
+            services = self.get_endpoint_configs()
+        self.process_services(services, jobs=jobs)
+        if self.dedup_schemas:
+            with stats.phase("dedup"):
+                self.deduplicate()
+            stats.set("dedup_removed_schemas", self.dedup_result.removed)
+            stats.set("dedup_bytes_saved", self.dedup_result.bytes_saved)
+        if self.compact_output:
+            with stats.phase("compact"):
+                self.compact()
+            result = self.compact_result
+            stats.set("compact_bytes_before", result.bytes_before)
+            stats.set("compact_bytes_after", result.bytes_after)
+            stats.set("compact_pruned", result.pruned)
+            stats.set("compact_hoisted_responses", result.hoisted_responses)
+            stats.set("compact_merged_parameters", result.merged_parameters)
+        written, skipped = self.output_sink.written, self.output_sink.skipped
+        output_bytes = self.output_sink.bytes_written
+        compression = {
+            suffix: dataclasses.replace(totals)
+            for suffix, totals in self.output_sink.compression.items()
+        }
+        self.write_output()
+        stats.set("files_written", self.output_sink.written - written)
+        stats.set("files_skipped", self.output_sink.skipped - skipped)
+        stats.set("output_bytes", self.output_sink.bytes_written - output_bytes)
+        for suffix, totals in self.output_sink.compression.items():
+            before = compression[suffix]
+            bytes_in = totals.bytes_in - before.bytes_in
+            bytes_out = totals.bytes_out - before.bytes_out
+            # Spent inside the write phases, while the files were written.
+            stats.add_time(f"compress.{suffix}", totals.seconds - before.seconds)
+            stats.set(f"compress_{suffix}_bytes", bytes_out)
+            ratio = bytes_out / bytes_in if bytes_in else 0.0
+            stats.set(f"compress_{suffix}_ratio", ratio)
+
+        stats.add_time("total", time.perf_counter() - start)
+        stats.set("jobs", jobs)
+        stats.set("paths", len(self.getPaths()))
+        stats.set("schemas", len(self.getSchemas()))
+        stats.set("parameters", len(self.getComponents().get("parameters", {})))
+        stats.set("resolver_cache_hits", self.resolver_cache.hits - resolver_hits)
+        stats.set(
+            "resolver_cache_misses", self.resolver_cache.misses - resolver_misses
+        )
+        stats.set("key_case_hit_rate", self.key_converter.hit_rate)
+        # Spent inside reflection; only covers this process when jobs > 1.
+        stats.add_time("type_hints", type_hints.seconds - hint_seconds)
+        stats.set("type_hint_classes", type_hints.misses - hint_misses)
+        if self.stats_file:
+            stats.write_json(self.stats_file)
+
+    def deduplicate(self) -> DedupResult:
+        self.dedup_result = deduplicate_schemas(self.openapi_build)
+        self.logger.info(
+            f"Deduplicated {self.dedup_result.removed} schemas, "
+            f"saved {self.dedup_result.bytes_saved} bytes."
+        )
+        return self.dedup_result
+
+    def compact(self) -> CompactResult:
+        self.openapi_build, self.compact_result = compact_document(self.openapi_build)
+        self.logger.info(
+            f"Compacted the spec from {self.compact_result.bytes_before} to "
+            f"{self.compact_result.bytes_after} bytes."
+        )
+        return self.compact_result
+
+    def build_output_files(self) -> Dict[OutputFormat, str]:
+        # The first format is written to output_openapi_file as given; any
+        # additional format goes next to it with its own extension.
+        base, _ = os.path.splitext(self.output_openapi_file)
+        output_files = {}
+        for idx, fmt in enumerate(self.output_formats):
+            path = (
+                self.output_openapi_file
+                if idx == 0
+                else f"{base}{OUTPUT_EXTENSIONS[fmt]}"
+            )
+            if path in output_files.values():
+                raise ValueError(
+                    f"Output formats {self.output_formats} would both write {path}."
+                )
+            output_files[fmt] = path
+        return output_files
+
+    def write_output(self) -> None:
+        skipped = self.output_sink.skipped
+        for fmt, path in self.output_files.items():
+            if self.stats is not None:
+                with self.stats.phase(f"write.{fmt.value}"):
+                    self.write_format(fmt, path)
+            else:
+                self.write_format(fmt, path)
+        if self.output_sink.skipped > skipped:
+            self.logger.info(
+                f"Left {self.output_sink.skipped - skipped} unchanged output "
+                "files untouched."
+            )
 
-        with open(self.output_openapi_file, "w") as f:
-            yaml.dump(
-                self.openapi_build, f, sort_keys=False, allow_unicode=True, indent=2
+    def write_format(self, fmt: OutputFormat, path: str) -> None:
+        # The writers pull in yaml, which commands that never write output
+        # (such as the CLI's --help) should not pay for at import time.
+        from writers import dump_json
+
+        if self.split_output:
+            from split import write_split
+
+            write_split(
+                self.openapi_build,
+                path,
+                fmt="yaml" if fmt == OutputFormat.Yaml else "json",
+                workers=self.split_workers,
+                stream=self.stream_output,
+                pretty=fmt == OutputFormat.JsonPretty,
+                compact=self.compact_output,
+                sink=self.output_sink,
+            )
+        elif fmt == OutputFormat.Yaml:
+            self.write_yaml(path)
+        else:
+            self.output_sink.write(
+                path,
+                lambda f: dump_json(
+                    self.openapi_build, f, pretty=fmt == OutputFormat.JsonPretty
+                ),
+            )
+
+    def write_yaml(self, path: str) -> None:
+        from writers import WRITE_BUFFER_SIZE, dump_yaml, stream_yaml
+
+        if self.stream_output:
+            self.output_sink.write(
+                path,
+                lambda f: stream_yaml(
+                    self.openapi_build, f, compact=self.compact_output
+                ),
+                buffering=WRITE_BUFFER_SIZE,
+            )
+        else:
+            self.output_sink.write(
+                path,
+                lambda f: dump_yaml(
+                    self.openapi_build, f, compact=self.compact_output
+                ),
             )
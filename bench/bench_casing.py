@@ -0,0 +1,78 @@
+"""Per-key cost of key case conversion, plain versus memoized.
+
+Usage: python bench/bench_casing.py [--unique N] [--calls N] [--case NAME]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import (  # noqa: E402
+    KEY_CASE_CONVERSIONS,
+    KeyCaseConverter,
+    deep_change_keys_by_format,
+)
+
+
+def synthetic_keys(unique: int, calls: int, seed: int = 0):
+    rng = random.Random(seed)
+    words = ["user", "id", "name", "created", "at", "order", "line", "total", "zip"]
+    names = [
+        "_".join(rng.choice(words) for _ in range(rng.randint(1, 4))) + f"_{idx}"
+        for idx in range(unique)
+    ]
+    return [rng.choice(names) for _ in range(calls)]
+
+
+def per_key_ns(convert, keys):
+    start = time.perf_counter_ns()
+    for key in keys:
+        convert(key)
+    return (time.perf_counter_ns() - start) / len(keys)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--unique", type=int, default=3000)
+    parser.add_argument("--calls", type=int, default=500_000)
+    parser.add_argument(
+        "--case", default="camel", choices=sorted(KEY_CASE_CONVERSIONS)
+    )
+    args = parser.parse_args()
+
+    keys = synthetic_keys(args.unique, args.calls)
+    converter = KeyCaseConverter(args.case)
+    plain_ns = per_key_ns(KEY_CASE_CONVERSIONS[args.case], keys)
+    cached_ns = per_key_ns(converter, keys)
+
+    tree = {
+        key: {"type": "object", "properties": {key: {"type": "string"}}}
+        for key in keys[:20_000]
+    }
+    start = time.perf_counter()
+    deep_change_keys_by_format(tree, KEY_CASE_CONVERSIONS[args.case])
+    deep_plain_s = time.perf_counter() - start
+    start = time.perf_counter()
+    deep_change_keys_by_format(tree, converter)
+    deep_cached_s = time.perf_counter() - start
+
+    report = {
+        "case": args.case,
+        "unique_keys": args.unique,
+        "calls": args.calls,
+        "plain_ns_per_key": plain_ns,
+        "cached_ns_per_key": cached_ns,
+        "deep_change_plain_s": deep_plain_s,
+        "deep_change_cached_s": deep_cached_s,
+        "cache": converter.info(),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Records per second of DataclassProtocol.from_dict, before versus after.
+
+Usage: python bench/bench_from_dict.py [--records N] [--fields N]
+
+"before" is the original implementation, which called inspect.signature(cls)
+for every key; "after" is the generated constructor, per record and in bulk.
+"""
+
+import argparse
+import dataclasses
+import inspect
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gen_types import DataclassProtocol  # noqa: E402
+
+
+def signature_from_dict(cls, attrs):
+    return cls(
+        **{k: v for k, v in attrs.items() if k in inspect.signature(cls).parameters}
+    )
+
+
+def records_per_second(decode, records):
+    start = time.perf_counter()
+    decode(records)
+    return len(records) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--fields", type=int, default=8)
+    args = parser.parse_args()
+
+    fields = [(f"field_{idx}", str) for idx in range(args.fields)]
+    fields.append(("optional", str, dataclasses.field(default="")))
+    record_cls = dataclasses.make_dataclass(
+        "Record", fields, bases=(DataclassProtocol,)
+    )
+    records = [
+        {**{name: f"{name}-{idx}" for name, _ in fields[:-1]}, "unknown": idx}
+        for idx in range(args.records)
+    ]
+    if [signature_from_dict(record_cls, r) for r in records[:10]] != (
+        record_cls.from_dicts(records[:10])
+    ):
+        raise ValueError("Generated constructor does not match the original.")
+
+    report = {
+        "records": args.records,
+        "fields": args.fields,
+        "signature_records_per_s": records_per_second(
+            lambda rs: [signature_from_dict(record_cls, r) for r in rs], records
+        ),
+        "from_dict_records_per_s": records_per_second(
+            lambda rs: [record_cls.from_dict(r) for r in rs], records
+        ),
+        "from_dicts_records_per_s": records_per_second(
+            record_cls.from_dicts, records
+        ),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""End-to-end benchmark of build_openapi_base + generate() on synthetic endpoints.
+
+Usage:
+    python bench/bench_generate.py --endpoints 1000 --depth 3 --results out.json
+    python bench/bench_generate.py --compare out.json
+
+Each run is timed once without tracing and once under tracemalloc for peak
+memory, and the result is written as JSON so runs can be compared over time.
+"""
+
+import argparse
+import dataclasses
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _tool import (  # noqa: E402
+    OpenApiGenerator,
+    OutputFormat,
+    SearchEndpointDeclaration,
+)
+from synthetic import SyntheticSpec, synthesize  # noqa: E402
+
+METRICS = ("wall_time_s", "peak_memory_bytes", "output_bytes")
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_once(configs, output_file, options, jobs, trace_memory):
+    # Every run starts cold so the numbers do not depend on the order runs
+    # were made in.
+    OpenApiGenerator.resolver_cache.clear()
+    generator = OpenApiGenerator(
+        search_endpoint_declaration=SearchEndpointDeclaration.EndpointConfigList,
+        endpoint_configs=configs,
+        output_openapi_file=output_file,
+        **options,
+    )
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    generator.build_openapi_base("Synthetic", "Synthetic benchmark", "1.0")
+    generator.generate(jobs=jobs)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return elapsed, peak, generator
+
+
+def benchmark(spec, options, jobs, repeat):
+    configs = synthesize(spec)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "openapi.out")
+        timings = [
+            run_once(configs, output_file, options, jobs, False)[0]
+            for _ in range(repeat)
+        ]
+        _, peak, generator = run_once(configs, output_file, options, jobs, True)
+        output_bytes = sum(
+            os.path.getsize(path) for path in generator.output_files.values()
+        )
+
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "spec": dataclasses.asdict(spec),
+        "options": {
+            k: v.value if isinstance(v, OutputFormat) else v
+            for k, v in options.items()
+        },
+        "jobs": jobs,
+        "repeat": repeat,
+        "wall_time_s": min(timings),
+        "peak_memory_bytes": peak,
+        "output_bytes": output_bytes,
+        "schemas": len(generator.getSchemas()),
+        "paths": len(generator.getPaths()),
+    }
+
+
+def compare(previous, current):
+    for metric in METRICS:
+        before, after = previous.get(metric), current.get(metric)
+        if not before or after is None:
+            continue
+        change = (after - before) / before * 100
+        print(f"{metric:>18}: {before:>14.4f} -> {after:>14.4f} ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    defaults = SyntheticSpec()
+    parser.add_argument("--endpoints", type=int, default=defaults.endpoints)
+    parser.add_argument("--depth", type=int, default=defaults.depth)
+    parser.add_argument("--fanout", type=int, default=defaults.fanout)
+    parser.add_argument("--fields", type=int, default=defaults.fields)
+    parser.add_argument("--union-width", type=int, default=defaults.union_width)
+    parser.add_argument("--shared-ratio", type=float, default=defaults.shared_ratio)
+    parser.add_argument("--shared-pool", type=int, default=defaults.shared_pool)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--stream", action="store_true", help="stream YAML output")
+    parser.add_argument(
+        "--dedup", action="store_true", help="deduplicate component schemas"
+    )
+    parser.add_argument(
+        "--format",
+        choices=[f.value for f in OutputFormat],
+        default=OutputFormat.Yaml.value,
+    )
+    parser.add_argument("--results", help="write the result JSON to this file")
+    parser.add_argument("--compare", help="previous result JSON to compare with")
+    args = parser.parse_args()
+
+    spec = SyntheticSpec(
+        endpoints=args.endpoints,
+        depth=args.depth,
+        fanout=args.fanout,
+        fields=args.fields,
+        union_width=args.union_width,
+        shared_ratio=args.shared_ratio,
+        shared_pool=args.shared_pool,
+        seed=args.seed,
+    )
+    options = {
+        "stream_output": args.stream,
+        "dedup_schemas": args.dedup,
+        "output_format": OutputFormat(args.format),
+    }
+    result = benchmark(spec, options, args.jobs, args.repeat)
+    print(json.dumps(result, indent=2))
+
+    if args.results:
+        with open(args.results, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Cost of writing .gz/.xz siblings in the same pass versus compressing after.
+
+Usage: python bench/bench_precompress.py [--paths N] [--schemas N] [--levels 1 6 9]
+
+For every suffix and level the spec is written through AtomicFileSink three
+ways: without compression, with the sibling compressed while the file is
+written, and plain followed by a second pass compressing the written file.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_writer import synthetic_tree  # noqa: E402
+from output_sink import COMPRESSORS, AtomicFileSink  # noqa: E402
+from writers import WRITE_BUFFER_SIZE, stream_yaml  # noqa: E402
+
+
+def timed_write(sink, tree, output_file) -> float:
+    start = time.perf_counter()
+    sink.write(output_file, lambda f: stream_yaml(tree, f), buffering=WRITE_BUFFER_SIZE)
+    return time.perf_counter() - start
+
+
+def second_pass(output_file, suffix, level) -> float:
+    start = time.perf_counter()
+    with open(output_file, "rb") as src, open(f"{output_file}.{suffix}", "wb") as raw:
+        opener = COMPRESSORS[suffix][0]
+        with opener(raw, os.path.basename(output_file), level) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, default=2000)
+    parser.add_argument("--schemas", type=int, default=1000)
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 6, 9])
+    args = parser.parse_args()
+
+    tree = synthetic_tree(args.paths, args.schemas)
+    report = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "openapi.yaml")
+        plain_s = timed_write(AtomicFileSink(), tree, output_file)
+        for suffix in COMPRESSORS:
+            for level in args.levels:
+                sink = AtomicFileSink(compress={suffix: level})
+                inline_s = timed_write(sink, tree, output_file)
+                totals = sink.compression[suffix]
+                two_pass_s = timed_write(AtomicFileSink(), tree, output_file)
+                two_pass_s += second_pass(output_file, suffix, level)
+                report.append(
+                    {
+                        "suffix": suffix,
+                        "level": level,
+                        "output_bytes": totals.bytes_in,
+                        "compressed_bytes": totals.bytes_out,
+                        "ratio": totals.ratio,
+                        "compress_s": totals.seconds,
+                        "plain_write_s": plain_s,
+                        "inline_write_s": inline_s,
+                        "two_pass_write_s": two_pass_s,
+                    }
+                )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
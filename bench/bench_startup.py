@@ -0,0 +1,119 @@
+"""Cold-start import cost of the CLI and the generator, from -X importtime.
+
+Usage:
+    python bench/bench_startup.py [--runs N] [--budget-ms MS] [--results out.json]
+    python bench/bench_startup.py --compare out.json
+
+Each command runs in a fresh interpreter; the fastest of ``--runs`` is kept.
+Exits with status 1 when ``openapi_gen --help`` imports one of the modules
+the CLI is meant to load lazily, or when it takes longer than ``--budget-ms``,
+so it can run in CI.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {
+    "cli_help": ["-m", "openapi_gen", "--help"],
+    "import_tool": ["-c", "import _tool"],
+}
+
+# Modules openapi_gen must not import before a command needs them.
+LAZY_MODULES = ("_tool", "yaml", "multiprocessing", "gen_types")
+
+# Imported by the interpreter before any of our code runs; what it pulls in
+# depends on the installed .pth files, not on this repository.
+INTERPRETER_MODULES = ("site", "encodings")
+
+METRICS = ("cli_help_ms", "import_tool_ms")
+
+
+def import_times(args: List[str]) -> Tuple[float, Dict[str, int]]:
+    """Total import milliseconds and cumulative microseconds per module."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=ROOT,
+    )
+    modules, block, total = {}, {}, 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        block[name.strip()] = int(cumulative)
+        # importtime prints a module after everything it imported, so a
+        # top-level line closes the block of lines above it.
+        if not name[1:].startswith(" "):
+            if name.strip() not in INTERPRETER_MODULES:
+                modules.update(block)
+                total += int(cumulative)
+            block = {}
+    return total / 1000, modules
+
+
+def measure(runs: int) -> Dict[str, object]:
+    report: Dict[str, object] = {"python": sys.version.split()[0], "runs": runs}
+    for name, args in COMMANDS.items():
+        samples = [import_times(args) for _ in range(runs)]
+        total, modules = min(samples, key=lambda sample: sample[0])
+        report[f"{name}_ms"] = total
+        report[f"{name}_slowest"] = [
+            {"module": module, "ms": us / 1000}
+            for module, us in sorted(modules.items(), key=lambda i: -i[1])[:5]
+        ]
+        if name == "cli_help":
+            report["eager_imports"] = [m for m in LAZY_MODULES if m in modules]
+    return report
+
+
+def compare(previous, current):
+    for metric in METRICS:
+        before, after = previous.get(metric), current.get(metric)
+        if not before or after is None:
+            continue
+        change = (after - before) / before * 100
+        print(f"{metric:>18}: {before:>10.1f} -> {after:>10.1f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms", type=float, help="fail when cli --help imports take longer"
+    )
+    parser.add_argument("--results", help="write the result JSON to this file")
+    parser.add_argument("--compare", help="previous result JSON to compare with")
+    args = parser.parse_args()
+
+    report = measure(max(1, args.runs))
+    print(json.dumps(report, indent=2))
+    if args.results:
+        with open(args.results, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+    failures = []
+    if report["eager_imports"]:
+        failures.append(f"--help imported {', '.join(report['eager_imports'])}")
+    if args.budget_ms is not None and report["cli_help_ms"] > args.budget_ms:
+        failures.append(
+            f"--help imports took {report['cli_help_ms']:.1f} ms "
+            f"(budget {args.budget_ms:.1f} ms)"
+        )
+    for failure in failures:
+        print(f"startup regression: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Scaling of schema generation over deep, shared and cyclic dataclass graphs.
+
+Usage: python bench/bench_type_graph.py [--sizes 1000 4000 16000]
+
+Three graph shapes are generated per size N: a chain N classes deep, a
+lattice where every class references the two before it (so naive expansion
+is exponential), and a ring where the last class points back at the first.
+Time per class should stay flat as N grows.
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import time
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _tool import OpenApiGenerator  # noqa: E402
+
+
+def build_graph(shape: str, size: int) -> type:
+    classes: List[type] = []
+    for idx in range(size):
+        fields = [("value", int)]
+        if idx >= 1:
+            fields.append(("previous", Optional[classes[idx - 1]]))
+        if shape == "lattice" and idx >= 2:
+            fields.append(("skip", List[classes[idx - 2]]))
+        if shape == "ring" and idx == 0:
+            fields.append(("last", Optional[int]))
+        classes.append(dataclasses.make_dataclass(f"{shape}{size}_{idx}", fields))
+    if shape == "ring":
+        # Close the cycle once the last class exists.
+        classes[0].__annotations__["last"] = Optional[classes[-1]]
+    return classes[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000])
+    args = parser.parse_args()
+
+    report = []
+    for shape in ("chain", "lattice", "ring"):
+        for size in args.sizes:
+            root = build_graph(shape, size)
+            OpenApiGenerator.resolver_cache.clear()
+            start = time.perf_counter()
+            _, defs = OpenApiGenerator.dataclass_to_openapi_schema(root)
+            seconds = time.perf_counter() - start
+            report.append(
+                {
+                    "shape": shape,
+                    "classes": size,
+                    "definitions": len(defs),
+                    "seconds": seconds,
+                    "us_per_class": seconds / size * 1e6,
+                }
+            )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Events per second of compiled validators versus a naive reflective walk.
+
+Usage: python bench/bench_validators.py [--endpoints N] [--events N]
+
+The naive walk is what handlers did before validators.py: resolve the type
+hints of every dataclass and walk the event dict on each call.
+"""
+
+import argparse
+import dataclasses
+import enum
+import json
+import os
+import random
+import sys
+import time
+import types
+import typing
+from typing import get_args, get_origin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from synthetic import SyntheticSpec, synthesize  # noqa: E402
+from decoding import EVENT_SECTIONS, SECTION_MODES, is_bool_text  # noqa: E402
+from validators import get_validator  # noqa: E402
+
+
+def naive_check(tp, value, path, text, errors):
+    if get_origin(tp) in (typing.Union, types.UnionType):
+        args = [a for a in get_args(tp) if a is not type(None)]
+        for arg in args:
+            sub = []
+            naive_check(arg, value, path, text, sub)
+            if not sub:
+                return
+        errors.append(f"{path}: does not match any variant")
+    elif get_origin(tp) is list:
+        if isinstance(value, list):
+            for item in value:
+                naive_check(get_args(tp)[0], item, f"{path}[]", text, errors)
+        elif not (text and isinstance(value, str)):
+            errors.append(f"{path}: expected an array")
+    elif isinstance(tp, type) and issubclass(tp, enum.Enum):
+        if value not in [e.value for e in tp]:
+            errors.append(f"{path}: unexpected value")
+    elif dataclasses.is_dataclass(tp):
+        if not isinstance(value, dict):
+            errors.append(f"{path}: expected an object")
+            return
+        hints = typing.get_type_hints(tp)
+        for field in dataclasses.fields(tp):
+            if field.name.startswith("_"):
+                continue
+            child = value.get(field.name)
+            if child is None:
+                if type(None) not in get_args(hints[field.name]):
+                    errors.append(f"{path}.{field.name}: is required")
+                continue
+            naive_check(hints[field.name], child, f"{path}.{field.name}", text, errors)
+    elif tp is bool and text:
+        if not is_bool_text(value):
+            errors.append(f"{path}: expected a boolean")
+    elif tp in (int, float) and text:
+        try:
+            tp(value)
+        except (TypeError, ValueError):
+            errors.append(f"{path}: expected a number")
+    elif tp in (str, int, float, bool) and not isinstance(value, tp):
+        errors.append(f"{path}: expected {tp.__name__}")
+
+
+def naive_validate(cls, event):
+    errors = []
+    hints = typing.get_type_hints(cls)
+    for field in dataclasses.fields(cls):
+        if field.name not in EVENT_SECTIONS:
+            continue
+        section = event.get(EVENT_SECTIONS[field.name])
+        if field.name == "bodyInput" and isinstance(section, str):
+            section = json.loads(section)
+        if section is None:
+            errors.append(f"{field.name}: is required")
+            continue
+        text = SECTION_MODES[field.name] != "json"
+        naive_check(hints[field.name], section, field.name, text, errors)
+    return errors
+
+
+def sample_value(tp, text, rng):
+    if get_origin(tp) in (typing.Union, types.UnionType):
+        args = [a for a in get_args(tp) if a is not type(None)]
+        return sample_value(rng.choice(args), text, rng)
+    if get_origin(tp) is list:
+        return [sample_value(get_args(tp)[0], text, rng) for _ in range(2)]
+    if isinstance(tp, type) and issubclass(tp, enum.Enum):
+        return rng.choice([e.value for e in tp])
+    if dataclasses.is_dataclass(tp):
+        hints = typing.get_type_hints(tp)
+        return {
+            f.name: sample_value(hints[f.name], text, rng)
+            for f in dataclasses.fields(tp)
+            if not f.name.startswith("_")
+        }
+    value = {str: "value", int: 7, float: 1.5, bool: True}.get(tp, "value")
+    return str(value) if text else value
+
+
+def sample_event(cls, rng):
+    hints = typing.get_type_hints(cls)
+    event = {}
+    for field in dataclasses.fields(cls):
+        if field.name in EVENT_SECTIONS:
+            text = SECTION_MODES[field.name] != "json"
+            value = sample_value(hints[field.name], text, rng)
+            event[EVENT_SECTIONS[field.name]] = value
+    return event
+
+
+def events_per_second(validate, pairs):
+    start = time.perf_counter()
+    for cls, event in pairs:
+        validate(cls, event)
+    return len(pairs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--endpoints", type=int, default=50)
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--depth", type=int, default=2)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    spec = SyntheticSpec(endpoints=args.endpoints, depth=args.depth)
+    classes = [config.serviceInput for config in synthesize(spec)]
+    samples = {cls: sample_event(cls, rng) for cls in classes}
+    pairs = [(cls, samples[cls]) for cls in rng.choices(classes, k=args.events)]
+
+    # Sample events use the field names as declared, as in a spec generated
+    # with to_camel_case_schemas off.
+    for cls, event in samples.items():
+        if get_validator(cls, None)(event) or naive_validate(cls, event):
+            raise ValueError(f"Sample event for {cls.__name__} does not validate.")
+
+    start = time.perf_counter()
+    get_validator.cache_clear()
+    for cls in classes:
+        get_validator(cls, None)
+    compile_s = time.perf_counter() - start
+
+    report = {
+        "endpoints": args.endpoints,
+        "events": args.events,
+        "compile_s": compile_s,
+        "naive_events_per_s": events_per_second(naive_validate, pairs),
+        "compiled_events_per_s": events_per_second(
+            lambda cls, event: get_validator(cls, None)(event), pairs
+        ),
+    }
+    report["speedup"] = report["compiled_events_per_s"] / report["naive_events_per_s"]
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Compare the monolithic yaml.dump writer with the streaming writer.
+
+Usage: python bench/bench_writer.py [--paths N] [--schemas N] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from writers import WRITE_BUFFER_SIZE, dump_yaml, stream_yaml  # noqa: E402
+
+
+def synthetic_tree(paths: int, schemas: int) -> dict:
+    components = {}
+    for idx in range(schemas):
+        components[f"Schema{idx}"] = {
+            "type": "object",
+            "properties": {
+                f"field{f}": {"type": "string" if f % 2 else "integer"}
+                for f in range(12)
+            },
+            "required": [f"field{f}" for f in range(6)],
+        }
+    paths_section = {}
+    for idx in range(paths):
+        target = f"Schema{idx % max(schemas, 1)}"
+        paths_section[f"/resource{idx}/{{resourceId}}"] = {
+            "get": {
+                "operationId": f"getResource{idx}",
+                "summary": f"Fetch resource {idx}",
+                "parameters": [{"$ref": f"#/components/parameters/Resource{idx}Id"}],
+                "responses": {
+                    200: {
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": f"#/components/schemas/{target}"}
+                            }
+                        },
+                        "description": "Success",
+                    }
+                },
+            }
+        }
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "Bench", "description": "Writer bench", "version": "1.0"},
+        "components": {
+            "schemas": components,
+            "parameters": {},
+            "responses": {},
+            "examples": {},
+        },
+        "paths": paths_section,
+    }
+
+
+def run_writer(name, write, tree, output_file, repeat):
+    timings = []
+    peak = 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        start = time.perf_counter()
+        write(tree, output_file)
+        timings.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        "writer": name,
+        "wall_time_s": min(timings),
+        "peak_memory_bytes": peak,
+        "output_bytes": os.path.getsize(output_file),
+    }
+
+
+def write_monolithic(tree, output_file):
+    with open(output_file, "w") as f:
+        dump_yaml(tree, f)
+
+
+def write_streaming(prefer_c):
+    def write(tree, output_file):
+        with open(
+            output_file, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE
+        ) as f:
+            stream_yaml(tree, f, prefer_c=prefer_c)
+
+    return write
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paths", type=int, default=2000)
+    parser.add_argument("--schemas", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tree = synthetic_tree(args.paths, args.schemas)
+    writers = [
+        ("yaml.dump", write_monolithic),
+        ("stream (python)", write_streaming(False)),
+        ("stream (libyaml)", write_streaming(True)),
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_file = os.path.join(tmp_dir, "openapi.yaml")
+        results = [
+            run_writer(name, write, tree, output_file, args.repeat)
+            for name, write in writers
+        ]
+
+    # tracemalloc only sees Python allocations; libyaml's own buffers are not
+    # included in peak_memory_bytes.
+    report = {"paths": args.paths, "schemas": args.schemas, "results": results}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Synthetic endpoints and dataclasses for the benchmark suite.
+
+Every generated class is attached to this module so it can be pickled by
+reference when fragments are built on a process pool.
+"""
+
+import dataclasses
+import enum
+import os
+import random
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gen_types import AbstractInput, AbstractOutput, GeneratorConfig  # noqa: E402
+
+SCALAR_TYPES = [str, int, float, bool, Optional[str], List[str]]
+
+
+@dataclass
+class SyntheticSpec:
+    endpoints: int = 100
+    depth: int = 2
+    fanout: int = 2
+    fields: int = 6
+    union_width: int = 2
+    shared_ratio: float = 0.5
+    shared_pool: int = 32
+    seed: int = 0
+
+
+class _Builder:
+    def __init__(self, spec: SyntheticSpec):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.module = sys.modules[__name__]
+        self.classes = 0
+        self.status = self._register(
+            enum.Enum("SyntheticStatus", {"ACTIVE": "active", "CLOSED": "closed"})
+        )
+        # The shared pool itself is built from fresh classes only.
+        self.shared = []
+        self.shared = [
+            self.make_dataclass(f"Shared{idx}", spec.depth - 1)
+            for idx in range(spec.shared_pool if spec.depth > 0 else 0)
+        ]
+
+    def _register(self, cls):
+        cls.__module__ = __name__
+        setattr(self.module, cls.__qualname__, cls)
+        return cls
+
+    def _scalar_fields(self):
+        fields = []
+        for idx in range(self.spec.fields):
+            tp = SCALAR_TYPES[idx % len(SCALAR_TYPES)]
+            if idx == self.spec.fields - 1:
+                tp = self.status
+            fields.append((f"field_{idx}", tp))
+        return fields
+
+    def make_dataclass(self, name: str, depth: int, extra=()):
+        fields = self._scalar_fields()
+        if depth > 0:
+            for idx in range(self.spec.fanout):
+                if self.shared and self.rng.random() < self.spec.shared_ratio:
+                    child = self.rng.choice(self.shared)
+                else:
+                    child = self.make_dataclass(f"{name}Child{idx}", depth - 1)
+                fields.append((f"child_{idx}", child if idx % 2 else List[child]))
+        self.classes += 1
+        return self._register(dataclasses.make_dataclass(name, fields + list(extra)))
+
+    def make_endpoint(self, idx: int) -> GeneratorConfig:
+        prefix = f"Endpoint{idx}"
+        variants = [
+            self.make_dataclass(f"{prefix}Query{v}", 0)
+            for v in range(max(self.spec.union_width, 1))
+        ]
+        query = variants[0]
+        for variant in variants[1:]:
+            query = query | variant
+        path = self._register(
+            dataclasses.make_dataclass(
+                f"{prefix}Path", [("item_id", str), ("version", int)]
+            )
+        )
+        body = self.make_dataclass(
+            f"{prefix}Body",
+            self.spec.depth,
+            extra=[("_contentType", str, field(default="application/json"))],
+        )
+
+        request = self._register(
+            dataclasses.make_dataclass(
+                f"{prefix}Request",
+                [
+                    ("domainName", str, field(default=f"domain{idx % 10}")),
+                    ("queryStringParameters", query),
+                    ("pathParameters", path),
+                ],
+                bases=(AbstractInput,),
+            )
+        )
+        response = self._register(
+            dataclasses.make_dataclass(
+                f"{prefix}Response", [("bodyOutput", body)], bases=(AbstractOutput,)
+            )
+        )
+        return GeneratorConfig(
+            serviceName=f"Service{idx}",
+            description=f"Synthetic endpoint {idx}",
+            operationId=f"operation{idx}",
+            httpMethod=("GET", "POST", "PUT", "DELETE")[idx % 4],
+            httpPath=f"domain{idx % 10}/items{idx}/{{item_id}}/{{version}}",
+            serviceInput=request,
+            serviceOutput=response,
+        )
+
+
+def synthesize(spec: SyntheticSpec) -> List[GeneratorConfig]:
+    builder = _Builder(spec)
+    return [builder.make_endpoint(idx) for idx in range(spec.endpoints)]
@@ -0,0 +1,244 @@
+"""Compact emission of a generated spec.
+
+``compact_document`` returns a smaller but equivalent document:
+
+* identical ``components.parameters`` entries are merged into the first one
+  and the operations referring to the others are pointed at it;
+* response objects repeated across operations (every endpoint returning
+  the same body gets the same inline ``200``) are hoisted into
+  ``components.responses`` and replaced by a ``$ref``;
+* empty mappings, such as the ``responses: {}`` and ``examples: {}``
+  components of the base document or operations without parameters, are
+  dropped, except where OpenAPI gives them a meaning or requires them.
+
+The input is never modified: containers on the way to a change are copied
+and everything else is shared with it, so the fragments merged into the
+build stay intact. Run it after deduplication (``dedup_schemas``), which
+turns per-domain copies of parameter schemas into the same ``$ref`` and so
+makes more parameters identical.
+"""
+
+import json
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+PARAMETER_REF_PREFIX = "#/components/parameters/"
+RESPONSE_REF_PREFIX = "#/components/responses/"
+SCHEMA_REF_PREFIX = "#/components/schemas/"
+
+# Values that are data rather than spec structure; nothing inside them is
+# pruned.
+DATA_KEYWORDS = frozenset({"default", "example", "enum", "const", "value"})
+
+# Keys whose empty value is required or means something: an empty ``security``
+# list disables authentication, array schemas need ``items``, parameters need
+# ``schema`` and OAuth flows need ``scopes``.
+KEEP_EMPTY = frozenset({"items", "schema", "scopes", "security"})
+
+# Mappings keyed by names rather than keywords.
+NAMED_MAPS = frozenset(
+    {
+        "properties",
+        "patternProperties",
+        "definitions",
+        "$defs",
+        "mapping",
+        "responses",
+        "content",
+        "headers",
+        "links",
+        "callbacks",
+        "encoding",
+        "variables",
+    }
+)
+
+
+@dataclass
+class CompactResult:
+    bytes_before: int = 0
+    bytes_after: int = 0
+    pruned: int = 0
+    hoisted_responses: int = 0
+    merged_parameters: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+
+def document_size(tree: Dict[str, Any]) -> int:
+    """Size of ``tree`` as minified JSON, a format-neutral measure."""
+    text = json.dumps(tree, ensure_ascii=False, separators=(",", ":"), default=str)
+    return len(text.encode("utf-8"))
+
+
+def _canonical(node: Any) -> str:
+    return json.dumps(node, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _operations(tree: Dict[str, Any]):
+    """(path, key, value) of every entry of every path item."""
+    for path, item in (tree.get("paths") or {}).items():
+        if isinstance(item, dict):
+            for key, value in item.items():
+                yield path, key, value
+
+
+def _replace_in_path_item(
+    tree: Dict[str, Any], path: str, key: str, value: Any
+) -> None:
+    # compact_document gives every path item its own shallow copy first.
+    tree["paths"][path][key] = value
+
+
+def merge_parameters(tree: Dict[str, Any], components: Dict[str, Any]) -> int:
+    parameters = components.get("parameters") or {}
+    first: Dict[str, str] = {}
+    alias: Dict[str, str] = {}
+    for name, parameter in parameters.items():
+        kept = first.setdefault(_canonical(parameter), name)
+        if kept != name:
+            alias[f"{PARAMETER_REF_PREFIX}{name}"] = f"{PARAMETER_REF_PREFIX}{kept}"
+    if not alias:
+        return 0
+    components["parameters"] = {
+        name: parameter
+        for name, parameter in parameters.items()
+        if f"{PARAMETER_REF_PREFIX}{name}" not in alias
+    }
+
+    def rewrite(refs: List[Any]) -> Optional[List[Any]]:
+        result, seen, changed = [], set(), False
+        for ref in refs:
+            target = ref.get("$ref") if isinstance(ref, dict) else None
+            if target in alias:
+                ref, target, changed = {"$ref": alias[target]}, alias[target], True
+            if target is not None and target in seen:
+                changed = True  # two parameters now point at the same one
+                continue
+            seen.add(target)
+            result.append(ref)
+        return result if changed else None
+
+    for path, key, value in list(_operations(tree)):
+        if key == "parameters" and isinstance(value, list):
+            refs = rewrite(value)
+            if refs is not None:
+                _replace_in_path_item(tree, path, key, refs)
+        elif isinstance(value, dict) and isinstance(value.get("parameters"), list):
+            refs = rewrite(value["parameters"])
+            if refs is not None:
+                _replace_in_path_item(tree, path, key, {**value, "parameters": refs})
+    return len(alias)
+
+
+def _response_name(response: Dict[str, Any], status: Any) -> str:
+    schemas = [
+        media.get("schema", {}).get("$ref", "")
+        for media in (response.get("content") or {}).values()
+        if isinstance(media, dict)
+    ]
+    if len(schemas) == 1 and schemas[0].startswith(SCHEMA_REF_PREFIX):
+        return f"{schemas[0][len(SCHEMA_REF_PREFIX):]}Response"
+    return f"Response{status}"
+
+
+def hoist_responses(tree: Dict[str, Any], components: Dict[str, Any]) -> int:
+    occurrences: Dict[str, List[Tuple[str, str, Any]]] = {}
+    objects: Dict[str, Dict[str, Any]] = {}
+    for path, method, operation in _operations(tree):
+        if not isinstance(operation, dict):
+            continue
+        for status, response in (operation.get("responses") or {}).items():
+            if isinstance(response, dict) and "$ref" not in response:
+                key = _canonical(response)
+                objects.setdefault(key, response)
+                occurrences.setdefault(key, []).append((path, method, status))
+
+    responses = dict(components.get("responses") or {})
+    taken = {_canonical(r): name for name, r in responses.items()}
+    replacements: Dict[Tuple[str, str], Dict[Any, Any]] = {}
+    hoisted = 0
+    for key, places in occurrences.items():
+        if len(places) < 2 and key not in taken:
+            continue
+        name = taken.get(key)
+        if name is None:
+            base = name = _response_name(objects[key], places[0][2])
+            suffix = 2
+            while name in responses:
+                name, suffix = f"{base}{suffix}", suffix + 1
+            responses[name] = objects[key]
+            taken[key] = name
+            hoisted += 1
+        for path, method, status in places:
+            replacements.setdefault((path, method), {})[status] = {
+                "$ref": f"{RESPONSE_REF_PREFIX}{name}"
+            }
+    if not replacements:
+        return 0
+    components["responses"] = responses
+    for (path, method), refs in replacements.items():
+        operation = tree["paths"][path][method]
+        operation = {**operation, "responses": {**operation["responses"], **refs}}
+        _replace_in_path_item(tree, path, method, operation)
+    return hoisted
+
+
+def prune_empty(node: Any, path: Tuple[Any, ...], result: CompactResult) -> Any:
+    """``node`` without empty mappings; the same object when nothing changed."""
+    if isinstance(node, list):
+        items = [prune_empty(item, path, result) for item in node]
+        if any(new is not old for new, old in zip(items, node)):
+            return items
+        return node
+    if not isinstance(node, dict):
+        return node
+
+    pruned: Dict[Any, Any] = {}
+    changed = False
+    for key, value in node.items():
+        if key in DATA_KEYWORDS or (key == "examples" and isinstance(value, list)):
+            pruned[key] = value
+            continue
+        new = prune_empty(value, path + (key,), result)
+        if (isinstance(new, dict) and not new and not _keep_empty(path, key)) or (
+            isinstance(new, list) and not new and key == "parameters"
+        ):
+            result.pruned += 1
+            changed = True
+            continue
+        changed = changed or new is not value
+        pruned[key] = new
+    return pruned if changed else node
+
+
+def _keep_empty(path: Tuple[Any, ...], key: Any) -> bool:
+    if key in KEEP_EMPTY:
+        return True
+    if not path:
+        return key == "paths"
+    # Entries of a name-keyed map: an empty schema means "any value" and an
+    # empty component is still referable.
+    if path[-1] in NAMED_MAPS or (len(path) == 2 and path[0] == "components"):
+        return True
+    # The responses of an operation are required.
+    return len(path) == 3 and path[0] == "paths" and key == "responses"
+
+
+def compact_document(tree: Dict[str, Any]) -> Tuple[Dict[str, Any], CompactResult]:
+    result = CompactResult(bytes_before=document_size(tree))
+    tree = dict(tree)
+    tree["paths"] = {
+        path: dict(item) if isinstance(item, dict) else item
+        for path, item in (tree.get("paths") or {}).items()
+    }
+    components = dict(tree.get("components") or {})
+    tree["components"] = components
+
+    result.merged_parameters = merge_parameters(tree, components)
+    result.hoisted_responses = hoist_responses(tree, components)
+    tree = prune_empty(tree, (), result)
+    result.bytes_after = document_size(tree)
+    return tree, result
@@ -0,0 +1,471 @@
+"""Decoding of plain dicts and API Gateway events into dataclasses.
+
+get_constructor backs DataclassProtocol.from_dict. The original looked up
+``inspect.signature(cls)`` for every key of every call; here the signature is
+read once per class and turned into a specialized function that picks the
+known keys out of the dict and calls the class with them, plus a bulk variant
+with the same body inlined in its loop. Unknown keys are ignored and missing
+keys fall back to the defaults, exactly as before.
+
+get_event_decoder goes further and turns a whole API Gateway v1 or v2 event
+into a typed AbstractInput instance: nested dataclasses, lists, enums and
+text-encoded numbers are decoded and union fields resolved to a concrete
+variant, following the same field types and ``_`` skipping as the schema.
+"""
+
+import base64
+import dataclasses
+import enum
+import functools
+import inspect
+import json
+import types
+import typing
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    get_args,
+    get_origin,
+)
+
+from typeinfo import field_types, type_key
+from utils import DEFAULT_KEY_CASE, get_key_converter, word_key
+
+
+@dataclass(frozen=True)
+class Constructor:
+    one: Callable[[Dict[str, Any]], Any]
+    many: Callable[[Iterable[Dict[str, Any]]], List[Any]]
+    source: str
+
+
+def _filtered_call(cls: Any, params: frozenset, attrs: Dict[str, Any]) -> Any:
+    return cls(**{k: v for k, v in attrs.items() if k in params})
+
+
+def generate_constructor_source(cls: Any) -> Tuple[str, Dict[str, Any]]:
+    """Source and globals of the ``from_dict``/``from_dicts`` pair for ``cls``."""
+    signature = inspect.signature(cls)
+    params = frozenset(signature.parameters)
+    namespace: Dict[str, Any] = {
+        "_cls": cls,
+        "_params": params,
+        "_filtered_call": _filtered_call,
+    }
+
+    simple = all(
+        p.kind in (p.POSITIONAL_OR_KEYWORD, p.KEYWORD_ONLY)
+        for p in signature.parameters.values()
+    )
+    if not simple:
+        # *args/**kwargs signatures keep the plain filtered call.
+        source = (
+            "def from_dict(attrs):\n"
+            "    return _filtered_call(_cls, _params, attrs)\n\n"
+            "def from_dicts(items):\n"
+            "    return [_filtered_call(_cls, _params, attrs) for attrs in items]\n"
+        )
+        return source, namespace
+
+    factories = set()
+    if dataclasses.is_dataclass(cls):
+        factories = {
+            f.name
+            for f in dataclasses.fields(cls)
+            if f.default_factory is not dataclasses.MISSING
+        }
+
+    fetch, call = [], []
+    for idx, (name, param) in enumerate(signature.parameters.items()):
+        if param.default is param.empty or name in factories:
+            # Required here; a missing key drops to the filtered call, which
+            # omits it so the factory runs or the usual TypeError is raised.
+            fetch.append(f"v{idx} = attrs[{name!r}]")
+        else:
+            namespace[f"_default{idx}"] = param.default
+            fetch.append(f"v{idx} = attrs.get({name!r}, _default{idx})")
+        if param.kind == param.POSITIONAL_OR_KEYWORD:
+            call.append(f"v{idx}")
+        else:
+            call.append(f"{name}=v{idx}")
+    fast = f"_cls({', '.join(call)})"
+    slow = "_filtered_call(_cls, _params, attrs)"
+
+    def body(pad: str, emit: str) -> List[str]:
+        return [
+            f"{pad}try:",
+            *(f"{pad}    {line}" for line in fetch),
+            f"{pad}except KeyError:",
+            f"{pad}    {emit.format(slow)}",
+            f"{pad}else:",
+            f"{pad}    {emit.format(fast)}",
+        ]
+
+    lines = ["def from_dict(attrs):", *body("    ", "return {}"), ""]
+    lines += ["def from_dicts(items):", "    out = []", "    append = out.append"]
+    lines += ["    for attrs in items:", *body("        ", "append({})")]
+    lines += ["    return out"]
+    return "\n".join(lines) + "\n", namespace
+
+
+@functools.lru_cache(maxsize=None)
+def get_constructor(cls: Any) -> Constructor:
+    """Compiled constructor pair for ``cls``, generated on first use."""
+    source, namespace = generate_constructor_source(cls)
+    filename = f"<constructor {cls.__module__}.{cls.__qualname__}>"
+    exec(compile(source, filename, "exec"), namespace)
+    return Constructor(namespace["from_dict"], namespace["from_dicts"], source)
+
+
+# Where each AbstractInput section lives in an API Gateway (v1 or v2) event.
+EVENT_SECTIONS = {
+    "queryStringParameters": "queryStringParameters",
+    "pathParameters": "pathParameters",
+    "headers": "headers",
+    "bodyInput": "body",
+}
+
+# How the values of each section are read: "text" for the string maps API
+# Gateway passes query values in, "path" and "header" for the same with names
+# matched as word_key (path parameters are named after the httpPath template
+# whatever the key case, and a field x_api_key has to match X-Api-Key),
+# "json" for the body. Shared with validators.
+SECTION_MODES = {
+    "queryStringParameters": "text",
+    "pathParameters": "path",
+    "headers": "header",
+    "bodyInput": "json",
+}
+
+# Modes whose names are matched by word_key; see word_key_section.
+WORD_KEY_MODES = frozenset({"path", "header"})
+
+# Text forms of a boolean, compared lower-cased; validators accepts the same.
+TEXT_BOOLEANS = {"true": True, "1": True, "false": False, "0": False}
+
+
+def is_bool_text(value: Any) -> bool:
+    return isinstance(value, bool) or str(value).lower() in TEXT_BOOLEANS
+
+
+class EventDecodeError(ValueError):
+    def __init__(self, message: str, path: List[str] | None = None):
+        super().__init__(message)
+        self.message = message
+        self.path = path or []
+
+    def __str__(self) -> str:
+        if not self.path:
+            return self.message
+        return f"{'.'.join(self.path)}: {self.message}"
+
+
+def is_union(tp: Any) -> bool:
+    return get_origin(tp) in (typing.Union, types.UnionType)
+
+
+def is_optional(tp: Any) -> bool:
+    return is_union(tp) and type(None) in get_args(tp)
+
+
+def _text_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise EventDecodeError(f"expected an integer, got {value!r}") from None
+
+
+def _text_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise EventDecodeError(f"expected a number, got {value!r}") from None
+
+
+def _text_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    try:
+        return TEXT_BOOLEANS[str(value).lower()]
+    except KeyError:
+        raise EventDecodeError(f"expected a boolean, got {value!r}") from None
+
+
+def _json_float(value: Any) -> Any:
+    return float(value) if type(value) is int else value
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+class _DecodePlanner:
+    """Builds one decoding closure per (type, mode), reused across events.
+
+    ``mode`` is one of SECTION_MODES.
+    """
+
+    def __init__(self, key_format: Optional[Callable[[str], str]]):
+        self.key_format = key_format
+        self.plans: Dict[Tuple[Any, str], Callable[[Any], Any]] = {}
+
+    def key(self, name: str, mode: str) -> str:
+        if mode in WORD_KEY_MODES:
+            return word_key(name)
+        return self.key_format(name) if self.key_format else name
+
+    def plan(self, tp: Any, mode: str) -> Callable[[Any], Any]:
+        key = (type_key(tp), mode)
+        if key in self.plans:
+            return self.plans[key]
+        if dataclasses.is_dataclass(tp):
+            # Registered before planning the fields so recursive types resolve.
+            target: List[Callable[[Any], Any]] = []
+            self.plans[key] = lambda value: target[0](value)
+            target.append(self.plan_dataclass(tp, mode))
+            self.plans[key] = target[0]
+        else:
+            self.plans[key] = self.plan_type(tp, mode)
+        return self.plans[key]
+
+    def plan_type(self, tp: Any, mode: str) -> Callable[[Any], Any]:
+        if is_union(tp):
+            args = [a for a in get_args(tp) if a is not type(None)]
+            if len(args) == 1:
+                return self.plan(args[0], mode)
+            return self.plan_union(args, mode)
+
+        if get_origin(tp) in (list, typing.List):
+            (item_type,) = get_args(tp) or (Any,)
+            item = self.plan(item_type, mode)
+            split = mode != "json"
+
+            def decode_list(value):
+                if split and isinstance(value, str):
+                    # v2 events and headers join multiple values with commas.
+                    value = value.split(",")
+                if not isinstance(value, list):
+                    raise EventDecodeError("expected an array")
+                return [item(v) for v in value]
+
+            return decode_list
+
+        if inspect.isclass(tp) and issubclass(tp, enum.Enum):
+            members = {e.value: e for e in tp}
+            if mode != "json":
+                members.update({str(e.value): e for e in tp})
+
+            def decode_enum(value):
+                try:
+                    return members[value]
+                except (KeyError, TypeError):
+                    raise EventDecodeError(
+                        f"expected one of {list(members)}, got {value!r}"
+                    ) from None
+
+            return decode_enum
+
+        if mode == "json":
+            return _json_float if tp is float else _identity
+        return {int: _text_int, float: _text_float, bool: _text_bool}.get(
+            tp, _identity
+        )
+
+    def object_keys(self, cls: Any, mode: str) -> Tuple[list, list]:
+        """Event keys of ``cls`` fields as (name, key, type), and required keys."""
+        fields, required = [], []
+        for field, field_type in field_types(cls):
+            if field.name.startswith("_") or not field.init:
+                continue
+            key = self.key(field.name, mode)
+            fields.append((field.name, key, field_type))
+            has_default = (
+                field.default is not dataclasses.MISSING
+                or field.default_factory is not dataclasses.MISSING
+            )
+            if not has_default and not is_optional(field_type):
+                required.append(key)
+        return fields, required
+
+    def plan_dataclass(self, cls: Any, mode: str) -> Callable[[Any], Any]:
+        fields, required = self.object_keys(cls, mode)
+        fields = [(name, key, self.plan(tp, mode)) for name, key, tp in fields]
+
+        def decode_dataclass(value):
+            if not isinstance(value, dict):
+                raise EventDecodeError("expected an object")
+            kwargs = {}
+            for name, key, decode in fields:
+                raw = value.get(key)
+                if raw is None:
+                    continue
+                try:
+                    kwargs[name] = decode(raw)
+                except EventDecodeError as e:
+                    e.path.insert(0, key)
+                    raise
+            try:
+                return cls(**kwargs)
+            except TypeError:
+                missing = [key for key in required if value.get(key) is None]
+                if missing:
+                    raise EventDecodeError(
+                        f"missing required fields {missing}"
+                    ) from None
+                raise
+
+        return decode_dataclass
+
+    def plan_union(self, variants: List[Any], mode: str) -> Callable[[Any], Any]:
+        objects, others = [], []
+        for variant in variants:
+            if dataclasses.is_dataclass(variant):
+                fields, required = self.object_keys(variant, mode)
+                keys = frozenset(key for _, key, _ in fields)
+                objects.append((keys, frozenset(required), self.plan(variant, mode)))
+            else:
+                others.append(self.plan(variant, mode))
+
+        def decode_union(value):
+            if isinstance(value, dict) and objects:
+                # The variant whose required keys are all present and that
+                # knows the most of the given keys wins; ties keep the
+                # declaration order.
+                present = value.keys()
+                best, best_score = None, -1
+                for keys, required, decode in objects:
+                    if required <= present:
+                        score = len(keys & present)
+                        if score > best_score:
+                            best, best_score = decode, score
+                if best is None:
+                    raise EventDecodeError("does not match any union variant")
+                return best(value)
+            for decode in others:
+                try:
+                    return decode(value)
+                except EventDecodeError:
+                    continue
+            raise EventDecodeError(f"does not match any union variant: {value!r}")
+
+        return decode_union
+
+
+def _event_body(event: Dict[str, Any]) -> Any:
+    body = event.get("body")
+    if isinstance(body, (str, bytes)) and body:
+        if event.get("isBase64Encoded"):
+            body = base64.b64decode(body)
+        try:
+            return json.loads(body)
+        except ValueError as e:
+            raise EventDecodeError(f"body is not valid JSON: {e}") from None
+    return body or None
+
+
+def _query_section(event: Dict[str, Any]) -> Any:
+    section = event.get("queryStringParameters")
+    multi = event.get("multiValueQueryStringParameters")
+    if section and multi:
+        # v1 events keep only the last value in queryStringParameters.
+        section = {
+            k: (multi[k] if len(multi.get(k) or ()) > 1 else v)
+            for k, v in section.items()
+        }
+    return section
+
+
+def word_key_section(section: Any) -> Any:
+    """``section`` keyed by word_key, as WORD_KEY_MODES look names up."""
+    if section is None:
+        return None
+    return {word_key(k): v for k, v in section.items()}
+
+
+_SECTION_READERS = {
+    "queryStringParameters": _query_section,
+    "pathParameters": lambda event: word_key_section(
+        event.get(EVENT_SECTIONS["pathParameters"])
+    ),
+    "headers": lambda event: word_key_section(event.get(EVENT_SECTIONS["headers"])),
+    "bodyInput": _event_body,
+}
+
+
+def compile_event_decoder(
+    cls: Any, key_case: str | None = DEFAULT_KEY_CASE
+) -> Callable[[Dict[str, Any]], Any]:
+    if not dataclasses.is_dataclass(cls):
+        raise ValueError(f"{cls} is not a dataclass.")
+    planner = _DecodePlanner(get_key_converter(key_case) if key_case else None)
+    sections = []
+    for field, field_type in field_types(cls):
+        if field.name not in _SECTION_READERS:
+            continue
+        has_default = (
+            field.default is not dataclasses.MISSING
+            or field.default_factory is not dataclasses.MISSING
+        )
+        sections.append(
+            (
+                field.name,
+                _SECTION_READERS[field.name],
+                planner.plan(field_type, SECTION_MODES[field.name]),
+                not has_default and not is_optional(field_type),
+            )
+        )
+
+    def decode_event(event: Dict[str, Any]) -> Any:
+        kwargs = {}
+        for name, read, decode, required in sections:
+            raw = read(event)
+            if raw is None:
+                if required:
+                    raise EventDecodeError("is required", [name])
+                continue
+            try:
+                kwargs[name] = decode(raw)
+            except EventDecodeError as e:
+                e.path.insert(0, name)
+                raise
+        return cls(**kwargs)
+
+    return decode_event
+
+
+@functools.lru_cache(maxsize=None)
+def get_event_decoder(
+    cls: Any, key_case: str | None = DEFAULT_KEY_CASE
+) -> Callable[[Dict[str, Any]], Any]:
+    """Decoder turning an API Gateway v1 or v2 event into a ``cls`` instance.
+
+    The plan for every nested type is built once, here; decoding an event
+    only runs the prepared closures. ``key_case`` is as in
+    validators.get_validator.
+    """
+    return compile_event_decoder(cls, key_case)
+
+
+def decode_event(
+    cls: Any, event: Dict[str, Any], key_case: str | None = DEFAULT_KEY_CASE
+) -> Any:
+    return get_event_decoder(cls, key_case)(event)
+
+
+@functools.lru_cache(maxsize=None)
+def get_path_parameters_decoder(cls: Any) -> Callable[[Dict[str, str]], Any]:
+    """Decoder turning a map of path parameter strings into ``cls``.
+
+    Parameters are matched to fields by word_key, like the generator matches
+    them to the httpPath template, so no key case is involved.
+    """
+    if not dataclasses.is_dataclass(cls):
+        raise ValueError(f"{cls} is not a dataclass.")
+    decode = _DecodePlanner(None).plan(cls, SECTION_MODES["pathParameters"])
+    return lambda params: decode(word_key_section(params))
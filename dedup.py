@@ -0,0 +1,133 @@
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+SCHEMA_REF_PREFIX = "#/components/schemas/"
+
+
+@dataclass
+class DedupResult:
+    removed: int = 0
+    # Size of the removed component entries as compact JSON, which is a close
+    # lower bound of what they took in any serialized form of the spec.
+    bytes_saved: int = 0
+    aliases: Dict[str, str] = field(default_factory=dict)
+
+
+def _collect_refs(node: Any, refs: List[str]) -> None:
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            ref = current.get("$ref")
+            if isinstance(ref, str) and ref.startswith(SCHEMA_REF_PREFIX):
+                refs.append(ref[len(SCHEMA_REF_PREFIX) :])
+            pending.extend(current.values())
+        elif isinstance(current, list):
+            pending.extend(current)
+
+
+def _canonical_copy(node: Any, class_ids: Dict[str, str]) -> Any:
+    # Refs to already classified schemas are replaced by their class id so
+    # that two schemas pointing at different but identical components hash
+    # the same.
+    if isinstance(node, dict):
+        copy = {
+            key: _canonical_copy(value, class_ids) for key, value in node.items()
+        }
+        ref = node.get("$ref")
+        if isinstance(ref, str) and ref.startswith(SCHEMA_REF_PREFIX):
+            class_id = class_ids.get(ref[len(SCHEMA_REF_PREFIX) :])
+            if class_id is not None:
+                copy["$ref"] = f"#class/{class_id}"
+        return copy
+    if isinstance(node, list):
+        return [_canonical_copy(item, class_ids) for item in node]
+    return node
+
+
+def _post_order(graph: Dict[str, List[str]]) -> List[str]:
+    order = []
+    state: Dict[str, int] = {}
+    for root in graph:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(graph[root]))]
+        while stack:
+            name, children = stack[-1]
+            for child in children:
+                if child in graph and child not in state:
+                    state[child] = 1
+                    stack.append((child, iter(graph[child])))
+                    break
+            else:
+                stack.pop()
+                state[name] = 2
+                order.append(name)
+    return order
+
+
+def _rewrite_refs(node: Any, aliases: Dict[str, str]) -> None:
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            ref = current.get("$ref")
+            if isinstance(ref, str) and ref.startswith(SCHEMA_REF_PREFIX):
+                target = aliases.get(ref[len(SCHEMA_REF_PREFIX) :])
+                if target is not None:
+                    current["$ref"] = f"{SCHEMA_REF_PREFIX}{target}"
+            pending.extend(current.values())
+        elif isinstance(current, list):
+            pending.extend(current)
+
+
+def deduplicate_schemas(openapi_build: Dict[str, Any]) -> DedupResult:
+    """Collapse structurally identical components.schemas entries in place.
+
+    Schemas are hashed bottom-up over the reference graph, each one once, with
+    references replaced by the hash class of their target, so identical trees
+    built from identical leaves end up in the same class. The first schema of
+    every class (in document order) is kept and every ``$ref`` in the document
+    is rewritten to it. Runs in time linear in the size of the document.
+    """
+    result = DedupResult()
+    schemas = openapi_build.get("components", {}).get("schemas") or {}
+    if len(schemas) < 2:
+        return result
+
+    graph: Dict[str, List[str]] = {}
+    for name, schema in schemas.items():
+        refs: List[str] = []
+        _collect_refs(schema, refs)
+        graph[name] = refs
+
+    class_ids: Dict[str, str] = {}
+    sizes: Dict[str, int] = {}
+    for name in _post_order(graph):
+        canonical = json.dumps(
+            _canonical_copy(schemas[name], class_ids),
+            sort_keys=True,
+            separators=(",", ":"),
+            ensure_ascii=False,
+        )
+        class_ids[name] = hashlib.sha1(canonical.encode()).hexdigest()
+        sizes[name] = len(canonical.encode()) + len(name.encode())
+
+    survivors: Dict[str, str] = {}
+    for name in schemas:
+        survivor = survivors.setdefault(class_ids[name], name)
+        if survivor != name:
+            result.aliases[name] = survivor
+
+    if not result.aliases:
+        return result
+
+    for name in result.aliases:
+        del schemas[name]
+        result.removed += 1
+        result.bytes_saved += sizes[name]
+    _rewrite_refs(openapi_build, result.aliases)
+    return result
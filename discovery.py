@@ -0,0 +1,211 @@
+import importlib
+import importlib.util
+import json
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from gen_types import GeneratorConfig
+from registry import SOURCE_MARKERS, declared_configs
+
+INDEX_VERSION = 2
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ModuleRecord:
+    name: str
+    path: str
+    mtime_ns: int
+    size: int
+    configs: List[str] = field(default_factory=list)
+
+
+@dataclass
+class DiscoveredModule:
+    record: ModuleRecord
+    configs: List[Tuple[str, GeneratorConfig]]
+    imported: bool
+
+
+class EndpointDiscovery:
+    """Collect every endpoint declared at module level in a tree.
+
+    Endpoints are ``GeneratorConfig`` values and handlers registered with
+    ``EndpointRegistry.endpoint``, as in ``registry.declared_configs``.
+
+    Modules are stat-ed and imported on a bounded thread pool. An optional
+    mtime index (a JSON file) remembers which modules declared no endpoints,
+    so unchanged modules are skipped without being read or imported again.
+    Modules that do declare endpoints are reused from ``sys.modules`` when
+    their file has not changed and reloaded when it has.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        index_file: Optional[str] = None,
+        exclude: Sequence[str] = (),
+        source_markers: Sequence[str] = SOURCE_MARKERS,
+    ):
+        if max_workers < 1:
+            raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+        self.max_workers = max_workers
+        self.index_file = index_file
+        self.exclude = tuple(exclude)
+        self.source_markers = tuple(m.encode() for m in source_markers)
+        self.index: Dict[str, ModuleRecord] = self._load_index()
+        self.imported = 0
+        self.skipped = 0
+        self._loaded_mtimes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _load_index(self) -> Dict[str, ModuleRecord]:
+        if not self.index_file or not os.path.exists(self.index_file):
+            return {}
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable discovery index %s", self.index_file)
+            return {}
+        if raw.get("version") != INDEX_VERSION:
+            return {}
+        return {name: ModuleRecord(**rec) for name, rec in raw["modules"].items()}
+
+    def save_index(self) -> None:
+        if not self.index_file:
+            return
+        directory = os.path.dirname(os.path.abspath(self.index_file))
+        os.makedirs(directory, exist_ok=True)
+        payload = {
+            "version": INDEX_VERSION,
+            "modules": {
+                name: rec.__dict__ for name, rec in sorted(self.index.items())
+            },
+        }
+        tmp_file = f"{self.index_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp_file, self.index_file)
+
+    def iter_package_modules(self, package: str) -> List[Tuple[str, str]]:
+        spec = importlib.util.find_spec(package)
+        if spec is None:
+            raise ValueError(f"Package not found: {package}")
+        if not spec.submodule_search_locations:
+            return [(package, spec.origin)]
+
+        modules = []
+        for location in spec.submodule_search_locations:
+            init_file = os.path.join(location, "__init__.py")
+            if os.path.exists(init_file):
+                modules.append((package, init_file))
+            modules.extend(self._walk(location, f"{package}."))
+        return modules
+
+    def iter_directory_modules(self, directory: str) -> List[Tuple[str, str]]:
+        directory = os.path.abspath(directory)
+        if not os.path.isdir(directory):
+            raise ValueError(f"Directory not found: {directory}")
+        if directory not in sys.path:
+            sys.path.insert(0, directory)
+        return self._walk(directory, "")
+
+    def _walk(self, root: str, prefix: str) -> List[Tuple[str, str]]:
+        modules = []
+        pending = [(root, prefix)]
+        while pending:
+            current, current_prefix = pending.pop()
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.name.startswith((".", "__pycache__")):
+                        continue
+                    if entry.is_dir():
+                        init_file = os.path.join(entry.path, "__init__.py")
+                        if os.path.exists(init_file):
+                            package = f"{current_prefix}{entry.name}"
+                            modules.append((package, init_file))
+                            pending.append((entry.path, f"{package}."))
+                    elif entry.name.endswith(".py") and entry.name != "__init__.py":
+                        name = f"{current_prefix}{entry.name[:-3]}"
+                        modules.append((name, entry.path))
+        return [
+            (name, path)
+            for name, path in sorted(modules)
+            if not name.endswith("__main__")
+            and not any(fnmatch(name, pattern) for pattern in self.exclude)
+        ]
+
+    def _visit(self, name: str, path: str) -> DiscoveredModule:
+        stat = os.stat(path)
+        previous = self.index.get(name)
+        unchanged = (
+            previous is not None
+            and previous.mtime_ns == stat.st_mtime_ns
+            and previous.size == stat.st_size
+        )
+        record = ModuleRecord(name, path, stat.st_mtime_ns, stat.st_size)
+
+        if unchanged and not previous.configs:
+            return DiscoveredModule(previous, [], False)
+
+        if not unchanged and self.source_markers:
+            with open(path, "rb") as f:
+                source = f.read()
+            if not any(marker in source for marker in self.source_markers):
+                return DiscoveredModule(record, [], False)
+
+        module = self._import(name, stat.st_mtime_ns)
+        configs = declared_configs(module)
+        record.configs = [attr for attr, _ in configs]
+        return DiscoveredModule(record, configs, True)
+
+    def _import(self, name: str, mtime_ns: int):
+        module = sys.modules.get(name)
+        with self._lock:
+            loaded_mtime = self._loaded_mtimes.get(name)
+            self._loaded_mtimes[name] = mtime_ns
+            self.imported += 1
+        if module is None:
+            return importlib.import_module(name)
+        if loaded_mtime is not None and loaded_mtime != mtime_ns:
+            return importlib.reload(module)
+        return module
+
+    def discover(self, modules: Iterable[Tuple[str, str]]) -> List[GeneratorConfig]:
+        modules = list(modules)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(lambda m: self._visit(*m), modules))
+
+        configs = []
+        seen = set()
+        for result in results:
+            self.index[result.record.name] = result.record
+            if not result.imported:
+                self.skipped += 1
+            for _, config in result.configs:
+                if id(config) not in seen:
+                    seen.add(id(config))
+                    configs.append(config)
+
+        logger.info(
+            "Discovered %d endpoint configs in %d modules (%d skipped)",
+            len(configs),
+            len(modules),
+            self.skipped,
+        )
+        self.save_index()
+        return configs
+
+    def discover_package(self, package: str) -> List[GeneratorConfig]:
+        return self.discover(self.iter_package_modules(package))
+
+    def discover_directory(self, directory: str) -> List[GeneratorConfig]:
+        return self.discover(self.iter_directory_modules(directory))
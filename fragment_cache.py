@@ -0,0 +1,200 @@
+import ast
+import dataclasses
+import enum
+import hashlib
+import inspect
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple, get_args
+
+from gen_types import GeneratorConfig, ServiceFragment
+from schema_cache import clone_schema
+from typeinfo import field_types
+
+CACHE_VERSION = 4
+
+CONFIG_KEY_FIELDS = (
+    "serviceName",
+    "description",
+    "operationId",
+    "httpMethod",
+    "httpPath",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SourceHasher:
+    """Fingerprint classes by the source text of their definition.
+
+    Each module file is parsed once per (path, mtime) and every class in it
+    is hashed by its own line range, so editing one dataclass only changes the
+    fingerprint of that class and of the endpoints that reach it.
+    """
+
+    def __init__(self):
+        self._modules: Dict[str, Tuple[int, Dict[str, str]]] = {}
+        self._classes: Dict[type, str] = {}
+
+    def _module_hashes(self, path: str) -> Dict[str, str]:
+        mtime_ns = os.stat(path).st_mtime_ns
+        cached = self._modules.get(path)
+        if cached is not None and cached[0] == mtime_ns:
+            return cached[1]
+
+        with open(path, "rb") as f:
+            source = f.read()
+        lines = source.splitlines(keepends=True)
+        hashes = {}
+        pending = [(node, "") for node in ast.parse(source).body]
+        while pending:
+            node, prefix = pending.pop()
+            if not isinstance(node, ast.ClassDef):
+                continue
+            qualname = f"{prefix}{node.name}"
+            first = min([node.lineno] + [d.lineno for d in node.decorator_list])
+            segment = b"".join(lines[first - 1 : node.end_lineno])
+            hashes[qualname] = hashlib.sha256(segment).hexdigest()
+            pending.extend((child, f"{qualname}.") for child in node.body)
+
+        self._modules[path] = (mtime_ns, hashes)
+        return hashes
+
+    def _structural_hash(self, cls: type) -> str:
+        # Classes built at runtime have no source to hash; fall back to what
+        # the generator actually reads from them.
+        parts = [cls.__qualname__]
+        if dataclasses.is_dataclass(cls):
+            for field in dataclasses.fields(cls):
+                parts.append(f"{field.name}:{field.type!r}={field.default!r}")
+        if issubclass(cls, enum.Enum):
+            parts.extend(repr(member.value) for member in cls)
+        for attr in ("domainName", "bodyInput"):
+            parts.append(f"{attr}={getattr(cls, attr, None)!r}")
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def class_hash(self, cls: type) -> str:
+        cached = self._classes.get(cls)
+        if cached is not None:
+            return cached
+
+        module = sys.modules.get(cls.__module__)
+        path = getattr(module, "__file__", None)
+        digest = None
+        if path and path.endswith(".py") and os.path.exists(path):
+            digest = self._module_hashes(path).get(cls.__qualname__)
+        if digest is None:
+            digest = self._structural_hash(cls)
+
+        self._classes[cls] = digest
+        return digest
+
+    def invalidate(self) -> None:
+        self._classes.clear()
+
+
+def iter_referenced_types(root: Any) -> Iterator[Any]:
+    """Yield every class reachable from ``root`` through dataclass fields."""
+    seen = set()
+    pending = [root]
+    while pending:
+        current = pending.pop()
+        args = get_args(current)
+        if args:
+            pending.extend(reversed(args))
+            continue
+        if not inspect.isclass(current) or current in seen:
+            continue
+        seen.add(current)
+        yield current
+        if dataclasses.is_dataclass(current):
+            pending.extend(
+                base for base in current.__mro__[1:] if dataclasses.is_dataclass(base)
+            )
+            pending.extend(reversed([tp for _, tp in field_types(current)]))
+
+
+class FragmentCache:
+    """On-disk store of ServiceFragment objects for incremental builds.
+
+    Entries are keyed by a hash of the endpoint's GeneratorConfig values, the
+    generator options that shape fragments, and the source of every class
+    reachable from ``serviceInput``/``serviceOutput``. Entries not used by the
+    last build are pruned when the cache is saved.
+    """
+
+    def __init__(self, path: str, hasher: Optional[SourceHasher] = None):
+        self.path = path
+        self.hasher = hasher or SourceHasher()
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+        self._used: set = set()
+        self._dirty = False
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable fragment cache %s", self.path)
+            return {}
+        if raw.get("version") != CACHE_VERSION:
+            return {}
+        return raw["entries"]
+
+    def key_for(self, service: GeneratorConfig, options: Dict[str, Any]) -> str:
+        digest = hashlib.sha256()
+        digest.update(f"v{CACHE_VERSION}".encode())
+        digest.update(json.dumps(options, sort_keys=True).encode())
+        for attr in CONFIG_KEY_FIELDS:
+            digest.update(f"\0{attr}={getattr(service, attr)}".encode())
+        for root in (service.serviceInput, service.serviceOutput):
+            for cls in iter_referenced_types(root):
+                digest.update(f"\0{cls.__module__}.{cls.__qualname__}".encode())
+                if cls.__module__ == "builtins":
+                    continue
+                digest.update(self.hasher.class_hash(cls).encode())
+                if dataclasses.is_dataclass(cls):
+                    for field in dataclasses.fields(cls):
+                        digest.update(f"\0{field.name}:{field.type!r}".encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[ServiceFragment]:
+        entry = self._entries.get(key)
+        self._used.add(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return ServiceFragment(**clone_schema(entry))
+
+    def put(self, key: str, fragment: ServiceFragment) -> None:
+        self._entries[key] = dataclasses.asdict(fragment)
+        self._used.add(key)
+        self._dirty = True
+
+    def save(self) -> None:
+        if set(self._entries) - self._used:
+            self._entries = {k: v for k, v in self._entries.items() if k in self._used}
+            self._dirty = True
+        if not self._dirty:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{self.path}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "entries": self._entries}, f)
+        os.replace(tmp_file, self.path)
+        self._dirty = False
+
+    def lookup_all(
+        self, services: List[GeneratorConfig], options: Dict[str, Any]
+    ) -> Tuple[List[str], List[Optional[ServiceFragment]]]:
+        keys = [self.key_for(service, options) for service in services]
+        return keys, [self.get(key) for key in keys]
@@ -1,16 +1,19 @@
 
 from dataclasses import dataclass
-import inspect
-from typing import Type, TypeVar, Generic
+from typing import Any, Dict, Iterable, List, Type, TypeVar, Generic
 from typing import Protocol
 
+from decoding import get_constructor
+
 class DataclassProtocol(Protocol):
     @classmethod
-    def from_dict(cls, attrs: dict):      
-        return cls(**{
-            k: v for k, v in attrs.items() 
-            if k in inspect.signature(cls).parameters
-        })
+    def from_dict(cls, attrs: dict):
+        # Keys not in the signature are dropped; see decoding.get_constructor.
+        return get_constructor(cls).one(attrs)
+
+    @classmethod
+    def from_dicts(cls, items: Iterable[dict]) -> List[Any]:
+        return get_constructor(cls).many(items)
 
 QP = TypeVar("QP", bound=DataclassProtocol)
 B = TypeVar("B", bound=DataclassProtocol)
@@ -54,4 +57,29 @@ class GeneratorConfig:
     httpMethod: str
     httpPath: str
     serviceInput: Type[AbstractInput]
-    serviceOutput: Type[AbstractOutput] 
+    serviceOutput: Type[AbstractOutput]
+
+
+@dataclass
+class ServiceFragment:
+    """Reflected, picklable form of one GeneratorConfig.
+
+    Built independently per endpoint (possibly in a worker process) and
+    merged into the spec in declaration order.
+    """
+
+    serviceName: str
+    operationId: str
+    summary: str
+    httpPath: str
+    httpMethod: str
+    domainName: str
+    inputName: str
+    inputProperties: Dict[str, Any]
+    inputDefs: Dict[str, Any]
+    hasBodyInput: bool
+    outputName: str
+    outputIsDataclass: bool
+    outputDefs: Dict[str, Any]
+    bodyOutputName: str
+    bodyContentType: str
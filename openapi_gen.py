@@ -0,0 +1,337 @@
+"""Command line interface of the generator.
+
+    python -m openapi_gen generate --config example_service_endpoint:endpoint_config
+    python -m openapi_gen check --package services -o openapi.yaml
+    python -m openapi_gen stats --directory services --top 5
+    python -m openapi_gen bench generate --endpoints 1000
+
+``check`` exits with status 1 when the files on disk differ from what
+``generate`` would write, which makes it usable as a pre-commit hook. Only
+argparse is imported at startup; the generator and everything it needs are
+imported by the command that uses them, so ``--help`` and argument errors
+return immediately. bench/bench_startup.py guards the startup cost.
+"""
+
+import argparse
+import os
+import sys
+from typing import List, Optional, Tuple
+
+# OutputFormat values, repeated here so building the parser does not import
+# the generator.
+FORMATS = ("yaml", "json", "json-pretty")
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench")
+
+
+def load_configs(spec: str) -> list:
+    """GeneratorConfigs named by ``module:attr``, or all of ``module``'s.
+
+    ``attr`` may name a config, a list of them, an EndpointRegistry or a
+    handler registered with one. Without ``attr``, every config the module
+    declares at module level or on a decorated handler is used.
+    """
+    import importlib
+
+    from gen_types import GeneratorConfig
+    from registry import EndpointRegistry, bound_config, declared_configs
+
+    module_name, _, attr = spec.partition(":")
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError as exc:
+        raise ValueError(f"Cannot import {module_name}: {exc}") from exc
+    if not attr:
+        return [config for _, config in declared_configs(module)]
+    if not hasattr(module, attr):
+        raise ValueError(f"Module {module_name} has no attribute {attr}.")
+    value = getattr(module, attr)
+    if isinstance(value, EndpointRegistry):
+        return value.configs()
+    config = bound_config(value)
+    if config is not None:
+        return [config]
+    configs = list(value) if isinstance(value, (list, tuple)) else [value]
+    for config in configs:
+        if not isinstance(config, GeneratorConfig):
+            raise ValueError(f"{spec} is not a GeneratorConfig or a list of them.")
+    return configs
+
+
+def compression(value: str) -> Tuple[str, int]:
+    """``gz``, ``xz:9``, ... as a (suffix, level) pair."""
+    from output_sink import COMPRESSORS
+
+    suffix, _, level = value.partition(":")
+    if suffix not in COMPRESSORS:
+        raise argparse.ArgumentTypeError(
+            f"unknown compression {suffix!r} (choose from {', '.join(COMPRESSORS)})"
+        )
+    try:
+        return suffix, int(level) if level else COMPRESSORS[suffix][1]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid level {level!r}") from None
+
+
+def build_generator(args: argparse.Namespace, output_file: str, **options):
+    from _tool import OpenApiGenerator, OutputFormat, SearchEndpointDeclaration
+
+    if args.package:
+        source = {
+            "search_endpoint_declaration": SearchEndpointDeclaration.PackageScan,
+            "scan_package": args.package,
+        }
+    elif args.directory:
+        source = {
+            "search_endpoint_declaration": SearchEndpointDeclaration.DirectoryScan,
+            "scan_directory": args.directory,
+        }
+    else:
+        configs = [config for spec in args.config for config in load_configs(spec)]
+        if not configs:
+            raise ValueError(f"No GeneratorConfig found in {', '.join(args.config)}.")
+        source = {
+            "search_endpoint_declaration": SearchEndpointDeclaration.EndpointConfigList,
+            "endpoint_configs": configs,
+        }
+
+    generator = OpenApiGenerator(
+        openapi_version=args.openapi_version,
+        output_openapi_file=output_file,
+        to_camel_case_schemas=not args.no_camel_case,
+        scan_exclude=args.exclude,
+        discovery_index_file=args.discovery_index,
+        fragment_cache_file=args.fragment_cache,
+        stream_output=args.stream,
+        dedup_schemas=args.dedup,
+        compact_output=args.compact,
+        precompress=dict(args.precompress or ()),
+        split_output=args.split,
+        output_format=[OutputFormat(fmt) for fmt in args.format or ["yaml"]],
+        schema_key_case=args.key_case,
+        **source,
+        **options,
+    )
+    generator.build_openapi_base(args.title, args.description, args.api_version)
+    return generator
+
+
+def command_generate(args: argparse.Namespace) -> int:
+    generator = build_generator(
+        args,
+        args.output,
+        skip_unchanged_writes=args.skip_unchanged,
+        stats_file=args.stats_file,
+    )
+    if args.watch:
+        from watch import SpecWatcher
+
+        SpecWatcher(generator, roots=args.watch_root or None, jobs=args.jobs).run()
+        return 0
+    generator.generate(jobs=args.jobs)
+    for path in generator.output_files.values():
+        print(f"OpenAPI file generated at {path}")
+    return 0
+
+
+def command_check(args: argparse.Namespace) -> int:
+    import filecmp
+    import tempfile
+
+    target_dir = os.path.dirname(os.path.abspath(args.output))
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, os.path.basename(args.output))
+        build_generator(args, output_file).generate(jobs=args.jobs)
+        stale = []
+        for directory, _, files in os.walk(tmp):
+            for name in files:
+                expected = os.path.join(directory, name)
+                relative = os.path.relpath(expected, tmp)
+                actual = os.path.join(target_dir, relative)
+                if not os.path.isfile(actual) or not filecmp.cmp(
+                    expected, actual, shallow=False
+                ):
+                    stale.append(relative)
+    if stale:
+        for relative in sorted(stale):
+            print(f"out of date: {os.path.join(target_dir, relative)}")
+        print(f"Run generate to update {len(stale)} file(s).", file=sys.stderr)
+        return 1
+    print("OpenAPI output is up to date.")
+    return 0
+
+
+def command_stats(args: argparse.Namespace) -> int:
+    import json
+    import tempfile
+
+    # The output is written, so write times are included, but to a scratch
+    # directory: asking for numbers should not touch the spec.
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, os.path.basename(args.output))
+        generator = build_generator(
+            args, output_file, collect_stats=True, stats_file=args.stats_file
+        )
+        generator.generate(jobs=args.jobs)
+    stats = generator.stats
+    stats.slowest_n = args.top
+    if args.json:
+        print(json.dumps(stats.as_dict(), indent=2))
+        return 0
+    print("phases:")
+    for name, seconds in stats.phases.items():
+        print(f"  {name:<24} {seconds * 1000:10.1f} ms")
+    print("counters:")
+    for name, value in stats.counters.items():
+        print(f"  {name:<24} {value}")
+    print(f"slowest endpoints (top {args.top}):")
+    for cost in stats.slowest():
+        print(
+            f"  {cost.totalSeconds * 1000:8.2f} ms  "
+            f"{cost.httpMethod.upper():<7} {cost.httpPath}"
+        )
+    return 0
+
+
+def bench_names() -> List[str]:
+    return sorted(
+        name[len("bench_") : -len(".py")]
+        for name in os.listdir(BENCH_DIR)
+        if name.startswith("bench_") and name.endswith(".py")
+    )
+
+
+def command_bench(args: argparse.Namespace) -> int:
+    if args.name is None:
+        print("available benchmarks: " + ", ".join(bench_names()))
+        return 0
+    if args.name not in bench_names():
+        raise ValueError(
+            f"Unknown benchmark {args.name!r}; choose from {', '.join(bench_names())}."
+        )
+    import runpy
+
+    path = os.path.join(BENCH_DIR, f"bench_{args.name}.py")
+    argv = sys.argv
+    # As when run directly: the scripts import their sibling helpers.
+    sys.path.insert(0, BENCH_DIR)
+    sys.argv = [path, *args.args]
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as exc:
+        return exc.code if isinstance(exc.code, int) else int(exc.code is not None)
+    finally:
+        sys.argv = argv
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="openapi_gen", description="Generate OpenAPI specs from dataclasses."
+    )
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="log progress to stderr"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = argparse.ArgumentParser(add_help=False)
+    source = build.add_argument_group("endpoints")
+    source = source.add_mutually_exclusive_group(required=True)
+    source.add_argument(
+        "--config",
+        action="append",
+        metavar="MODULE[:ATTR]",
+        help="GeneratorConfig (or list of them) to document; repeatable",
+    )
+    source.add_argument("--package", help="scan this package for endpoints")
+    source.add_argument("--directory", help="scan this directory for endpoints")
+    build.add_argument("--exclude", action="append", metavar="GLOB")
+    build.add_argument("--discovery-index", metavar="FILE")
+    build.add_argument("--fragment-cache", metavar="FILE")
+
+    output = build.add_argument_group("output")
+    output.add_argument("-o", "--output", default="output_openapi.yaml")
+    output.add_argument(
+        "--format",
+        action="append",
+        choices=FORMATS,
+        help="output format; repeat to write several (default: yaml)",
+    )
+    output.add_argument("--title", default="Service")
+    output.add_argument("--description", default="Description")
+    output.add_argument("--api-version", default="1.0")
+    output.add_argument("--openapi-version", default="3.1.0")
+    output.add_argument("--key-case", default="camel")
+    output.add_argument("--no-camel-case", action="store_true")
+    output.add_argument("--dedup", action="store_true")
+    output.add_argument(
+        "--compact",
+        action="store_true",
+        help="prune empty mappings, share repeated responses, flow-style YAML",
+    )
+    output.add_argument(
+        "--precompress",
+        action="append",
+        type=compression,
+        metavar="gz|xz[:LEVEL]",
+        help="also write a compressed sibling of every file; repeatable",
+    )
+    output.add_argument("--split", action="store_true")
+    output.add_argument("--stream", action="store_true")
+    build.add_argument(
+        "-j",
+        "--jobs",
+        type=lambda value: None if value == "auto" else int(value),
+        default=1,
+        help="worker processes, or 'auto' for one per CPU",
+    )
+
+    generate = commands.add_parser(
+        "generate", parents=[build], help="write the OpenAPI spec"
+    )
+    generate.add_argument("--skip-unchanged", action="store_true")
+    generate.add_argument("--stats-file", metavar="FILE")
+    generate.add_argument(
+        "--watch", action="store_true", help="rebuild whenever a source changes"
+    )
+    generate.add_argument("--watch-root", action="append", metavar="DIR")
+    generate.set_defaults(handler=command_generate)
+
+    check = commands.add_parser(
+        "check", parents=[build], help="exit 1 if the written spec is out of date"
+    )
+    check.set_defaults(handler=command_check)
+
+    stats = commands.add_parser(
+        "stats", parents=[build], help="build and print timings and counters"
+    )
+    stats.add_argument("--top", type=int, default=10, metavar="N")
+    stats.add_argument("--json", action="store_true")
+    stats.add_argument("--stats-file", metavar="FILE")
+    stats.set_defaults(handler=command_stats)
+
+    bench = commands.add_parser("bench", help="run a script from bench/")
+    bench.add_argument("name", nargs="?", help="e.g. generate for bench_generate.py")
+    bench.add_argument("args", nargs=argparse.REMAINDER)
+    bench.set_defaults(handler=command_bench)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.verbose:
+        import logging
+
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Endpoint modules are imported by name, relative to where we are run.
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    try:
+        return args.handler(args)
+    except ValueError as exc:
+        print(f"openapi_gen: error: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
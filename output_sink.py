@@ -0,0 +1,282 @@
+import hashlib
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, List, Optional, TextIO, Tuple
+
+DIGEST_SUFFIX = ".sha256"
+
+# Temporary files are created with the mode open() uses, so the process umask
+# applies as it would to a file written in place (mkstemp forces 0600).
+_TEMP_FLAGS = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+_TEMP_ATTEMPTS = 100
+
+
+def _open_gzip(raw: BinaryIO, name: str, level: int) -> BinaryIO:
+    import gzip
+
+    # mtime 0 so that identical output compresses to identical bytes.
+    return gzip.GzipFile(
+        filename=name, mode="wb", compresslevel=level, fileobj=raw, mtime=0
+    )
+
+
+def _open_xz(raw: BinaryIO, name: str, level: int) -> BinaryIO:
+    import lzma
+
+    return lzma.LZMAFile(raw, "wb", preset=level)
+
+
+# Sibling suffix -> (opener, default level). The compression modules are only
+# imported by builds that use them.
+COMPRESSORS: Dict[str, Tuple[Callable[[BinaryIO, str, int], BinaryIO], int]] = {
+    "gz": (_open_gzip, 9),
+    "xz": (_open_xz, 6),
+}
+
+# Encoded text is handed to the compressors in chunks of this size rather
+# than per emitter write, which is often a single token.
+COMPRESS_CHUNK_SIZE = 1 << 16
+
+
+def compression_levels(formats) -> Dict[str, int]:
+    """``{suffix: level}`` from a mapping, or from suffixes using defaults."""
+    for suffix in formats:
+        if suffix not in COMPRESSORS:
+            raise ValueError(
+                f"Unknown compression {suffix!r}; expected one of "
+                f"{', '.join(COMPRESSORS)}."
+            )
+    if not isinstance(formats, dict):
+        return {suffix: COMPRESSORS[suffix][1] for suffix in formats}
+    for suffix, level in formats.items():
+        # Both gzip levels and xz presets run from 0 to 9.
+        if not isinstance(level, int) or not 0 <= level <= 9:
+            raise ValueError(
+                f"Compression level for {suffix} must be 0-9, not {level!r}."
+            )
+    return dict(formats)
+
+
+@dataclass
+class CompressionStats:
+    bytes_in: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ratio(self) -> float:
+        return self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+
+
+class _Compressor:
+    """One ``.gz``/``.xz`` sibling being written to a temporary file."""
+
+    def __init__(self, suffix: str, level: int, path: str):
+        self.path = f"{path}.{suffix}"
+        fd, self.tmp_path = AtomicFileSink._temp_file(self.path)
+        self.raw = os.fdopen(fd, "wb")
+        opener = COMPRESSORS[suffix][0]
+        self.stream = opener(self.raw, os.path.basename(path), level)
+        self.seconds = 0.0
+
+    def write(self, data) -> None:
+        start = time.perf_counter()
+        self.stream.write(data)
+        self.seconds += time.perf_counter() - start
+
+    def close(self) -> int:
+        """Finish the stream; returns the compressed size."""
+        start = time.perf_counter()
+        self.stream.close()
+        self.seconds += time.perf_counter() - start
+        size = self.raw.tell()
+        self.raw.close()
+        return size
+
+    def discard(self) -> None:
+        try:
+            self.stream.close()
+        except (OSError, ValueError):
+            pass
+        self.raw.close()
+        if os.path.exists(self.tmp_path):
+            os.unlink(self.tmp_path)
+
+
+class _HashingWriter:
+    """Text stream that hashes everything written through it."""
+
+    def __init__(
+        self,
+        stream: TextIO,
+        encoding: str,
+        compressors: Optional[List[_Compressor]] = None,
+    ):
+        self.stream = stream
+        self.encoding = encoding
+        self.digest = hashlib.sha256()
+        self.size = 0
+        # Encoded bytes are also fed to the compressors, so the siblings are
+        # written in the same pass as the file itself.
+        self.compressors = compressors or []
+        self._pending = bytearray()
+
+    def write(self, text: str) -> int:
+        data = text.encode(self.encoding)
+        self.digest.update(data)
+        self.size += len(data)
+        if self.compressors:
+            self._pending += data
+            if len(self._pending) >= COMPRESS_CHUNK_SIZE:
+                self._compress()
+        return self.stream.write(text)
+
+    def _compress(self) -> None:
+        for compressor in self.compressors:
+            compressor.write(self._pending)
+        self._pending.clear()
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def close_compressors(self) -> List[int]:
+        """Finish every compressed stream; returns their sizes."""
+        if self._pending:
+            self._compress()
+        return [compressor.close() for compressor in self.compressors]
+
+
+class AtomicFileSink:
+    """Write generated files atomically, optionally skipping unchanged ones.
+
+    Content is written to a temporary file in the target directory while it
+    is hashed, then renamed over the target, so readers never see a partial
+    file. With ``skip_unchanged`` the digest is also kept in a
+    ``<file>.sha256`` sidecar (``sha256sum`` format); when the new digest
+    matches it and the file was not touched since, the temporary file is
+    dropped and the target keeps its mtime.
+
+    ``compress`` maps sibling suffixes (``gz``, ``xz``) to compression levels;
+    every file then also gets a ``<file>.gz`` / ``<file>.xz`` sibling,
+    compressed from the encoded text as it is written and replaced together
+    with the file. ``compression`` holds the sizes and time per suffix.
+    """
+
+    def __init__(
+        self,
+        skip_unchanged: bool = False,
+        encoding: str = "utf-8",
+        compress: Optional[Dict[str, int]] = None,
+    ):
+        self.skip_unchanged = skip_unchanged
+        self.encoding = encoding
+        self.compress = compression_levels(compress or {})
+        self.compression = {suffix: CompressionStats() for suffix in self.compress}
+        self.written = 0
+        self.skipped = 0
+        # Encoded size of the files written, skipped ones excluded.
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest_file(path: str) -> str:
+        return f"{path}{DIGEST_SUFFIX}"
+
+    def recorded_digest(self, path: str) -> Optional[str]:
+        """Digest from the sidecar, if it still describes ``path``."""
+        sidecar = self.digest_file(path)
+        try:
+            # The sidecar is written after the file, so a file modified by
+            # anything else since is newer than its sidecar.
+            if os.stat(path).st_mtime_ns > os.stat(sidecar).st_mtime_ns:
+                return None
+            with open(sidecar, "r", encoding="utf-8") as f:
+                return f.read().split(maxsplit=1)[0]
+        except (OSError, IndexError):
+            return None
+
+    def _replace(self, tmp_path: str, path: str) -> None:
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _temp_file(path: str) -> Tuple[int, str]:
+        directory = os.path.dirname(os.path.abspath(path))
+        prefix = f".{os.path.basename(path)}."
+        for _ in range(_TEMP_ATTEMPTS):
+            tmp_path = os.path.join(directory, f"{prefix}{os.urandom(6).hex()}.tmp")
+            try:
+                return os.open(tmp_path, _TEMP_FLAGS, 0o666), tmp_path
+            except FileExistsError:
+                continue
+        raise FileExistsError(f"No unused temporary name for {path}.")
+
+    def _write_sidecar(self, path: str, digest: str) -> None:
+        sidecar = self.digest_file(path)
+        fd, tmp_path = self._temp_file(sidecar)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(f"{digest}  {os.path.basename(path)}\n")
+            self._replace(tmp_path, sidecar)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def write(
+        self, path: str, emit: Callable[[TextIO], None], buffering: int = -1
+    ) -> bool:
+        """Write what ``emit`` writes to its stream to ``path``.
+
+        Returns False when the write was skipped because nothing changed.
+        """
+        fd, tmp_path = self._temp_file(path)
+        compressors: List[_Compressor] = []
+        try:
+            for suffix, level in self.compress.items():
+                compressors.append(_Compressor(suffix, level, path))
+            with os.fdopen(
+                fd, "w", encoding=self.encoding, buffering=buffering
+            ) as stream:
+                writer = _HashingWriter(stream, self.encoding, compressors)
+                emit(writer)
+            sizes = writer.close_compressors()
+            digest = writer.digest.hexdigest()
+            if (
+                self.skip_unchanged
+                and digest == self.recorded_digest(path)
+                and all(os.path.exists(c.path) for c in compressors)
+            ):
+                os.unlink(tmp_path)
+                for compressor in compressors:
+                    os.unlink(compressor.tmp_path)
+                with self._lock:
+                    self.skipped += 1
+                return False
+            for compressor in compressors:
+                self._replace(compressor.tmp_path, compressor.path)
+            self._replace(tmp_path, path)
+        except BaseException:
+            for compressor in compressors:
+                compressor.discard()
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            for suffix, compressor, size in zip(self.compress, compressors, sizes):
+                totals = self.compression[suffix]
+                totals.bytes_in += writer.size
+                totals.bytes_out += size
+                totals.seconds += compressor.seconds
+
+        if self.skip_unchanged:
+            self._write_sidecar(path, digest)
+        with self._lock:
+            self.written += 1
+            self.bytes_written += writer.size
+        return True
@@ -0,0 +1,240 @@
+"""Indexed registry of endpoints, declared with a decorator on their handler.
+
+    from registry import registry
+
+    @registry.endpoint(
+        serviceInput=RequestSchema,
+        serviceOutput=ResponseSchema,
+        httpMethod="GET",
+        httpPath="world/{userId}",
+        serviceName="MyService",
+    )
+    def my_endpoint(event, context):
+        ...
+
+The decorator builds a ``GeneratorConfig`` (operationId defaults to the
+camelCased handler name, description to the first docstring line), attaches
+it to the handler as ``handler.endpoint_config`` and returns the handler
+unchanged. Lookups by operationId, by (method, path) and by domain are dict
+lookups, and duplicates are rejected when they are registered, not when the
+spec is written. ``OpenApiGenerator`` reads a registry directly with
+``SearchEndpointDeclaration.Registry``.
+"""
+
+import re
+import threading
+import types
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from gen_types import GeneratorConfig
+from utils import snake_case_to_camel_case
+
+_PATH_PARAMETER = re.compile(r"\{[^}/+]*(\+?)\}")
+
+# Text any module declaring endpoints contains: a GeneratorConfig or a call
+# to an ``endpoint`` decorator. Scans skip other files without importing them.
+SOURCE_MARKERS = ("GeneratorConfig", "endpoint(")
+
+
+class EndpointConflictError(ValueError):
+    """An endpoint reuses the operationId or route of a registered one."""
+
+
+def route_key(httpMethod: str, httpPath: str) -> Tuple[str, str]:
+    """Method and path of a route, normalized for conflict detection.
+
+    Parameter names are dropped because ``/users/{id}`` and
+    ``/users/{userId}`` match the same requests. Greedy parameters become
+    ``{+}``: ``/files/{id}`` and ``/files/{proxy+}`` are distinct routes, as
+    in API Gateway and router.PathRouter.
+    """
+    path = httpPath if httpPath.startswith("/") else f"/{httpPath}"
+    return httpMethod.upper(), _PATH_PARAMETER.sub(r"{\1}", path.rstrip("/") or "/")
+
+
+def domain_of(config: GeneratorConfig) -> str:
+    # Same grouping as the tags in the generated spec.
+    return getattr(config.serviceInput, "domainName", "_").capitalize()
+
+
+def bound_config(value: Any) -> Optional[GeneratorConfig]:
+    """The config a module attribute declares, directly or on a handler."""
+    if isinstance(value, GeneratorConfig):
+        return value
+    if isinstance(value, types.FunctionType):
+        config = value.__dict__.get("endpoint_config")
+        if isinstance(config, GeneratorConfig):
+            return config
+    return None
+
+
+def declared_configs(module: types.ModuleType) -> List[Tuple[str, GeneratorConfig]]:
+    """Attribute names and configs of every endpoint ``module`` declares."""
+    configs = []
+    for attr, value in vars(module).items():
+        config = bound_config(value)
+        if config is not None:
+            configs.append((attr, config))
+    return configs
+
+
+@dataclass(frozen=True)
+class RegisteredEndpoint:
+    config: GeneratorConfig
+    handler: Optional[Callable[..., Any]] = None
+
+    @property
+    def route(self) -> Tuple[str, str]:
+        return route_key(self.config.httpMethod, self.config.httpPath)
+
+    @property
+    def domain(self) -> str:
+        return domain_of(self.config)
+
+
+def _handler_key(handler: Optional[Callable]) -> Optional[Tuple[str, str]]:
+    # A reloaded module registers its handlers again as new objects, so
+    # handlers are recognized by where they are defined. Lambdas and nested
+    # functions share qualified names and are never taken for one another.
+    qualname = getattr(handler, "__qualname__", None)
+    if qualname is None or "<" in qualname:
+        return None
+    return getattr(handler, "__module__", ""), qualname
+
+
+class EndpointRegistry:
+    """Endpoints in registration order, indexed by operationId, route and domain."""
+
+    def __init__(self):
+        self._endpoints: Dict[str, RegisteredEndpoint] = {}
+        self._routes: Dict[Tuple[str, str], str] = {}
+        # domain -> operationIds in registration order (dict as ordered set).
+        self._domains: Dict[str, Dict[str, None]] = {}
+        self._handlers: Dict[Tuple[str, str], str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._endpoints)
+
+    def __iter__(self) -> Iterator[RegisteredEndpoint]:
+        return iter(list(self._endpoints.values()))
+
+    def __contains__(self, operationId: str) -> bool:
+        return operationId in self._endpoints
+
+    def add(
+        self, config: GeneratorConfig, handler: Optional[Callable[..., Any]] = None
+    ) -> RegisteredEndpoint:
+        """Register ``config``, raising EndpointConflictError on duplicates.
+
+        Registering the same handler again (after a module reload) replaces
+        its previous entry.
+        """
+        entry = RegisteredEndpoint(config, handler)
+        operationId, route = config.operationId, entry.route
+        with self._lock:
+            replaced = self._endpoints.get(self._handlers.get(_handler_key(handler)))
+            existing = self._endpoints.get(operationId)
+            if existing is not None and existing is not replaced:
+                raise EndpointConflictError(
+                    f"operationId {operationId!r} is already used by "
+                    f"{existing.route[0]} {existing.config.httpPath}."
+                )
+            existing = self._endpoints.get(self._routes.get(route))
+            if existing is not None and existing is not replaced:
+                raise EndpointConflictError(
+                    f"{route[0]} {config.httpPath} ({operationId}) conflicts with "
+                    f"{existing.config.httpPath} ({existing.config.operationId})."
+                )
+            if replaced is not None:
+                self._unindex(replaced)
+                if replaced.config.operationId != operationId:
+                    del self._endpoints[replaced.config.operationId]
+            # Re-registering under the same operationId keeps its position.
+            self._endpoints[operationId] = entry
+            self._index(entry)
+        return entry
+
+    def _index(self, entry: RegisteredEndpoint) -> None:
+        operationId = entry.config.operationId
+        self._routes[entry.route] = operationId
+        self._domains.setdefault(entry.domain, {})[operationId] = None
+        key = _handler_key(entry.handler)
+        if key is not None:
+            self._handlers[key] = operationId
+
+    def _unindex(self, entry: RegisteredEndpoint) -> None:
+        operationId = entry.config.operationId
+        self._routes.pop(entry.route, None)
+        domain = self._domains.get(entry.domain, {})
+        domain.pop(operationId, None)
+        if not domain:
+            self._domains.pop(entry.domain, None)
+        key = _handler_key(entry.handler)
+        if key is not None:
+            self._handlers.pop(key, None)
+
+    def remove(self, operationId: str) -> RegisteredEndpoint:
+        with self._lock:
+            entry = self._endpoints.pop(operationId)
+            self._unindex(entry)
+        return entry
+
+    def endpoint(
+        self,
+        serviceInput: Any,
+        serviceOutput: Any,
+        httpMethod: str,
+        httpPath: str,
+        serviceName: Optional[str] = None,
+        operationId: Optional[str] = None,
+        description: Optional[str] = None,
+    ) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Decorator registering the handler it is applied to."""
+
+        def register(handler: Callable[..., Any]) -> Callable[..., Any]:
+            doc = (handler.__doc__ or "").strip()
+            config = GeneratorConfig(
+                serviceName=serviceName or handler.__module__,
+                description=description or (doc.splitlines()[0] if doc else ""),
+                operationId=operationId or snake_case_to_camel_case(handler.__name__),
+                httpMethod=httpMethod,
+                httpPath=httpPath,
+                serviceInput=serviceInput,
+                serviceOutput=serviceOutput,
+            )
+            self.add(config, handler)
+            handler.endpoint_config = config
+            return handler
+
+        return register
+
+    def get(self, operationId: str) -> Optional[RegisteredEndpoint]:
+        return self._endpoints.get(operationId)
+
+    def by_route(self, httpMethod: str, httpPath: str) -> Optional[RegisteredEndpoint]:
+        operationId = self._routes.get(route_key(httpMethod, httpPath))
+        return self._endpoints.get(operationId) if operationId else None
+
+    def by_domain(self, domain: str) -> List[RegisteredEndpoint]:
+        return [
+            self._endpoints[operationId]
+            for operationId in self._domains.get(domain.capitalize(), ())
+        ]
+
+    def domains(self) -> List[str]:
+        return list(self._domains)
+
+    def configs(self) -> List[GeneratorConfig]:
+        return [entry.config for entry in self._endpoints.values()]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self._routes.clear()
+            self._domains.clear()
+            self._handlers.clear()
+
+
+registry = EndpointRegistry()
@@ -0,0 +1,214 @@
+"""Segment-trie router dispatching API Gateway events to registered handlers.
+
+Every ``httpPath`` template is split into segments and inserted into a trie:
+literal segments are dict keys, ``{name}`` matches any one segment and
+``{name+}`` (API Gateway's greedy parameter, last segment only) matches the
+rest of the path. Matching a request walks one node per segment, so the cost
+depends on the depth of the path rather than the number of routes:
+
+    router = PathRouter.from_registry(registry)
+    match = router.match("GET", "/world/42")
+    match.params           # {"userId": "42"}
+    match.path_parameters  # PathParameters(userId="42")
+
+As in API Gateway, the most specific path wins (literal before parameter
+before greedy, segment by segment); the method is then looked up on that
+path, with ``ANY`` as a fallback.
+"""
+
+import dataclasses
+import functools
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, get_args
+from urllib.parse import unquote
+
+from decoding import get_path_parameters_decoder, is_union
+from gen_types import GeneratorConfig
+from registry import EndpointConflictError, EndpointRegistry
+from typeinfo import get_type_hints
+
+
+@dataclass
+class Route:
+    config: GeneratorConfig
+    handler: Optional[Callable[..., Any]]
+    parameter_names: Tuple[str, ...]
+    # Builds the endpoint's PathParameters dataclass from the string values;
+    # None when serviceInput declares no dataclass for them.
+    decode_path: Optional[Callable[[Dict[str, str]], Any]] = None
+
+
+@dataclass
+class RouteMatch:
+    route: Route
+    params: Dict[str, str]
+
+    @functools.cached_property
+    def path_parameters(self) -> Any:
+        """``params`` decoded into the endpoint's PathParameters dataclass.
+
+        Raises decoding.EventDecodeError when a value does not convert.
+        """
+        decode = self.route.decode_path
+        return decode(self.params) if decode is not None else None
+
+
+@dataclass
+class _Node:
+    static: Dict[str, "_Node"] = field(default_factory=dict)
+    param: Optional["_Node"] = None
+    greedy: Optional["_Node"] = None
+    # Upper-cased method -> route ending at this node.
+    routes: Dict[str, Route] = field(default_factory=dict)
+
+
+def split_path(path: str) -> List[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+def path_parameters_type(serviceInput: Any) -> Any:
+    """The dataclass ``serviceInput.pathParameters`` is annotated with, if any."""
+    tp = get_type_hints(serviceInput).get("pathParameters")
+    if is_union(tp):
+        variants = [a for a in get_args(tp) if a is not type(None)]
+        tp = variants[0] if len(variants) == 1 else None
+    return tp if dataclasses.is_dataclass(tp) else None
+
+
+def request_line(event: Dict[str, Any]) -> Tuple[str, str]:
+    """Method and path of a v1 or v2 API Gateway proxy event."""
+    http = (event.get("requestContext") or {}).get("http")
+    if http:
+        return http["method"], unquote(event.get("rawPath") or http["path"])
+    return event["httpMethod"], event["path"]
+
+
+class PathRouter:
+    def __init__(self):
+        self.root = _Node()
+        self.routes: List[Route] = []
+
+    def __len__(self) -> int:
+        return len(self.routes)
+
+    @classmethod
+    def from_configs(cls, configs: Iterable[GeneratorConfig]) -> "PathRouter":
+        router = cls()
+        for config in configs:
+            router.add(config)
+        return router
+
+    @classmethod
+    def from_registry(cls, registry: EndpointRegistry) -> "PathRouter":
+        router = cls()
+        for entry in registry:
+            router.add(entry.config, entry.handler)
+        return router
+
+    def add(
+        self, config: GeneratorConfig, handler: Optional[Callable[..., Any]] = None
+    ) -> Route:
+        node, names = self.root, []
+        segments = split_path(config.httpPath)
+        for idx, segment in enumerate(segments):
+            if segment.startswith("{") and segment.endswith("}"):
+                name = segment[1:-1]
+                if name.endswith("+"):
+                    if idx != len(segments) - 1:
+                        raise ValueError(
+                            f"Greedy parameter {segment} must end {config.httpPath}."
+                        )
+                    node.greedy = node.greedy or _Node()
+                    node, name = node.greedy, name[:-1]
+                else:
+                    node.param = node.param or _Node()
+                    node = node.param
+                names.append(name)
+            elif "{" in segment or "}" in segment:
+                raise ValueError(
+                    f"Segment {segment!r} of {config.httpPath} mixes text and "
+                    "parameters, which API Gateway does not support."
+                )
+            else:
+                node = node.static.setdefault(segment, _Node())
+
+        method = config.httpMethod.upper()
+        existing = node.routes.get(method)
+        if existing is not None:
+            raise EndpointConflictError(
+                f"{method} {config.httpPath} ({config.operationId}) conflicts with "
+                f"{existing.config.httpPath} ({existing.config.operationId})."
+            )
+        parameters_type = path_parameters_type(config.serviceInput)
+        route = Route(
+            config,
+            handler,
+            tuple(names),
+            get_path_parameters_decoder(parameters_type)
+            if parameters_type is not None
+            else None,
+        )
+        node.routes[method] = route
+        self.routes.append(route)
+        return route
+
+    def find(self, path: str) -> Tuple[Optional[_Node], Tuple[str, ...]]:
+        """Most specific node with routes matching ``path``, and its values."""
+        segments = split_path(path)
+        end = len(segments)
+        # Depth-first with an explicit stack; alternatives are pushed in
+        # reverse order of precedence so the most specific is tried first.
+        stack = [(self.root, 0, ())]
+        while stack:
+            node, idx, values = stack.pop()
+            if idx == end:
+                if node.routes:
+                    return node, values
+                continue
+            segment = segments[idx]
+            if node.greedy is not None:
+                rest = "/".join(segments[idx:])
+                stack.append((node.greedy, end, values + (rest,)))
+            if node.param is not None:
+                stack.append((node.param, idx + 1, values + (segment,)))
+            child = node.static.get(segment)
+            if child is not None:
+                stack.append((child, idx + 1, values))
+        return None, ()
+
+    def match(self, httpMethod: str, path: str) -> Optional[RouteMatch]:
+        node, values = self.find(path)
+        if node is None:
+            return None
+        route = node.routes.get(httpMethod.upper()) or node.routes.get("ANY")
+        if route is None:
+            return None
+        return RouteMatch(route, dict(zip(route.parameter_names, values)))
+
+    def allowed_methods(self, path: str) -> List[str]:
+        node, _ = self.find(path)
+        return sorted(node.routes) if node is not None else []
+
+    def dispatch(self, event: Dict[str, Any], context: Any = None) -> Any:
+        """Call the handler matching ``event`` with its pathParameters filled in.
+
+        Unmatched requests get a 404 response, or 405 when only the method
+        does not match.
+        """
+        httpMethod, path = request_line(event)
+        match = self.match(httpMethod, path)
+        if match is None:
+            allowed = self.allowed_methods(path)
+            if allowed:
+                return {
+                    "statusCode": 405,
+                    "headers": {"Allow": ", ".join(allowed)},
+                    "body": "",
+                }
+            return {"statusCode": 404, "body": ""}
+        handler = match.route.handler
+        if handler is None:
+            raise ValueError(
+                f"No handler registered for {match.route.config.operationId}."
+            )
+        return handler({**event, "pathParameters": match.params}, context)
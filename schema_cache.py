@@ -0,0 +1,173 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from typeinfo import type_key
+
+
+def clone_schema(node: Any, key_format: Optional[Callable[[str], str]] = None) -> Any:
+    """Copy a JSON-like schema tree (dicts, lists and scalars).
+
+    With ``key_format`` the property names of every object schema, and the
+    ``required`` entries naming them, are rewritten while copying, so each
+    node is cased exactly once, when it is produced. Schema keywords and
+    ``$ref`` targets (component names) are never touched.
+    """
+    if isinstance(node, dict):
+        if key_format is None:
+            return {key: clone_schema(value) for key, value in node.items()}
+        return {
+            key: _clone_keyword(key, value, key_format) for key, value in node.items()
+        }
+    if isinstance(node, list):
+        return [clone_schema(item, key_format) for item in node]
+    return node
+
+
+def _clone_keyword(key: str, value: Any, key_format: Callable[[str], str]) -> Any:
+    if key == "properties" and isinstance(value, dict):
+        return {
+            key_format(name): clone_schema(prop, key_format)
+            for name, prop in value.items()
+        }
+    if key == "required" and isinstance(value, list):
+        return [key_format(name) if isinstance(name, str) else name for name in value]
+    return clone_schema(value, key_format)
+
+
+@dataclass(frozen=True)
+class ResolvedSchema:
+    """Cached result of reflecting one type.
+
+    ``schema`` is a template that must be cloned before it is handed out and
+    ``dependencies`` lists, in visiting order, the dataclasses the template
+    references through ``$ref`` and that have to be defined next to it.
+    """
+
+    schema: Dict[str, Any]
+    dependencies: Tuple[type, ...] = ()
+
+
+class SchemaResolverCache:
+    """Process-wide memo of reflected types, keyed by ``typeinfo.type_key``.
+
+    Two tables are kept: ``types`` holds the schema used where a type is
+    referenced (a ``$ref`` for dataclasses, inline schemas for unions, lists,
+    enums and scalars) and ``definitions`` holds the object schema of each
+    dataclass as it appears under ``components.schemas``.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._types: Dict[Hashable, ResolvedSchema] = {}
+        self._definitions: Dict[type, ResolvedSchema] = {}
+        self._dependents: Dict[type, set] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._types) + len(self._definitions)
+
+    def _get(self, table: Dict, key: Any) -> Optional[ResolvedSchema]:
+        if not self.enabled:
+            return None
+        try:
+            entry = table.get(key)
+        except TypeError:
+            # Unhashable annotation (e.g. Annotated with a dict payload).
+            return None
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def _put(self, table: Dict, key: Any, entry: ResolvedSchema) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            try:
+                table[key] = entry
+            except TypeError:
+                return
+            for dependency in entry.dependencies:
+                self._dependents.setdefault(dependency, set()).add((id(table), key))
+
+    def get_type(self, target_type: Any) -> Optional[ResolvedSchema]:
+        return self._get(self._types, type_key(target_type))
+
+    def put_type(self, target_type: Any, entry: ResolvedSchema) -> None:
+        self._put(self._types, type_key(target_type), entry)
+
+    def get_definition(self, cls: type) -> Optional[ResolvedSchema]:
+        return self._get(self._definitions, cls)
+
+    def put_definition(self, cls: type, entry: ResolvedSchema) -> None:
+        self._put(self._definitions, cls, entry)
+
+    def invalidate(self, target_type: Any) -> int:
+        """Drop ``target_type`` and every cached entry that depends on it.
+
+        Returns the number of entries removed.
+        """
+        removed = 0
+        pending = [type_key(target_type)]
+        tables = {
+            id(self._types): self._types,
+            id(self._definitions): self._definitions,
+        }
+        with self._lock:
+            while pending:
+                current = pending.pop()
+                for table in tables.values():
+                    try:
+                        if table.pop(current, None) is not None:
+                            removed += 1
+                    except TypeError:
+                        continue
+                try:
+                    dependents = self._dependents.pop(current, ())
+                except TypeError:
+                    continue
+                for table_id, key in dependents:
+                    if tables[table_id].pop(key, None) is not None:
+                        removed += 1
+                    pending.append(key)
+        return removed
+
+    def invalidate_module(self, module_name: str) -> int:
+        """Drop every entry for types defined in ``module_name``."""
+        candidates = [*self._types, *self._definitions, *self._dependents]
+        owned = [
+            cls
+            for cls in candidates
+            if isinstance(cls, type) and cls.__module__ == module_name
+        ]
+        return sum(self.invalidate(cls) for cls in dict.fromkeys(owned))
+
+    def invalidate_many(self, target_types: Iterable[Any]) -> int:
+        return sum(self.invalidate(t) for t in target_types)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._types.clear()
+            self._definitions.clear()
+            self._dependents.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "types": len(self._types),
+            "definitions": len(self._definitions),
+        }
+
+
+schema_cache = SchemaResolverCache()
@@ -0,0 +1,239 @@
+"""Compiled JSON serializers for AbstractOutput responses.
+
+Handlers used to build response bodies with ``dataclasses.asdict`` followed by
+``deep_change_keys_by_format``, copying every body twice before encoding it.
+Here each ``bodyOutput`` dataclass is compiled once into generated Python
+that writes the JSON text straight from the instance attributes, with the
+property names the spec uses:
+
+    serialize = get_response_serializer(ResponseSchema)
+    return serialize(response)  # {"statusCode": 200, "headers": ..., "body": ...}
+
+As in the spec, fields starting with ``_`` are left out, enums are written as
+their values and Optional fields that are ``None`` are omitted. ``dict``
+fields are published as ``type: object`` and written as JSON objects. Other
+types the spec has no precise schema for, ``Any`` among them, are published
+as ``type: string`` but encoded as given, so for those the body does not
+follow the spec.
+"""
+
+import dataclasses
+import enum
+import functools
+import inspect
+import json
+import math
+import typing
+from json.encoder import encode_basestring
+from typing import Any, Callable, Dict, List, Tuple, get_args, get_origin
+
+from decoding import is_optional, is_union
+from typeinfo import field_types, get_type_hints, type_key
+from utils import DEFAULT_KEY_CASE, get_key_converter
+
+Serializer = Callable[[Any], str]
+
+_dumps = functools.partial(json.dumps, separators=(",", ":"), default=str)
+
+
+def _float_text(value: float) -> str:
+    return repr(float(value)) if math.isfinite(value) else _dumps(value)
+
+
+def _bool_text(value: bool) -> str:
+    return "true" if value else "false"
+
+
+def _key_text(key: Any) -> str:
+    if isinstance(key, str):
+        return encode_basestring(key)
+    if key is None or isinstance(key, (bool, int, float)):
+        return f'"{_dumps(key)}"'
+    return encode_basestring(str(key))
+
+
+def _json_text(value: Any, key_case: str | None = DEFAULT_KEY_CASE) -> str:
+    """JSON text of a value typed ``dict`` or ``Any`` in the schema.
+
+    Dataclasses found inside are written by their compiled serializer with
+    the same ``key_case`` as the enclosing body.
+    """
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return get_body_serializer(type(value), key_case)(value)
+    if isinstance(value, enum.Enum):
+        return _dumps(value.value)
+    if isinstance(value, dict):
+        items = (f"{_key_text(k)}:{_json_text(v, key_case)}" for k, v in value.items())
+        return "{" + ",".join(items) + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(_json_text(item, key_case) for item in value) + "]"
+    return _dumps(value)
+
+
+_SCALARS = {
+    str: "_str",
+    int: "_int",
+    float: "_float",
+    bool: "_bool",
+}
+
+
+class _SerializerCompiler:
+    def __init__(self, key_case: str | None):
+        self.key_format = get_key_converter(key_case) if key_case else None
+        self.namespace: Dict[str, Any] = {
+            "_str": encode_basestring,
+            "_int": int.__repr__,
+            "_float": _float_text,
+            "_bool": _bool_text,
+            "_any": functools.partial(_json_text, key_case=key_case),
+        }
+        self.blocks: List[List[str]] = []
+        self.functions: Dict[Any, str] = {}
+
+    def constant(self, value: Any) -> str:
+        name = f"_const{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def encoder(self, tp: Any) -> str:
+        """Name of a one-argument function returning the JSON text of ``tp``."""
+        if is_union(tp):
+            args = [a for a in get_args(tp) if a is not type(None)]
+            if len(args) == 1:
+                return self.encoder(args[0])
+            return self.function(tp)
+        if tp in _SCALARS:
+            return _SCALARS[tp]
+        if get_origin(tp) in (list, typing.List) or dataclasses.is_dataclass(tp):
+            return self.function(tp)
+        if inspect.isclass(tp) and issubclass(tp, enum.Enum):
+            texts = self.constant({e: _dumps(e.value) for e in tp})
+            return f"{texts}.__getitem__"
+        return "_any"
+
+    def function(self, tp: Any) -> str:
+        key = type_key(tp)
+        if key in self.functions:
+            return self.functions[key]
+        name = f"_write{len(self.functions)}"
+        # Registered before the body is generated so recursive types resolve.
+        self.functions[key] = name
+
+        if dataclasses.is_dataclass(tp):
+            lines = self.dataclass_lines(name, tp)
+        elif get_origin(tp) in (list, typing.List):
+            (item_type,) = get_args(tp) or (Any,)
+            item = self.encoder(item_type)
+            lines = [
+                f"def {name}(value):",
+                f"    return '[' + ','.join(map({item}, value)) + ']'",
+            ]
+        else:
+            # Unions are dispatched on the exact runtime type of the value.
+            lines = [f"def {name}(value):", "    cls = type(value)"]
+            for variant in [a for a in get_args(tp) if a is not type(None)]:
+                origin = get_origin(variant) or variant
+                if inspect.isclass(origin):
+                    lines.append(f"    if cls is {self.constant(origin)}:")
+                    lines.append(f"        return {self.encoder(variant)}(value)")
+            lines.append("    return _any(value)")
+        self.blocks.append(lines)
+        return name
+
+    def dataclass_lines(self, name: str, cls: Any) -> List[str]:
+        fields: List[Tuple[str, str, str, bool]] = []
+        for field, field_type in field_types(cls):
+            if field.name.startswith("_"):
+                continue
+            key = self.key_format(field.name) if self.key_format else field.name
+            fields.append(
+                (
+                    field.name,
+                    f"{encode_basestring(key)}:",
+                    self.encoder(field_type),
+                    is_optional(field_type),
+                )
+            )
+
+        lines = [f"def {name}(obj):"]
+        if not any(optional for *_, optional in fields):
+            parts = ["'{'"]
+            for idx, (attr, prefix, encoder, _) in enumerate(fields):
+                prefix = prefix if idx == 0 else f",{prefix}"
+                parts.append(f"{prefix!r} + {encoder}(obj.{attr})")
+            parts.append("'}'")
+            lines.append(f"    return {' + '.join(parts)}")
+            return lines
+
+        lines.append("    parts = []")
+        for attr, prefix, encoder, optional in fields:
+            if optional:
+                lines.append(f"    v = obj.{attr}")
+                lines.append("    if v is not None:")
+                lines.append(f"        parts.append({prefix!r} + {encoder}(v))")
+            else:
+                lines.append(f"    parts.append({prefix!r} + {encoder}(obj.{attr}))")
+        lines.append("    return '{' + ','.join(parts) + '}'")
+        return lines
+
+    def source(self) -> str:
+        return "\n\n".join("\n".join(block) for block in self.blocks) + "\n"
+
+
+def generate_serializer_source(
+    cls: Any, key_case: str | None = DEFAULT_KEY_CASE
+) -> Tuple[str, str, Dict[str, Any]]:
+    """Source, entry point name and globals of the serializer for ``cls``."""
+    if not dataclasses.is_dataclass(cls):
+        raise ValueError(f"{cls} is not a dataclass.")
+    compiler = _SerializerCompiler(key_case)
+    entry = compiler.function(cls)
+    return compiler.source(), entry, compiler.namespace
+
+
+@functools.lru_cache(maxsize=None)
+def get_body_serializer(
+    cls: Any, key_case: str | None = DEFAULT_KEY_CASE
+) -> Serializer:
+    """Compiled JSON encoder for instances of the dataclass ``cls``.
+
+    ``key_case`` names the conversion applied to property names and should
+    match the generator's ``schema_key_case`` (``None`` when
+    to_camel_case_schemas is off).
+    """
+    source, entry, namespace = generate_serializer_source(cls, key_case)
+    filename = f"<serializer {cls.__module__}.{cls.__qualname__}>"
+    exec(compile(source, filename, "exec"), namespace)
+    serializer = namespace[entry]
+    serializer.source = source
+    return serializer
+
+
+@functools.lru_cache(maxsize=None)
+def get_response_serializer(
+    output_cls: Any, key_case: str | None = DEFAULT_KEY_CASE
+) -> Callable[[Any], Dict[str, Any]]:
+    """Serializer turning an ``output_cls`` instance into a Lambda response."""
+    body_type = get_type_hints(output_cls).get("bodyOutput")
+    if not dataclasses.is_dataclass(body_type):
+        raise ValueError(f"bodyOutput of {output_cls.__name__} is not a dataclass.")
+    encode = get_body_serializer(body_type, key_case)
+
+    def serialize(output: Any) -> Dict[str, Any]:
+        body = output.bodyOutput
+        return {
+            "statusCode": getattr(output, "statusCode", 200),
+            "headers": {
+                "Content-Type": getattr(body, "_contentType", "application/json")
+            },
+            "body": encode(body),
+        }
+
+    return serialize
+
+
+def serialize_response(
+    output: Any, key_case: str | None = DEFAULT_KEY_CASE
+) -> Dict[str, Any]:
+    return get_response_serializer(type(output), key_case)(output)
@@ -0,0 +1,268 @@
+"""Split a spec into a root document plus per-domain and per-schema files.
+
+Layout, relative to the root document::
+
+    openapi.yaml                     root: info, refs to everything below
+    paths/<domain>.yaml              path items whose first segment is <domain>
+    components/schemas/<Name>.yaml   one file per schema
+    components/parameters.yaml       all parameters
+
+Every ``$ref`` is rewritten to a relative file reference (plus a JSON pointer
+where the target is not a whole file), so the files are a valid multi-file
+OpenAPI document. ``bundle`` inlines them back into one document.
+"""
+
+import json
+import os
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import yaml
+
+from output_sink import AtomicFileSink
+from writers import dump_json, dump_yaml, stream_yaml
+
+# Component sections moved out of the root document, and whether each entry
+# gets its own file (True) or the whole section shares one (False).
+SPLIT_COMPONENTS = {"schemas": True, "parameters": False}
+
+Location = Tuple[str, str]  # (file relative to the root directory, pointer)
+
+
+def escape_pointer(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def unescape_pointer(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def file_name(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in str(name))
+
+
+def path_domain(path: str) -> str:
+    first = str(path).strip("/").split("/", 1)[0]
+    return file_name(first) if first and "{" not in first else "root"
+
+
+def format_ref(from_file: str, location: Location) -> str:
+    target, pointer = location
+    relative = posixpath.relpath(target, posixpath.dirname(from_file) or ".")
+    return f"{relative}#{pointer}" if pointer else relative
+
+
+def _rewrite_refs(node: Any, rewrite: Callable[[str], Optional[str]]) -> Any:
+    """Copy of ``node`` with every ``$ref`` passed through ``rewrite``.
+
+    Containers are copied so the generator's document is left untouched.
+    """
+    if isinstance(node, dict):
+        copy = {key: _rewrite_refs(value, rewrite) for key, value in node.items()}
+        ref = node.get("$ref")
+        if isinstance(ref, str):
+            new_ref = rewrite(ref)
+            if new_ref is not None:
+                copy["$ref"] = new_ref
+        return copy
+    if isinstance(node, list):
+        return [_rewrite_refs(item, rewrite) for item in node]
+    return node
+
+
+def split_document(
+    tree: Dict[str, Any], root_name: str, extension: str
+) -> Dict[str, Any]:
+    """Map of file name, relative to the root directory, to its document.
+
+    The root document itself is stored under ``root_name``.
+    """
+    components = tree.get("components") or {}
+    locations: Dict[str, Location] = {}
+    for section, per_entry in SPLIT_COMPONENTS.items():
+        for name in components.get(section) or {}:
+            pointer = escape_pointer(name)
+            if per_entry:
+                location = (f"components/{section}/{file_name(name)}{extension}", "")
+            else:
+                location = (f"components/{section}{extension}", f"/{pointer}")
+            locations[f"#/components/{section}/{pointer}"] = location
+
+    def rewriter(from_file: str) -> Callable[[str], Optional[str]]:
+        def rewrite(ref: str) -> Optional[str]:
+            if not ref.startswith("#/"):
+                return None
+            location = locations.get(ref, (root_name, ref[1:]))
+            if location[0] == from_file:
+                return None
+            return format_ref(from_file, location)
+
+        return rewrite
+
+    files: Dict[str, Any] = {}
+    root: Dict[str, Any] = {}
+    for key, value in tree.items():
+        if key == "paths":
+            root["paths"] = {}
+            for path, item in (value or {}).items():
+                target = f"paths/{path_domain(path)}{extension}"
+                content = _rewrite_refs(item, rewriter(target))
+                files.setdefault(target, {})[path] = content
+                location = (target, f"/{escape_pointer(path)}")
+                root["paths"][path] = {"$ref": format_ref(root_name, location)}
+        elif key == "components":
+            root["components"] = {}
+            for section, entries in (value or {}).items():
+                if section not in SPLIT_COMPONENTS:
+                    content = _rewrite_refs(entries, rewriter(root_name))
+                    root["components"][section] = content
+                    continue
+                root["components"][section] = {}
+                for name, entry in (entries or {}).items():
+                    ref = f"#/components/{section}/{escape_pointer(name)}"
+                    target, pointer = locations[ref]
+                    content = _rewrite_refs(entry, rewriter(target))
+                    if pointer:
+                        files.setdefault(target, {})[name] = content
+                    else:
+                        files[target] = content
+                    root["components"][section][name] = {
+                        "$ref": format_ref(root_name, (target, pointer))
+                    }
+        else:
+            root[key] = _rewrite_refs(value, rewriter(root_name))
+    files[root_name] = root
+    return files
+
+
+def write_split(
+    tree: Dict[str, Any],
+    root_file: str,
+    fmt: str = "yaml",
+    workers: int = 8,
+    stream: bool = False,
+    pretty: bool = False,
+    compact: bool = False,
+    sink: Optional[AtomicFileSink] = None,
+) -> Dict[str, str]:
+    """Split ``tree`` and write the files concurrently next to ``root_file``.
+
+    Returns the absolute path written for every relative file name.
+    """
+    extension = ".yaml" if fmt == "yaml" else ".json"
+    directory = os.path.dirname(os.path.abspath(root_file))
+    documents = split_document(tree, os.path.basename(root_file), extension)
+    paths = {name: os.path.join(directory, *name.split("/")) for name in documents}
+    for path in set(map(os.path.dirname, paths.values())):
+        os.makedirs(path, exist_ok=True)
+
+    sink = sink or AtomicFileSink()
+
+    def write(name: str) -> None:
+        document = documents[name]
+        if fmt != "yaml":
+            sink.write(paths[name], lambda f: dump_json(document, f, pretty=pretty))
+        elif stream:
+            sink.write(paths[name], lambda f: stream_yaml(document, f, compact=compact))
+        else:
+            sink.write(paths[name], lambda f: dump_yaml(document, f, compact=compact))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        # Consume the results so a failed write is raised here.
+        list(pool.map(write, documents))
+    return paths
+
+
+def _load(path: str) -> Any:
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        return yaml.load(f, Loader=loader)
+
+
+def _resolve_pointer(document: Any, pointer: str) -> Any:
+    node = document
+    for token in filter(None, pointer.split("/")):
+        token = unescape_pointer(token)
+        if isinstance(node, list):
+            node = node[int(token)]
+        elif token in node:
+            node = node[token]
+        else:
+            # YAML reads keys such as response codes back as integers.
+            node = node[int(token)]
+    return node
+
+
+def bundle(root_file: str, workers: int = 8) -> Dict[str, Any]:
+    """Load a split spec back into one document with internal ``$ref``s."""
+    root_path = os.path.abspath(root_file)
+    directory = os.path.dirname(root_path)
+    root = _load(root_file)
+
+    def target(base: str, ref: str) -> Tuple[str, str]:
+        file_part, _, pointer = ref.partition("#")
+        path = os.path.normpath(os.path.join(base, file_part)) if file_part else ""
+        return path, pointer
+
+    # Every external location the root points at, and its internal name.
+    internal: Dict[Tuple[str, str], str] = {}
+    for section, entries in (root.get("components") or {}).items():
+        for name, entry in (entries or {}).items():
+            if isinstance(entry, dict) and isinstance(entry.get("$ref"), str):
+                location = target(directory, entry["$ref"])
+                if location[0]:
+                    internal[location] = (
+                        f"#/components/{section}/{escape_pointer(name)}"
+                    )
+
+    files = sorted(
+        {path for path, _ in internal}
+        | {
+            target(directory, item["$ref"])[0]
+            for item in (root.get("paths") or {}).values()
+            if isinstance(item, dict) and isinstance(item.get("$ref"), str)
+        }
+        - {"", root_path}
+    )
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        loaded = dict(zip(files, pool.map(_load, files)))
+
+    def internalize(node: Any, base: str) -> Any:
+        def rewrite(ref: str) -> Optional[str]:
+            location = target(os.path.dirname(base), ref)
+            if not location[0]:
+                return None
+            if location in internal:
+                return internal[location]
+            if location[0] == root_path:
+                return f"#{location[1]}"
+            raise ValueError(f"Unresolvable $ref {ref!r} in {base}")
+
+        return _rewrite_refs(node, rewrite)
+
+    def inline(entry: Any) -> Any:
+        if isinstance(entry, dict) and isinstance(entry.get("$ref"), str):
+            path, pointer = target(directory, entry["$ref"])
+            if path:
+                return internalize(_resolve_pointer(loaded[path], pointer), path)
+        return entry
+
+    document = {}
+    for key, value in root.items():
+        if key == "paths":
+            document["paths"] = {k: inline(v) for k, v in (value or {}).items()}
+        elif key == "components":
+            document["components"] = {
+                section: (
+                    {name: inline(entry) for name, entry in (entries or {}).items()}
+                    if section in SPLIT_COMPONENTS
+                    else internalize(entries, root_path)
+                )
+                for section, entries in (value or {}).items()
+            }
+        else:
+            document[key] = internalize(value, root_path)
+    return document
@@ -0,0 +1,70 @@
+import heapq
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+
+@dataclass
+class EndpointCost:
+    operationId: str
+    httpMethod: str
+    httpPath: str
+    reflectionSeconds: float = 0.0
+    mergeSeconds: float = 0.0
+
+    @property
+    def totalSeconds(self) -> float:
+        return self.reflectionSeconds + self.mergeSeconds
+
+
+@dataclass
+class BuildStats:
+    """Timings and counters collected by OpenApiGenerator.generate().
+
+    Only created when stats collection is enabled; the generator checks for
+    ``None`` before recording anything, so a disabled build pays nothing.
+    """
+
+    phases: Dict[str, float] = field(default_factory=dict)
+    counters: Dict[str, Any] = field(default_factory=dict)
+    endpoints: List[EndpointCost] = field(default_factory=list)
+    slowest_n: int = 10
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def count(self, name: str, value: Any = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name: str, value: Any) -> None:
+        self.counters[name] = value
+
+    def slowest(self, n: int | None = None) -> List[EndpointCost]:
+        return heapq.nlargest(
+            n or self.slowest_n, self.endpoints, key=lambda e: e.totalSeconds
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "phases": dict(self.phases),
+            "counters": dict(self.counters),
+            "slowest_endpoints": [
+                {**asdict(cost), "totalSeconds": cost.totalSeconds}
+                for cost in self.slowest()
+            ],
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+            f.write("\n")
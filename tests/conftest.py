@@ -0,0 +1,80 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root, as for main.py; bench/ provides
+# the synthetic endpoints.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "bench"))
+
+
+@pytest.fixture(scope="session")
+def synthetic_configs():
+    """Synthetic endpoints plus the example endpoint.
+
+    Built once per session: synthesize() registers its classes on the
+    synthetic module by name, so a second call would leave the first set
+    unpicklable for process-pool builds.
+    """
+    from example_service_endpoint import endpoint_config
+    from synthetic import SyntheticSpec, synthesize
+
+    return synthesize(SyntheticSpec(endpoints=24, depth=2)) + [endpoint_config]
+
+
+@pytest.fixture
+def make_generator(tmp_path):
+    """Factory for generators writing under ``tmp_path``, base document built.
+
+    ``configs`` is one GeneratorConfig or a list of them; pass ``None`` with
+    ``search_endpoint_declaration`` and its options for the scanning modes.
+    """
+    from _tool import OpenApiGenerator, SearchEndpointDeclaration
+    from gen_types import GeneratorConfig
+
+    def make(configs=None, name="openapi.yaml", **options):
+        if isinstance(configs, GeneratorConfig):
+            options["endpoint_config"] = configs
+        elif configs is not None:
+            options["search_endpoint_declaration"] = (
+                SearchEndpointDeclaration.EndpointConfigList
+            )
+            options["endpoint_configs"] = configs
+        generator = OpenApiGenerator(
+            output_openapi_file=str(tmp_path / name), **options
+        )
+        generator.build_openapi_base("Service", "Description", "1.0")
+        return generator
+
+    return make
+
+
+def iter_refs(node):
+    if isinstance(node, dict):
+        if isinstance(node.get("$ref"), str):
+            yield node["$ref"]
+        for value in node.values():
+            yield from iter_refs(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from iter_refs(item)
+
+
+@pytest.fixture
+def assert_refs_resolve():
+    """Check that every ``$ref`` of a document points inside it."""
+
+    def check(document):
+        refs = list(iter_refs(document))
+        for ref in refs:
+            assert ref.startswith("#/"), ref
+            node = document
+            for token in ref[2:].split("/"):
+                token = token.replace("~1", "/").replace("~0", "~")
+                assert isinstance(node, dict) and token in node, ref
+                node = node[token]
+        return refs
+
+    return check
@@ -0,0 +1,88 @@
+import copy
+
+from compact import compact_document
+
+
+def ref(name):
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def ok(schema):
+    return {"description": "OK", "content": {"application/json": {"schema": schema}}}
+
+
+def operation(**fields):
+    return {"parameters": [], "responses": {}, **fields}
+
+
+def test_required_and_meaningful_empties_survive():
+    tree = {
+        "openapi": "3.1.0",
+        "info": {"title": "Service", "version": "1.0"},
+        "security": [],
+        "paths": {
+            "/ping": {"get": operation()},
+            "/echo": {"post": operation(security=[], responses={"200": ok({})})},
+        },
+        "components": {
+            "schemas": {
+                "Anything": {},
+                "Bag": {"type": "object", "properties": {"value": {}}},
+                "List": {"type": "array", "items": {}},
+            },
+            "responses": {},
+            "examples": {},
+        },
+    }
+    original = copy.deepcopy(tree)
+    compacted, result = compact_document(tree)
+
+    assert tree == original
+    ping = compacted["paths"]["/ping"]["get"]
+    assert ping == {"responses": {}}
+    echo = compacted["paths"]["/echo"]["post"]
+    assert echo["security"] == []
+    assert echo["responses"]["200"]["content"]["application/json"]["schema"] == {}
+    assert compacted["security"] == []
+    assert compacted["components"]["schemas"] == original["components"]["schemas"]
+    assert "responses" not in compacted["components"]
+    assert "examples" not in compacted["components"]
+    assert result.pruned == 4
+
+
+def test_repeated_responses_are_hoisted(assert_refs_resolve):
+    tree = {
+        "openapi": "3.1.0",
+        "paths": {
+            "/a": {"get": operation(responses={"200": ok(ref("Item"))})},
+            "/b": {"get": operation(responses={"200": ok(ref("Item"))})},
+            "/c": {"get": operation(responses={"200": ok(ref("Other"))})},
+        },
+        "components": {"schemas": {"Item": {}, "Other": {}}},
+    }
+    compacted, result = compact_document(tree)
+
+    assert result.hoisted_responses == 1
+    assert compacted["components"]["responses"] == {"ItemResponse": ok(ref("Item"))}
+    for path in ("/a", "/b"):
+        assert compacted["paths"][path]["get"]["responses"] == {
+            "200": {"$ref": "#/components/responses/ItemResponse"}
+        }
+    assert compacted["paths"]["/c"]["get"]["responses"] == {"200": ok(ref("Other"))}
+    assert_refs_resolve(compacted)
+
+
+def test_generated_spec_refs_resolve_after_compact(
+    synthetic_configs, make_generator, assert_refs_resolve
+):
+    generator = make_generator(
+        synthetic_configs, dedup_schemas=True, compact_output=True
+    )
+    generator.generate()
+    assert generator.compact_result.hoisted_responses > 0
+
+    build = generator.openapi_build
+    assert_refs_resolve(build)
+    for item in build["paths"].values():
+        for method in item.values():
+            assert method["responses"]
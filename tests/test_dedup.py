@@ -0,0 +1,89 @@
+import copy
+import json
+
+from dedup import deduplicate_schemas
+
+
+def ref(name):
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def obj(**properties):
+    return {"type": "object", "properties": properties}
+
+
+def response(schema):
+    return {"content": {"application/json": {"schema": schema}}}
+
+
+def document(schemas, paths=None):
+    return {
+        "openapi": "3.1.0",
+        "paths": paths or {},
+        "components": {"schemas": schemas},
+    }
+
+
+def test_identical_schemas_collapse_into_the_first(assert_refs_resolve):
+    build = document(
+        {
+            "Address": obj(street={"type": "string"}),
+            "Location": obj(street={"type": "string"}),
+            "Home": obj(address=ref("Address")),
+            # Identical once Location is known to equal Address.
+            "Office": obj(address=ref("Location")),
+            "Tags": {"type": "array", "items": ref("Location")},
+        },
+        {"/office": {"get": {"responses": {"200": response(ref("Office"))}}}},
+    )
+    result = deduplicate_schemas(build)
+
+    assert result.aliases == {"Location": "Address", "Office": "Home"}
+    assert result.removed == 2
+    assert list(build["components"]["schemas"]) == ["Address", "Home", "Tags"]
+    refs = assert_refs_resolve(build)
+    assert "#/components/schemas/Location" not in refs
+    assert build["components"]["schemas"]["Tags"]["items"] == ref("Address")
+    operation = build["paths"]["/office"]["get"]
+    assert operation["responses"]["200"] == response(ref("Home"))
+
+
+def test_distinct_schemas_are_kept():
+    schemas = {
+        "Address": obj(street={"type": "string"}),
+        "Zip": obj(street={"type": "integer"}),
+        "Home": obj(address=ref("Address")),
+        "Plot": obj(address=ref("Zip")),
+    }
+    build = document(copy.deepcopy(schemas))
+    assert deduplicate_schemas(build).removed == 0
+    assert build["components"]["schemas"] == schemas
+
+
+def test_recursive_schemas_keep_resolving(assert_refs_resolve):
+    build = document(
+        {
+            "Node": obj(children={"type": "array", "items": ref("Node")}),
+            "Tree": obj(children={"type": "array", "items": ref("Tree")}),
+            "Forest": obj(root=ref("Tree")),
+        }
+    )
+    deduplicate_schemas(build)
+    assert "Forest" in build["components"]["schemas"]
+    assert_refs_resolve(build)
+
+
+def test_generated_spec_refs_resolve_after_dedup(
+    synthetic_configs, make_generator, assert_refs_resolve
+):
+    generator = make_generator(synthetic_configs, dedup_schemas=True)
+    generator.generate()
+    assert generator.dedup_result.removed > 0
+
+    build = generator.openapi_build
+    assert_refs_resolve(build)
+    schemas = build["components"]["schemas"]
+    assert not set(generator.dedup_result.aliases) & set(schemas)
+    # Refs now point at survivors, so no two remaining schemas are equal.
+    texts = [json.dumps(schema, sort_keys=True) for schema in schemas.values()]
+    assert len(set(texts)) == len(texts)
@@ -0,0 +1,61 @@
+import textwrap
+
+import pytest
+
+from discovery import EndpointDiscovery
+
+DECORATED = """
+from registry import EndpointRegistry
+from example_service_endpoint import RequestSchema, ResponseSchema
+
+api = EndpointRegistry()
+
+
+@api.endpoint(
+    serviceInput=RequestSchema,
+    serviceOutput=ResponseSchema,
+    httpMethod="GET",
+    httpPath="ping/{userId}",
+)
+def ping(event, context):
+    return {"statusCode": 200}
+"""
+
+DECLARED = """
+import dataclasses
+import example_service_endpoint as example
+from gen_types import GeneratorConfig
+
+config: GeneratorConfig = dataclasses.replace(
+    example.endpoint_config, operationId="declared"
+)
+"""
+
+
+@pytest.fixture
+def package(tmp_path, monkeypatch):
+    root = tmp_path / "discovered_svc"
+    root.mkdir()
+    (root / "__init__.py").write_text("")
+    (root / "decorated.py").write_text(textwrap.dedent(DECORATED))
+    (root / "declared.py").write_text(textwrap.dedent(DECLARED))
+    (root / "helpers.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return root
+
+
+def test_package_scan_finds_decorated_handlers(package):
+    discovery = EndpointDiscovery()
+    configs = discovery.discover_package("discovered_svc")
+    assert sorted(c.operationId for c in configs) == ["declared", "ping"]
+    # Files without an endpoint marker are not imported at all.
+    assert discovery.skipped == 2  # __init__ and helpers
+
+
+def test_index_remembers_decorated_modules(package, tmp_path):
+    index = str(tmp_path / "index.json")
+    first = EndpointDiscovery(index_file=index)
+    first.discover_package("discovered_svc")
+    first.save_index()
+    again = EndpointDiscovery(index_file=index).discover_package("discovered_svc")
+    assert sorted(c.operationId for c in again) == ["declared", "ping"]
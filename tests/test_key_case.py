@@ -0,0 +1,54 @@
+import pytest
+
+from example_service_endpoint import endpoint_config
+from utils import KEY_CASE_CONVERSIONS
+
+
+@pytest.fixture
+def build(make_generator):
+    def build(key_case):
+        generator = make_generator(endpoint_config, schema_key_case=key_case)
+        generator.generate()
+        return generator.openapi_build
+
+    return build
+
+
+def iter_object_schemas(node):
+    if isinstance(node, dict):
+        if isinstance(node.get("properties"), dict):
+            yield node
+        for value in node.values():
+            yield from iter_object_schemas(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from iter_object_schemas(item)
+
+
+@pytest.mark.parametrize("key_case", sorted(KEY_CASE_CONVERSIONS))
+def test_every_ref_resolves(build, assert_refs_resolve, key_case):
+    assert assert_refs_resolve(build(key_case))
+
+
+@pytest.mark.parametrize("key_case", sorted(KEY_CASE_CONVERSIONS))
+def test_required_names_properties(build, key_case):
+    spec = build(key_case)
+    for schema in iter_object_schemas(spec["components"]["schemas"]):
+        assert set(schema.get("required", ())) <= set(schema["properties"])
+
+
+@pytest.mark.parametrize("key_case", sorted(KEY_CASE_CONVERSIONS))
+def test_structure_is_not_cased(build, key_case):
+    spec = build(key_case)
+    assert not {"domainName", "DomainName", "domain_name", "domain-name"} & set(
+        spec["components"]["schemas"]
+    )
+    names = [p["name"] for p in spec["components"]["parameters"].values()]
+    assert "userId" in names  # as in the world/{userId} template
+
+
+def test_property_names_follow_case(build):
+    spec = build("snake")
+    schema = spec["components"]["schemas"]["QueryStringParametersOrganization"]
+    assert list(schema["properties"]) == ["organization_name"]
+    assert schema["required"] == ["organization_name"]
@@ -0,0 +1,42 @@
+import pytest
+
+import openapi_gen
+
+
+@pytest.fixture
+def run(tmp_path):
+    output = str(tmp_path / "openapi.yaml")
+
+    def run(command, *options):
+        config = "example_service_endpoint:endpoint_config"
+        return openapi_gen.main([command, "--config", config, "-o", output, *options])
+
+    run.output = output
+    return run
+
+
+def test_check_passes_on_a_freshly_generated_spec(run, capsys):
+    assert run("generate") == 0
+    assert run("check") == 0
+    assert "up to date" in capsys.readouterr().out
+
+
+def test_check_fails_on_a_stale_spec(run, capsys):
+    assert run("generate") == 0
+    with open(run.output, "a") as f:
+        f.write("# edited by hand\n")
+    capsys.readouterr()
+
+    assert run("check") == 1
+    assert f"out of date: {run.output}" in capsys.readouterr().out
+
+
+def test_check_fails_when_options_change_the_output(run, capsys):
+    assert run("generate") == 0
+    assert run("check", "--title", "Renamed") == 1
+    assert run("check", "--format", "yaml", "--format", "json") == 1
+    assert "openapi.json" in capsys.readouterr().out
+
+
+def test_check_fails_on_a_missing_spec(run):
+    assert run("check") == 1
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+import yaml
+
+from _tool import OutputFormat
+from example_service_endpoint import endpoint_config
+
+
+def test_format_values_select_the_writer(make_generator, tmp_path):
+    generator = make_generator(
+        endpoint_config,
+        "openapi.json",
+        collect_stats=True,
+        output_format=["json", "yaml"],
+    )
+    assert generator.output_formats == [OutputFormat.Json, OutputFormat.Yaml]
+    generator.generate()
+    with open(tmp_path / "openapi.yaml") as f:
+        assert yaml.safe_load(f)["openapi"] == "3.1.0"
+    with open(tmp_path / "openapi.json") as f:
+        assert json.load(f)["openapi"] == "3.1.0"
+
+
+def test_yaml_value_writes_yaml(make_generator, tmp_path):
+    make_generator(endpoint_config, output_format="yaml").generate()
+    assert (tmp_path / "openapi.yaml").read_text().startswith("openapi:")
+
+
+@pytest.mark.parametrize("output_format", ["yml", None, ["yaml", "xml"]])
+def test_unknown_formats_are_rejected(make_generator, output_format):
+    with pytest.raises(ValueError, match="Invalid output format"):
+        make_generator(endpoint_config, output_format=output_format)
@@ -0,0 +1,38 @@
+import os
+import stat
+
+import pytest
+
+from output_sink import AtomicFileSink
+
+
+@pytest.fixture
+def umask():
+    previous = os.umask(0o027)
+    yield 0o027
+    os.umask(previous)
+
+
+def mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+def test_new_files_follow_the_umask(tmp_path, umask):
+    sink = AtomicFileSink(skip_unchanged=True, compress={"gz": 1})
+    path = tmp_path / "openapi.yaml"
+    assert sink.write(str(path), lambda f: f.write("openapi: 3.1.0\n"))
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names == ["openapi.yaml", "openapi.yaml.gz", "openapi.yaml.sha256"]
+    for name in names:
+        assert mode(tmp_path / name) == 0o666 & ~umask
+
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+def test_rewrites_keep_the_existing_mode(tmp_path, umask):
+    path = tmp_path / "openapi.yaml"
+    path.write_text("old\n")
+    os.chmod(path, 0o604)
+    AtomicFileSink().write(str(path), lambda f: f.write("new\n"))
+    assert path.read_text() == "new\n"
+    assert mode(path) == 0o604
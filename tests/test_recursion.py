@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import dataclasses
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import pytest
+
+from _tool import OpenApiGenerator
+from fragment_cache import iter_referenced_types
+from gen_types import AbstractInput, AbstractOutput, GeneratorConfig
+
+
+@dataclass
+class TreeNode:
+    name: str
+    children: list[TreeNode] = field(default_factory=list)
+    parent: Optional[TreeNode] = None
+
+
+@dataclass
+class Author:
+    name: str
+    books: List[Book] = field(default_factory=list)
+
+
+@dataclass
+class Book:
+    title: str
+    author: Optional[Author] = None
+
+
+def make_config(body_type, name):
+    request = dataclasses.make_dataclass(
+        f"{name}Request",
+        [("bodyInput", Optional[body_type], None)],
+        bases=(AbstractInput,),
+    )
+    body = dataclasses.make_dataclass(
+        f"{name}Body",
+        [("_contentType", str, "application/json"), ("item", body_type, None)],
+    )
+    response = dataclasses.make_dataclass(
+        f"{name}Response", [("bodyOutput", body, None)], bases=(AbstractOutput,)
+    )
+    return GeneratorConfig(
+        serviceName=name,
+        description=name,
+        operationId=f"post{name}",
+        httpMethod="POST",
+        httpPath=name.lower(),
+        serviceInput=request,
+        serviceOutput=response,
+    )
+
+
+@pytest.fixture
+def generate(make_generator):
+    def generate(config):
+        generator = make_generator(config)
+        generator.generate()
+        return generator.getSchemas()
+
+    return generate
+
+
+def test_self_referencing_dataclass_with_string_annotations(generate):
+    schemas = generate(make_config(TreeNode, "Tree"))
+    properties = schemas["TreeNode"]["properties"]
+    assert properties["children"]["items"] == {"$ref": "#/components/schemas/TreeNode"}
+    assert "#/components/schemas/TreeNode" in str(properties["parent"])
+
+
+def test_mutually_recursive_dataclasses(generate):
+    schemas = generate(make_config(Author, "Library"))
+    assert {"Author", "Book"} <= set(schemas)
+    assert "#/components/schemas/Author" in str(schemas["Book"])
+    assert set(iter_referenced_types(Author)) >= {Author, Book}
+
+
+def test_deep_chain_does_not_exhaust_the_stack():
+    depth = 16_000
+    link = dataclasses.make_dataclass("Link0", [("value", int)])
+    for idx in range(1, depth):
+        # Without generated methods or a docstring, dataclass() stays cheap
+        # enough to build the chain in about a second.
+        namespace = {
+            "__annotations__": {"value": int, "next": Optional[link]},
+            "__doc__": f"Link {idx}.",
+            "next": None,
+        }
+        link = dataclasses.dataclass(
+            type(f"Link{idx}", (), namespace), init=False, repr=False, eq=False
+        )
+    _, definitions = OpenApiGenerator.dataclass_to_openapi_schema(link)
+    assert all(f"Link{idx}" in definitions for idx in range(depth))
+    assert len(list(iter_referenced_types(link))) >= depth
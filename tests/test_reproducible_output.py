@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+
+import pytest
+import yaml
+
+from _tool import OpenApiGenerator
+from gen_types import AbstractInput, AbstractOutput, GeneratorConfig
+
+
+def read(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+@pytest.fixture
+def build(synthetic_configs, make_generator):
+    def build(name, jobs=1, configs=None, **options):
+        generator = make_generator(configs or synthetic_configs, name, **options)
+        generator.generate(jobs=jobs)
+        return read(generator.output_openapi_file)
+
+    return build
+
+
+@pytest.fixture
+def reference(build):
+    return build("reference.yaml")
+
+
+def test_resolver_cache_does_not_change_output(build, reference, monkeypatch):
+    monkeypatch.setattr(OpenApiGenerator.resolver_cache, "enabled", False)
+    assert build("uncached.yaml") == reference
+
+
+def test_parallel_build_matches_serial_build(build, reference):
+    assert build("parallel.yaml", jobs=4) == reference
+
+
+def test_fragment_cache_cold_and_warm_match(
+    synthetic_configs, make_generator, tmp_path, build, reference
+):
+    cache = str(tmp_path / "fragments.json")
+    assert build("cold.yaml", fragment_cache_file=cache) == reference
+    warm = make_generator(synthetic_configs, "warm.yaml", fragment_cache_file=cache)
+    warm.generate()
+    assert warm.fragment_cache.hits == len(synthetic_configs)
+    assert read(warm.output_openapi_file) == reference
+
+
+def test_streaming_writer_matches_yaml_dump(build, reference):
+    assert build("streamed.yaml", stream_output=True) == reference
+
+
+@dataclass
+class Cat:
+    name: str
+
+
+@dataclass
+class Dog:
+    name: str
+
+
+@dataclass
+class CatFirst:
+    pet: Cat | Dog
+    _contentType: str = "application/json"
+
+
+@dataclass
+class DogFirst:
+    pet: Dog | Cat
+    _contentType: str = "application/json"
+
+
+@dataclass
+class CatFirstRequest(AbstractInput):
+    domainName = "cats"
+
+
+@dataclass
+class CatFirstResponse(AbstractOutput[CatFirst]):
+    bodyOutput: CatFirst
+
+
+@dataclass
+class DogFirstRequest(AbstractInput):
+    domainName = "dogs"
+
+
+@dataclass
+class DogFirstResponse(AbstractOutput[DogFirst]):
+    bodyOutput: DogFirst
+
+
+UNION_CONFIGS = [
+    GeneratorConfig(
+        serviceName=name,
+        description=name,
+        operationId=f"post{name}",
+        httpMethod="POST",
+        httpPath=name.lower(),
+        serviceInput=request,
+        serviceOutput=response,
+    )
+    for name, request, response in [
+        ("CatFirst", CatFirstRequest, CatFirstResponse),
+        ("DogFirst", DogFirstRequest, DogFirstResponse),
+    ]
+]
+
+
+def one_of(schema):
+    return [variant["$ref"].rsplit("/", 1)[1] for variant in schema["oneOf"]]
+
+
+def test_union_variants_keep_their_declared_order():
+    OpenApiGenerator.resolver_cache.clear()
+    for cls in (CatFirst, DogFirst, CatFirst):
+        schema, definitions = OpenApiGenerator.dataclass_to_openapi_schema(cls)
+        expected = ["Cat", "Dog"] if cls is CatFirst else ["Dog", "Cat"]
+        assert one_of(definitions[cls.__name__]["properties"]["pet"]) == expected
+
+
+@pytest.mark.parametrize("order", [1, -1])
+def test_reordered_unions_match_across_jobs(build, order):
+    configs = UNION_CONFIGS[::order]
+    serial = build("serial.yaml", configs=configs)
+    assert build("parallel.yaml", jobs=2, configs=configs) == serial
+    schemas = yaml.safe_load(serial)["components"]["schemas"]
+    assert one_of(schemas["CatsCatFirst"]["properties"]["pet"]) == ["Cat", "Dog"]
+    assert one_of(schemas["DogsDogFirst"]["properties"]["pet"]) == ["Dog", "Cat"]
@@ -0,0 +1,181 @@
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+import pytest
+
+from decoding import EventDecodeError, decode_event
+from gen_types import AbstractInput, AbstractOutput, GeneratorConfig
+from serializers import serialize_response
+from validators import get_validator
+
+
+@dataclass
+class Filters:
+    active: bool
+
+
+@dataclass
+class FilterRequest(AbstractInput[Filters, None, None, None]):
+    queryStringParameters: Filters
+
+
+def query(**values):
+    return {"queryStringParameters": values}
+
+
+@pytest.mark.parametrize("text", ["true", "True", "TRUE", "1", "false", "0"])
+def test_boolean_text_accepted_by_both(text):
+    assert get_validator(FilterRequest)(query(active=text)) == []
+    decoded = decode_event(FilterRequest, query(active=text))
+    assert decoded.queryStringParameters.active is (text.lower() in ("true", "1"))
+
+
+@pytest.mark.parametrize("text", ["yes", "2", ""])
+def test_boolean_text_rejected_by_both(text):
+    assert get_validator(FilterRequest)(query(active=text)) == [
+        "queryStringParameters.active: expected a boolean"
+    ]
+    with pytest.raises(EventDecodeError):
+        decode_event(FilterRequest, query(active=text))
+
+
+@dataclass
+class AccountQuery:
+    is_active: bool
+
+
+@dataclass
+class AccountPath:
+    user_id: int
+
+
+@dataclass
+class AccountBody:
+    display_name: str
+    _contentType: str = "application/json"
+
+
+@dataclass
+class AccountRequest(AbstractInput[AccountQuery, None, AccountPath, None]):
+    queryStringParameters: AccountQuery
+    pathParameters: AccountPath
+
+
+@dataclass
+class AccountResponse(AbstractOutput[AccountBody]):
+    bodyOutput: AccountBody
+
+
+account_config = GeneratorConfig(
+    serviceName="Accounts",
+    description="Read an account",
+    operationId="getAccount",
+    httpMethod="GET",
+    httpPath="accounts/{user_id}",
+    serviceInput=AccountRequest,
+    serviceOutput=AccountResponse,
+)
+
+
+def test_default_key_case_follows_default_spec(make_generator):
+    generator = make_generator(account_config)
+    generator.generate()
+    properties = {
+        name
+        for schema in generator.getSchemas().values()
+        for name in schema.get("properties", {})
+    }
+    assert {"isActive", "userId", "displayName"} <= properties
+
+    event = {
+        "queryStringParameters": {"isActive": "true"},
+        "pathParameters": {"user_id": "7"},
+    }
+    assert get_validator(AccountRequest)(event) == []
+    decoded = decode_event(AccountRequest, event)
+    assert decoded.queryStringParameters.is_active is True
+    assert decoded.pathParameters.user_id == 7
+    response = serialize_response(AccountResponse(AccountBody("Ada")))
+    assert json.loads(response["body"]) == {"displayName": "Ada"}
+
+
+@dataclass
+class Ambiguous:
+    number_first: int | str
+    text_first: str | int
+
+
+@dataclass
+class AmbiguousRequest(AbstractInput[Ambiguous, None, None, None]):
+    queryStringParameters: Ambiguous
+
+
+def test_union_variants_are_tried_in_declared_order():
+    event = query(numberFirst="1", textFirst="1")
+    assert get_validator(AmbiguousRequest)(event) == []
+    decoded = decode_event(AmbiguousRequest, event).queryStringParameters
+    assert decoded == Ambiguous(number_first=1, text_first="1")
+
+
+@dataclass
+class ApiHeaders:
+    x_api_key: str
+
+
+@dataclass
+class HeaderRequest(AbstractInput[None, None, None, ApiHeaders]):
+    headers: ApiHeaders
+
+
+@pytest.mark.parametrize("name", ["X-Api-Key", "x-api-key", "x_api_key"])
+def test_multi_word_headers_match_both(name):
+    event = {"headers": {name: "secret"}}
+    assert get_validator(HeaderRequest)(event) == []
+    assert decode_event(HeaderRequest, event).headers.x_api_key == "secret"
+
+
+@dataclass
+class IdsQuery:
+    ids: list[int]
+
+
+@dataclass
+class NameBody:
+    name: str
+
+
+@dataclass
+class SearchRequest(AbstractInput[IdsQuery, NameBody, None, None]):
+    queryStringParameters: IdsQuery
+    bodyInput: Optional[NameBody] = None
+
+
+@pytest.mark.parametrize("ids", ["1,x", ["1", "x"]])
+def test_list_items_checked_by_both(ids):
+    event = query(ids=ids)
+    assert get_validator(SearchRequest)(event) == [
+        "queryStringParameters.ids[]: expected an integer"
+    ]
+    with pytest.raises(EventDecodeError):
+        decode_event(SearchRequest, event)
+
+
+def test_joined_list_accepted_by_both():
+    assert get_validator(SearchRequest)(query(ids="1,2")) == []
+    decoded = decode_event(SearchRequest, query(ids="1,2"))
+    assert decoded.queryStringParameters.ids == [1, 2]
+
+
+def test_empty_body_is_absent_for_both():
+    event = {**query(ids="1"), "body": ""}
+    assert get_validator(SearchRequest)(event) == []
+    assert decode_event(SearchRequest, event).bodyInput is None
+
+
+def test_invalid_body_reported_with_other_errors():
+    errors = get_validator(SearchRequest)({"queryStringParameters": {}, "body": "{"})
+    assert errors == [
+        "queryStringParameters.ids: is required",
+        "body: is not valid JSON",
+    ]
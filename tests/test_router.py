@@ -0,0 +1,92 @@
+import dataclasses
+
+import pytest
+
+from example_service_endpoint import PathParameters, endpoint_config
+from registry import EndpointConflictError, EndpointRegistry
+from router import PathRouter
+
+
+def route(httpMethod, httpPath):
+    operationId = f"{httpMethod.lower()} {httpPath}"
+    return dataclasses.replace(
+        endpoint_config,
+        httpMethod=httpMethod,
+        httpPath=httpPath,
+        operationId=operationId,
+    )
+
+
+@pytest.fixture
+def router():
+    return PathRouter.from_configs(
+        [
+            route("GET", "world/{userId}"),
+            route("GET", "world/me"),
+            route("POST", "world/me/avatar"),
+            route("GET", "world/{userId}/avatar"),
+            route("GET", "world/{proxy+}"),
+            route("ANY", "files/{path+}"),
+            route("DELETE", "files/{path+}"),
+        ]
+    )
+
+
+def operation(router, httpMethod, path):
+    match = router.match(httpMethod, path)
+    return match.route.config.operationId if match is not None else None
+
+
+def test_literal_segments_win_over_parameters(router):
+    assert operation(router, "GET", "/world/me") == "get world/me"
+    assert operation(router, "GET", "/world/42") == "get world/{userId}"
+
+
+def test_parameters_win_over_greedy_parameters(router):
+    assert operation(router, "GET", "/world/42/avatar") == "get world/{userId}/avatar"
+    assert operation(router, "GET", "/world/42/a/b") == "get world/{proxy+}"
+
+
+def test_falls_back_when_the_literal_branch_has_no_route(router):
+    # world/me/friends has no literal route, so {userId} is tried next.
+    assert operation(router, "GET", "/world/me/friends") == "get world/{proxy+}"
+
+
+def test_method_is_looked_up_on_the_most_specific_path(router):
+    # world/me/avatar exists for POST only; the less specific
+    # world/{userId}/avatar is not used for GET.
+    assert router.match("GET", "/world/me/avatar") is None
+    assert router.allowed_methods("/world/me/avatar") == ["POST"]
+    response = router.dispatch({"httpMethod": "GET", "path": "/world/me/avatar"})
+    assert response["statusCode"] == 405
+    assert response["headers"] == {"Allow": "POST"}
+
+
+def test_any_is_the_method_fallback(router):
+    assert operation(router, "DELETE", "/files/a/b") == "delete files/{path+}"
+    assert operation(router, "PUT", "/files/a/b") == "any files/{path+}"
+    assert router.match("PUT", "/files/a/b").params == {"path": "a/b"}
+
+
+def test_path_parameters_are_decoded(router):
+    match = router.match("GET", "/world/42")
+    assert match.params == {"userId": "42"}
+    assert match.path_parameters == PathParameters(userId="42")
+
+
+def test_conflicting_routes_are_rejected(router):
+    with pytest.raises(EndpointConflictError):
+        router.add(route("GET", "world/{otherId}"))
+    with pytest.raises(ValueError):
+        router.add(route("GET", "world/{proxy+}/tail"))
+
+
+def test_registry_and_router_agree_on_greedy_parameters():
+    registry = EndpointRegistry()
+    registry.add(route("GET", "files/{id}"), lambda event, context: "one")
+    registry.add(route("GET", "files/{proxy+}"), lambda event, context: "rest")
+    with pytest.raises(EndpointConflictError):
+        registry.add(route("GET", "files/{name}"))
+    router = PathRouter.from_registry(registry)
+    assert router.dispatch({"httpMethod": "GET", "path": "/files/a"}) == "one"
+    assert router.dispatch({"httpMethod": "GET", "path": "/files/a/b"}) == "rest"
@@ -0,0 +1,87 @@
+import json
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import pytest
+
+from _tool import OpenApiGenerator
+from gen_types import AbstractInput, AbstractOutput
+from serializers import get_body_serializer
+from utils import get_key_converter
+from validators import get_validator
+
+
+@dataclass
+class Owner:
+    display_name: str
+
+
+@dataclass
+class Listing:
+    listing_id: int
+    extra: Dict[str, Any]
+    payload: Any
+
+
+@pytest.mark.parametrize(
+    "key_case, owner_key",
+    [("camel", "displayName"), ("snake", "display_name"), (None, "display_name")],
+)
+def test_nested_dataclasses_use_the_outer_key_case(key_case, owner_key):
+    listing = Listing(7, {"owner": Owner("Ada"), "tags": [Owner("Bo")]}, Owner("Cy"))
+    body = json.loads(get_body_serializer(Listing, key_case)(listing))
+    listing_key = "listing_id" if key_case != "camel" else "listingId"
+    assert body == {
+        listing_key: 7,
+        "extra": {"owner": {owner_key: "Ada"}, "tags": [{owner_key: "Bo"}]},
+        "payload": {owner_key: "Cy"},
+    }
+
+
+def test_plain_values_are_encoded_as_given():
+    listing = Listing(1, {"count": 2, 3: None, "ok": True}, [1.5, "x"])
+    text = get_body_serializer(Listing)(listing)
+    assert json.loads(text) == json.loads(
+        json.dumps({"listingId": 1, "extra": listing.extra, "payload": listing.payload})
+    )
+
+
+@dataclass
+class Directory:
+    owners: Dict[str, Owner]
+    extra: dict
+    _contentType: str = "application/json"
+
+
+@dataclass
+class DirectoryRequest(AbstractInput[None, Directory, None, None]):
+    bodyInput: Directory
+
+
+@dataclass
+class DirectoryResponse(AbstractOutput[Directory]):
+    bodyOutput: Directory
+
+
+def test_dict_fields_are_published_and_written_as_objects():
+    _, definitions = OpenApiGenerator.dataclass_to_openapi_schema(
+        Directory, key_format=get_key_converter("camel")
+    )
+    properties = definitions["Directory"]["properties"]
+    assert properties["owners"] == {
+        "type": "object",
+        "additionalProperties": {"$ref": "#/components/schemas/Owner"},
+    }
+    assert properties["extra"] == {"type": "object"}
+    assert list(definitions["Owner"]["properties"]) == ["displayName"]
+
+    directory = Directory({"ada": Owner("Ada")}, {"n": 1})
+    body = json.loads(get_body_serializer(Directory)(directory))
+    assert body == {"owners": {"ada": {"displayName": "Ada"}}, "extra": {"n": 1}}
+
+
+def test_dict_fields_must_be_objects_in_json_bodies():
+    event = {"body": json.dumps({"owners": {}, "extra": "text"})}
+    assert get_validator(DirectoryRequest)(event) == [
+        "bodyInput.extra: expected an object"
+    ]
@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from _tool import OUTPUT_EXTENSIONS, OutputFormat
+from split import bundle
+
+
+def normalized(document):
+    # YAML reads numeric keys such as response codes back as integers.
+    return json.loads(json.dumps(document, sort_keys=True))
+
+
+@pytest.mark.parametrize("output_format", [OutputFormat.Yaml, OutputFormat.Json])
+def test_bundle_restores_the_single_file_document(
+    synthetic_configs, make_generator, assert_refs_resolve, tmp_path, output_format
+):
+    root = tmp_path / f"openapi{OUTPUT_EXTENSIONS[output_format]}"
+    generator = make_generator(
+        synthetic_configs,
+        root.name,
+        output_format=output_format,
+        split_output=True,
+    )
+    generator.generate()
+
+    assert (tmp_path / "components" / "schemas").is_dir()
+    assert (tmp_path / "paths").is_dir()
+    bundled = bundle(str(root))
+    assert normalized(bundled) == normalized(generator.openapi_build)
+    assert_refs_resolve(bundled)
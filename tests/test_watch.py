@@ -0,0 +1,140 @@
+import builtins
+import os
+import sys
+import textwrap
+
+import pytest
+
+import watch
+from _tool import SearchEndpointDeclaration
+from watch import SpecWatcher
+
+PACKAGE = "watched_api"
+
+MODELS = """
+from dataclasses import dataclass
+
+
+@dataclass
+class Item:
+    item_name: str
+"""
+
+ENDPOINT = """
+from dataclasses import dataclass
+
+from gen_types import AbstractInput, AbstractOutput, GeneratorConfig
+{imports}
+
+
+@dataclass
+class {name}Body:
+    {field}: {type}
+    _contentType: str = "application/json"
+
+
+@dataclass
+class {name}Request(AbstractInput):
+    domainName = "{domain}"
+
+
+@dataclass
+class {name}Response(AbstractOutput[{name}Body]):
+    bodyOutput: {name}Body
+
+
+config = GeneratorConfig(
+    "Service", "d", "get{name}", "GET", "{domain}", {name}Request, {name}Response
+)
+"""
+
+
+def endpoint(name, field, type_, imports=""):
+    return ENDPOINT.format(
+        name=name, field=field, type=type_, imports=imports, domain=name.lower()
+    )
+
+
+def write(path, text):
+    # Bump the mtime explicitly so the edit is seen whatever the timestamp
+    # resolution of the filesystem.
+    path.write_text(textwrap.dedent(text))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+@pytest.fixture
+def source(tmp_path):
+    root = tmp_path / "src"
+    package = root / PACKAGE
+    package.mkdir(parents=True)
+    write(package / "__init__.py", "")
+    write(package / "models.py", MODELS)
+    write(
+        package / "items.py",
+        endpoint("Items", "item", "Item", f"from {PACKAGE}.models import Item"),
+    )
+    write(package / "others.py", endpoint("Others", "value", "str"))
+    write(package / "notes.py", "NOTES = []\n")
+    yield package
+    for name in [n for n in sys.modules if n.split(".")[0] == PACKAGE]:
+        del sys.modules[name]
+    if str(root) in sys.path:
+        sys.path.remove(str(root))
+
+
+@pytest.fixture
+def watcher(source, make_generator):
+    generator = make_generator(
+        search_endpoint_declaration=SearchEndpointDeclaration.DirectoryScan,
+        scan_directory=str(source.parent),
+    )
+    watcher = SpecWatcher(generator)
+    assert watcher.start().rebuilt == 2
+    return watcher
+
+
+def test_rebuild_reflects_only_affected_endpoints(
+    watcher, source, make_generator, tmp_path
+):
+    write(source / "models.py", MODELS + "    count: int\n")
+    changed = watcher.poll()
+    assert changed == {f"{PACKAGE}.models"}
+    result = watcher.rebuild(changed)
+    assert result.rebuilt == 1
+    assert set(result.reloaded) == {f"{PACKAGE}.models", f"{PACKAGE}.items"}
+    item = watcher.generator.getSchemas()["Item"]
+    assert list(item["properties"]) == ["itemName", "count"]
+
+    written = (tmp_path / "openapi.yaml").read_text()
+    make_generator(
+        name="fresh.yaml",
+        search_endpoint_declaration=SearchEndpointDeclaration.DirectoryScan,
+        scan_directory=str(source.parent),
+    ).generate()
+    assert (tmp_path / "fresh.yaml").read_text() == written
+
+
+def test_new_endpoint_module_joins_the_spec(watcher, source):
+    write(source / "extra.py", endpoint("Extra", "flag", "bool"))
+    changed = watcher.poll()
+    assert changed == {f"{PACKAGE}.extra"}
+    assert watcher.rebuild(changed).rebuilt == 1
+    assert len(watcher.generator.endpoint_config) == 3
+
+
+def test_unmarked_modules_are_read_only_after_a_change(watcher, source, monkeypatch):
+    watcher.poll()
+    reads = []
+
+    def recording_open(path, *args, **kwargs):
+        reads.append(os.path.basename(path))
+        return builtins.open(path, *args, **kwargs)
+
+    monkeypatch.setattr(watch, "open", recording_open, raising=False)
+    assert watcher.poll() == set()
+    assert reads == []
+
+    write(source / "notes.py", "NOTES = [1]\n")
+    assert watcher.poll() == set()
+    assert reads == ["notes.py"]
@@ -0,0 +1,162 @@
+"""Resolved type hints of dataclasses, evaluated once per class.
+
+``dataclasses.Field.type`` is whatever the class body annotated, which under
+``from __future__ import annotations`` is a string. Everything that reflects
+fields goes through ``field_types``/``get_type_hints`` here instead: the
+annotations of a class are evaluated against the namespace of the module
+defining it (and its bases' modules), forward references included, and the
+result is cached per class.
+
+Names that cannot be resolved raise ``UnresolvedAnnotationError`` instead of
+silently falling back to the annotation string. The usual cause is a class
+defined inside a function referring to another local class; define both at
+module level.
+"""
+
+import dataclasses
+import re
+import threading
+import time
+import typing
+from typing import Any, Dict, Hashable, List, Optional, Tuple, get_args, get_origin
+
+
+class UnresolvedAnnotationError(ValueError):
+    """An annotation names something its module does not define."""
+
+    def __init__(
+        self,
+        cls: type,
+        field: Optional[str],
+        annotation: Optional[str],
+        reason: str,
+    ):
+        self.cls = cls
+        self.field = field
+        self.annotation = annotation
+        where = f"{cls.__module__}.{cls.__qualname__}"
+        if field is not None:
+            where = f"{where}.{field}: {annotation}"
+        super().__init__(f"Cannot resolve the annotation of {where} ({reason}).")
+
+
+def _annotation_text(annotation: Any) -> str:
+    return annotation if isinstance(annotation, str) else repr(annotation)
+
+
+def _unresolved(cls: type, exc: Exception) -> UnresolvedAnnotationError:
+    name = getattr(exc, "name", None)
+    reason = f"{name!r} is not defined in {cls.__module__}" if name else str(exc)
+    if name:
+        pattern = re.compile(rf"\b{re.escape(name)}\b")
+        for base in reversed(cls.__mro__):
+            for field, annotation in vars(base).get("__annotations__", {}).items():
+                text = _annotation_text(annotation)
+                if pattern.search(text):
+                    return UnresolvedAnnotationError(cls, field, text, reason)
+    return UnresolvedAnnotationError(cls, None, None, reason)
+
+
+def type_key(tp: Any) -> Hashable:
+    """Key for caching by type that keeps the order of union variants.
+
+    ``A | B == B | A`` (and ``Union[A, B] == Union[B, A]``) with equal hashes,
+    so a cache keyed on the type itself would hand a field typed ``B | A`` the
+    entry built for ``A | B``. Generic aliases are keyed by their origin and
+    the keys of their arguments, in order.
+    """
+    args = get_args(tp)
+    if not args:
+        return tp
+    return get_origin(tp), tuple(type_key(arg) for arg in args)
+
+
+def _mentions_module(tp: Any, module_name: str) -> bool:
+    if getattr(tp, "__module__", None) == module_name and isinstance(tp, type):
+        return True
+    return any(_mentions_module(arg, module_name) for arg in get_args(tp))
+
+
+class TypeHintCache:
+    """Process-wide memo of ``typing.get_type_hints`` per class.
+
+    ``seconds`` accumulates the time spent evaluating annotations on misses,
+    which the generator reports in its build statistics.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.seconds = 0.0
+        self._hints: Dict[type, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._hints)
+
+    def hints(self, cls: Any) -> Dict[str, Any]:
+        """Resolved annotations of ``cls`` and its bases. Do not mutate."""
+        cached = self._hints.get(cls)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        if not isinstance(cls, type):
+            return {}
+
+        start = time.perf_counter()
+        try:
+            hints = typing.get_type_hints(cls)
+        except (NameError, AttributeError, TypeError, SyntaxError) as exc:
+            raise _unresolved(cls, exc) from exc
+        finally:
+            self.seconds += time.perf_counter() - start
+        with self._lock:
+            self.misses += 1
+            self._hints[cls] = hints
+        return hints
+
+    def field_types(self, cls: Any) -> List[Tuple[dataclasses.Field, Any]]:
+        """Dataclass fields of ``cls`` paired with their resolved types."""
+        hints = self.hints(cls)
+        return [(f, hints.get(f.name, f.type)) for f in dataclasses.fields(cls)]
+
+    def invalidate_module(self, module_name: str) -> int:
+        """Drop the classes of ``module_name`` and those annotated with them."""
+        with self._lock:
+            stale = [
+                cls
+                for cls, hints in self._hints.items()
+                if cls.__module__ == module_name
+                or any(_mentions_module(tp, module_name) for tp in hints.values())
+            ]
+            for cls in stale:
+                del self._hints[cls]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._hints.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.seconds = 0.0
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "seconds": self.seconds,
+            "classes": len(self._hints),
+        }
+
+
+type_hints = TypeHintCache()
+
+
+def get_type_hints(cls: Any) -> Dict[str, Any]:
+    return type_hints.hints(cls)
+
+
+def field_types(cls: Any) -> List[Tuple[dataclasses.Field, Any]]:
+    return type_hints.field_types(cls)
@@ -1,4 +1,6 @@
-from typing import Any, Callable, Union
+import functools
+import re
+from typing import Any, Callable, Dict, Union
 
 
 def snake_case_to_camel_case(string):
@@ -10,9 +12,120 @@ def snake_case_to_camel_case(string):
             if w
         ]
     )
-def deep_change_keys_by_format(entity: Union[dict, list, Any], format: Callable):
 
 
+_WORD_BOUNDARY = re.compile(
+    r"[_\-\s]+|(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])"
+)
+
+
+def split_words(string: str):
+    return [w for w in _WORD_BOUNDARY.split(string) if w]
+
+
+def word_key(name: str) -> str:
+    """``name`` with case and separators dropped: user_id, userId -> userid."""
+    return "".join(split_words(name)).lower()
+
+
+def snake_case_to_pascal_case(string):
+    camel = snake_case_to_camel_case(string)
+    return f"{camel[:1].upper()}{camel[1:]}"
+
+
+def to_snake_case(string):
+    return "_".join(w.lower() for w in split_words(string))
+
+
+def to_kebab_case(string):
+    return "-".join(w.lower() for w in split_words(string))
+
+
+KEY_CASE_CONVERSIONS: Dict[str, Callable[[str], str]] = {
+    "camel": snake_case_to_camel_case,
+    "pascal": snake_case_to_pascal_case,
+    "snake": to_snake_case,
+    "kebab": to_kebab_case,
+}
+
+
+# The generator's schema_key_case, and so the key case the runtime helpers
+# (validators, decoding, serializers) expect by default.
+DEFAULT_KEY_CASE = "camel"
+
+
+class KeyCaseConverter:
+    """Key conversion with a bounded memo.
+
+    Specs reuse the same few thousand property names over and over, so the
+    conversion itself is computed once per distinct key and every further
+    call is a dict lookup.
+    """
+
+    def __init__(self, name: str, maxsize: int = 8192):
+        if name not in KEY_CASE_CONVERSIONS:
+            raise ValueError(f"Unknown key case conversion: {name}")
+        self.name = name
+        self.maxsize = maxsize
+        self._convert = functools.lru_cache(maxsize=maxsize)(
+            KEY_CASE_CONVERSIONS[name]
+        )
+
+    def __call__(self, key):
+        return self._convert(key)
+
+    def __reduce__(self):
+        # The memo is process local; workers rebuild their own.
+        return get_key_converter, (self.name, self.maxsize)
+
+    def cache_info(self):
+        return self._convert.cache_info()
+
+    @property
+    def hit_rate(self) -> float:
+        info = self._convert.cache_info()
+        lookups = info.hits + info.misses
+        return info.hits / lookups if lookups else 0.0
+
+    def info(self) -> Dict[str, Any]:
+        info = self._convert.cache_info()
+        return {
+            "conversion": self.name,
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hit_rate": self.hit_rate,
+        }
+
+    def cache_clear(self) -> None:
+        self._convert.cache_clear()
+
+
+_converters: Dict[tuple, KeyCaseConverter] = {}
+
+
+def register_key_case(name: str, conversion: Callable[[str], str]) -> None:
+    KEY_CASE_CONVERSIONS[name] = conversion
+    for key in [k for k in _converters if k[0] == name]:
+        del _converters[key]
+
+
+def get_key_converter(name: str, maxsize: int = 8192) -> KeyCaseConverter:
+    converter = _converters.get((name, maxsize))
+    if converter is None:
+        converter = _converters[(name, maxsize)] = KeyCaseConverter(name, maxsize)
+    return converter
+
+
+def deep_change_keys_by_format(
+    entity: Union[dict, list, Any], format: Union[Callable, str]
+):
+
+
+    if isinstance(format, str):
+        format = get_key_converter(format)
+
     if isinstance(entity, list):
         return [deep_change_keys_by_format(item, format) for item in entity]
     elif isinstance(entity, dict):
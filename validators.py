@@ -0,0 +1,312 @@
+"""Compiled request validators for AbstractInput subclasses.
+
+Each input class is turned once into generated Python source that checks an
+API Gateway event against the same dataclasses the spec is built from, so a
+call does no reflection at all:
+
+    validate = get_validator(RequestSchema)
+    errors = validate(event)  # [] when the event is valid
+
+Validation follows the generated spec: fields starting with ``_`` are
+ignored, every non-Optional field is required, unions accept any matching
+variant and extra keys are allowed. ``queryStringParameters``,
+``pathParameters`` and ``headers`` arrive as strings, so numbers and booleans
+there are checked by their text form, while the JSON ``body`` (validated
+against ``bodyInput``) is checked by JSON type.
+"""
+
+import base64
+import dataclasses
+import enum
+import functools
+import inspect
+import json
+import typing
+from typing import Any, Callable, Dict, List, Optional, Tuple, get_args, get_origin
+
+from decoding import (
+    EVENT_SECTIONS,
+    SECTION_MODES,
+    WORD_KEY_MODES,
+    is_bool_text,
+    is_optional,
+    is_union,
+    word_key_section,
+)
+from typeinfo import field_types, type_key
+from utils import DEFAULT_KEY_CASE, get_key_converter, word_key
+
+_TYPE_NAMES = {
+    str: "a string",
+    int: "an integer",
+    float: "a number",
+    bool: "a boolean",
+}
+
+_JSON_CHECKS = {
+    str: "isinstance({v}, str)",
+    int: "isinstance({v}, int) and not isinstance({v}, bool)",
+    float: "isinstance({v}, (int, float)) and not isinstance({v}, bool)",
+    bool: "isinstance({v}, bool)",
+}
+
+_TEXT_CHECKS = {
+    str: "isinstance({v}, str)",
+    int: "isinstance({v}, str) and _is_int_text({v})",
+    float: "isinstance({v}, str) and _is_number_text({v})",
+    bool: "_is_bool_text({v})",
+}
+
+Validator = Callable[[Dict[str, Any]], List[str]]
+
+
+class RequestValidationError(ValueError):
+    def __init__(self, errors: List[str]):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def _is_int_text(value: str) -> bool:
+    try:
+        int(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_number_text(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _load_body(event: Dict[str, Any]) -> Any:
+    # An empty body is an absent one, as for decoding.decode_event.
+    body = event.get("body")
+    if isinstance(body, (str, bytes)) and body:
+        if event.get("isBase64Encoded"):
+            body = base64.b64decode(body)
+        return json.loads(body)
+    return body or None
+
+
+class _ValidatorCompiler:
+    def __init__(self, key_format: Optional[Callable[[str], str]]):
+        self.key_format = key_format
+        self.namespace: Dict[str, Any] = {
+            "_is_int_text": _is_int_text,
+            "_is_bool_text": is_bool_text,
+            "_word_key_section": word_key_section,
+            "_is_number_text": _is_number_text,
+            "_load_body": _load_body,
+        }
+        self.blocks: List[List[str]] = []
+        self.functions: Dict[Tuple[Any, str], str] = {}
+
+    def key(self, name: str, mode: str) -> str:
+        if mode in WORD_KEY_MODES:
+            return word_key(name)
+        return self.key_format(name) if self.key_format else name
+
+    def constant(self, value: Any) -> str:
+        name = f"_const{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+    def check(
+        self, tp: Any, value: str, path: str, mode: str, sink: str = "errors"
+    ) -> List[str]:
+        """Lines appending to ``sink`` when ``value`` does not match ``tp``.
+
+        ``value`` and ``path`` are source expressions; an empty result means
+        the type is not checked.
+        """
+        if is_union(tp):
+            args = [a for a in get_args(tp) if a is not type(None)]
+            if len(args) == 1:
+                return self.check(args[0], value, path, mode, sink)
+            return [f"{self.function(tp, mode)}({value}, {path}, {sink})"]
+
+        if dataclasses.is_dataclass(tp):
+            return [f"{self.function(tp, mode)}({value}, {path}, {sink})"]
+
+        if get_origin(tp) in (list, typing.List):
+            (item_type,) = get_args(tp) or (Any,)
+            items = self.check(item_type, "item", f'{path} + "[]"', mode, sink)
+            accepted = "list" if mode == "json" else "(list, str)"
+            lines = [
+                f"if not isinstance({value}, {accepted}):",
+                f'    {sink}.append({path} + ": expected an array")',
+            ]
+            if items:
+                lines.append("else:")
+                if mode == "json":
+                    lines.append(f"    for item in {value}:")
+                else:
+                    # Multi-value parameters may also arrive as one joined
+                    # string, which decode_event splits on commas.
+                    lines.append(
+                        f"    for item in ({value}.split(',') "
+                        f"if isinstance({value}, str) else {value}):"
+                    )
+                lines.extend(f"        {line}" for line in items)
+            return lines
+
+        if inspect.isclass(tp) and issubclass(tp, enum.Enum):
+            values = [e.value for e in tp]
+            allowed = self.constant(frozenset(values))
+            message = f": expected one of {values}"
+            return [
+                f"if {value} not in {allowed}:",
+                f"    {sink}.append({path} + {message!r})",
+            ]
+
+        if mode == "json" and (tp is dict or get_origin(tp) in (dict, typing.Dict)):
+            return [
+                f"if not isinstance({value}, dict):",
+                f'    {sink}.append({path} + ": expected an object")',
+            ]
+
+        checks = _JSON_CHECKS if mode == "json" else _TEXT_CHECKS
+        if tp not in checks:
+            # Types the spec has no precise schema for are not checked.
+            return []
+        return [
+            f"if not ({checks[tp].format(v=value)}):",
+            f'    {sink}.append({path} + ": expected {_TYPE_NAMES[tp]}")',
+        ]
+
+    def function(self, tp: Any, mode: str) -> str:
+        """Name of a generated ``(value, path, errors)`` checker for ``tp``."""
+        key = (type_key(tp), mode)
+        if key in self.functions:
+            return self.functions[key]
+        name = f"_check{len(self.functions)}"
+        # Registered before the body is generated so recursive types resolve.
+        self.functions[key] = name
+
+        lines = [f"def {name}(value, path, errors):"]
+        if dataclasses.is_dataclass(tp):
+            lines += [
+                "    if not isinstance(value, dict):",
+                '        errors.append(path + ": expected an object")',
+                "        return",
+            ]
+            for field, field_type in field_types(tp):
+                if field.name.startswith("_"):
+                    continue
+                key = self.key(field.name, mode)
+                lines.append(f"    v = value.get({key!r})")
+                body = self.check(field_type, "v", f'path + ".{key}"', mode)
+                if is_optional(field_type):
+                    if body:
+                        lines.append("    if v is not None:")
+                        lines.extend(f"        {line}" for line in body)
+                    continue
+                lines.append("    if v is None:")
+                lines.append(f'        errors.append(path + ".{key}: is required")')
+                if body:
+                    lines.append("    else:")
+                    lines.extend(f"        {line}" for line in body)
+        else:
+            variants = [a for a in get_args(tp) if a is not type(None)]
+            for variant in variants:
+                body = self.check(variant, "value", "path", mode, sink="sub")
+                if not body:
+                    lines.append("    return")
+                    break
+                lines.append("    sub = []")
+                lines.extend(f"    {line}" for line in body)
+                lines.append("    if not sub:")
+                lines.append("        return")
+            else:
+                names = ", ".join(getattr(v, "__name__", repr(v)) for v in variants)
+                lines.append(
+                    f'    errors.append(path + ": does not match any of {names}")'
+                )
+        self.blocks.append(lines)
+        return name
+
+    def compile_input(self, cls: Any) -> str:
+        name = f"validate_{cls.__name__}"
+        lines = [f"def {name}(event):", "    errors = []"]
+        for field, field_type in field_types(cls):
+            if field.name not in EVENT_SECTIONS:
+                continue
+            mode = SECTION_MODES[field.name]
+            checks = self.section_lines(field.name, field_type, mode)
+            if field.name == "bodyInput":
+                # Invalid JSON is reported with the other sections' errors.
+                lines += [
+                    "    try:",
+                    "        section = _load_body(event)",
+                    "    except ValueError:",
+                    '        errors.append("body: is not valid JSON")',
+                    "    else:",
+                ]
+                lines.extend(f"    {line}" for line in checks or ["    pass"])
+                continue
+            lines.append(f"    section = event.get({EVENT_SECTIONS[field.name]!r})")
+            if mode in WORD_KEY_MODES:
+                lines.append("    section = _word_key_section(section)")
+            lines.extend(checks)
+        lines.append("    return errors")
+        self.blocks.append(lines)
+        return name
+
+    def section_lines(self, name: str, tp: Any, mode: str) -> List[str]:
+        """Lines checking the event section held in ``section``."""
+        body = self.check(tp, "section", repr(name), mode)
+        if is_optional(tp):
+            if not body:
+                return []
+            return ["    if section is not None:", *(f"        {b}" for b in body)]
+        message = f"{name}: is required"
+        lines = ["    if section is None:", f"        errors.append({message!r})"]
+        if body:
+            lines.append("    else:")
+            lines.extend(f"        {line}" for line in body)
+        return lines
+
+    def source(self) -> str:
+        return "\n\n".join("\n".join(block) for block in self.blocks) + "\n"
+
+
+def generate_validator_source(
+    cls: Any, key_case: str | None = DEFAULT_KEY_CASE
+) -> Tuple[str, str, Dict[str, Any]]:
+    """Source, entry point name and globals of the validator for ``cls``."""
+    if not dataclasses.is_dataclass(cls):
+        raise ValueError(f"{cls} is not a dataclass.")
+    compiler = _ValidatorCompiler(get_key_converter(key_case) if key_case else None)
+    entry = compiler.compile_input(cls)
+    return compiler.source(), entry, compiler.namespace
+
+
+def compile_validator(cls: Any, key_case: str | None = DEFAULT_KEY_CASE) -> Validator:
+    source, entry, namespace = generate_validator_source(cls, key_case)
+    filename = f"<validator {cls.__module__}.{cls.__qualname__}>"
+    exec(compile(source, filename, "exec"), namespace)
+    validator = namespace[entry]
+    validator.source = source
+    return validator
+
+
+@functools.lru_cache(maxsize=None)
+def get_validator(cls: Any, key_case: str | None = DEFAULT_KEY_CASE) -> Validator:
+    """Compiled validator for ``cls``, generated on first use.
+
+    ``key_case`` names the conversion (see utils.KEY_CASE_CONVERSIONS) applied
+    to expected keys, matching a spec built with to_camel_case_schemas.
+    """
+    return compile_validator(cls, key_case)
+
+
+def validate_event(
+    cls: Any, event: Dict[str, Any], key_case: str | None = DEFAULT_KEY_CASE
+) -> None:
+    errors = get_validator(cls, key_case)(event)
+    if errors:
+        raise RequestValidationError(errors)
@@ -0,0 +1,411 @@
+import copy
+import dataclasses
+import importlib
+import importlib.util
+import logging
+import os
+import sys
+import time
+import types
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from _tool import OpenApiGenerator, SearchEndpointDeclaration
+from discovery import EndpointDiscovery
+from fragment_cache import iter_referenced_types
+from gen_types import GeneratorConfig, ServiceFragment
+from registry import SOURCE_MARKERS, bound_config, declared_configs
+from schema_cache import clone_schema
+from typeinfo import type_hints
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WatchEntry:
+    config: GeneratorConfig
+    # Module and attribute the config is bound to, when it is a module-level
+    # name; only those configs can be picked up again after a reload.
+    module: Optional[str]
+    attr: Optional[str]
+    fragment: Optional[ServiceFragment] = None
+    # Modules defining any class the endpoint's schema is built from.
+    modules: FrozenSet[str] = frozenset()
+
+
+@dataclass
+class RebuildResult:
+    changed: List[str] = field(default_factory=list)
+    reloaded: List[str] = field(default_factory=list)
+    rebuilt: int = 0
+    seconds: float = 0.0
+
+
+class SpecWatcher:
+    """Keep the generator's output in sync with the endpoint sources.
+
+    The watched files are polled with ``os.stat``. Every endpoint records the
+    modules its config and schema classes come from, so after an edit only
+    the changed modules and the watched modules importing from them are
+    reloaded, and only the endpoints depending on a changed module are
+    reflected again. All fragments are then merged into a fresh copy of the
+    base document and the output is written once the files stop changing.
+
+    ``generator.build_openapi_base()`` must have been called first.
+    """
+
+    def __init__(
+        self,
+        generator: OpenApiGenerator,
+        roots: Optional[Iterable[str]] = None,
+        interval: float = 0.25,
+        settle: float = 0.2,
+        jobs: int | None = 1,
+    ):
+        if generator.openapi_build is None:
+            raise ValueError("OpenAPI build is not initialized.")
+        self.generator = generator
+        self.interval = interval
+        self.settle = settle
+        self.jobs = jobs
+        self.base = copy.deepcopy(generator.openapi_build)
+        self.roots = [os.path.realpath(root) for root in roots or ()]
+        self.entries: List[WatchEntry] = []
+        # module name -> (path, (mtime_ns, size)) for every watched module.
+        self.watched: Dict[str, Tuple[str, Tuple[int, int]]] = {}
+        # The same for scanned modules without an endpoint marker, so a poll
+        # only reads them again once their stat changes.
+        self.unmarked: Dict[str, Tuple[str, Optional[Tuple[int, int]]]] = {}
+        self.builds = 0
+
+    @property
+    def scanning(self) -> bool:
+        return self.generator.search_endpoint_declaration in (
+            SearchEndpointDeclaration.PackageScan,
+            SearchEndpointDeclaration.DirectoryScan,
+        )
+
+    @property
+    def registering(self) -> bool:
+        # Handlers added to a registry module register themselves on reload.
+        return (
+            self.generator.search_endpoint_declaration
+            == SearchEndpointDeclaration.Registry
+        )
+
+    def default_roots(self) -> List[str]:
+        generator = self.generator
+        if generator.scan_directory:
+            return [generator.scan_directory]
+        if generator.scan_package:
+            spec = importlib.util.find_spec(generator.scan_package)
+            if spec is not None and spec.submodule_search_locations:
+                return list(spec.submodule_search_locations)
+            if spec is not None and spec.origin:
+                return [os.path.dirname(spec.origin)]
+        return [
+            os.path.dirname(path)
+            for path in (self.module_path(e.module) for e in self.entries)
+            if path
+        ]
+
+    def in_roots(self, path: Optional[str]) -> bool:
+        if not path:
+            return False
+        path = os.path.realpath(path)
+        return any(path.startswith(root + os.sep) for root in self.roots)
+
+    @staticmethod
+    def module_path(name: Optional[str]) -> Optional[str]:
+        module = sys.modules.get(name) if name else None
+        return getattr(module, "__file__", None)
+
+    @staticmethod
+    def stat_key(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def module_configs(name: str) -> List[Tuple[str, GeneratorConfig]]:
+        module = sys.modules.get(name)
+        return declared_configs(module) if module is not None else []
+
+    @staticmethod
+    def find_binding(config: GeneratorConfig) -> Tuple[Optional[str], Optional[str]]:
+        for cls in (config.serviceInput, config.serviceOutput):
+            module = sys.modules.get(getattr(cls, "__module__", None))
+            for attr, value in vars(module or types.SimpleNamespace()).items():
+                if bound_config(value) is config:
+                    return module.__name__, attr
+        for name, module in list(sys.modules.items()):
+            for attr, value in list(vars(module).items()):
+                if bound_config(value) is config:
+                    return name, attr
+        return None, None
+
+    def make_entry(
+        self, config: GeneratorConfig, module: Optional[str], attr: Optional[str]
+    ) -> WatchEntry:
+        modules = {
+            cls.__module__
+            for root in (config.serviceInput, config.serviceOutput)
+            for cls in iter_referenced_types(root)
+        }
+        if module:
+            modules.add(module)
+        return WatchEntry(config, module, attr, modules=frozenset(modules))
+
+    def refresh_watched(self) -> None:
+        names = {name for entry in self.entries for name in entry.modules}
+        watched = {}
+        for name in names:
+            path = self.module_path(name)
+            if self.in_roots(path):
+                previous = self.watched.get(name)
+                if previous is not None and previous[0] == path:
+                    watched[name] = previous
+                else:
+                    watched[name] = (path, self.stat_key(path))
+        self.watched = watched
+
+    def scan_modules(self) -> Dict[str, str]:
+        generator = self.generator
+        discovery = EndpointDiscovery(exclude=generator.scan_exclude)
+        if generator.scan_package:
+            return dict(discovery.iter_package_modules(generator.scan_package))
+        return dict(discovery.iter_directory_modules(generator.scan_directory))
+
+    def start(self) -> RebuildResult:
+        """Build everything once and record what every endpoint depends on."""
+        start = time.perf_counter()
+        generator = self.generator
+        configs = generator.get_endpoint_configs()
+        self.entries = [self.make_entry(c, *self.find_binding(c)) for c in configs]
+        fragments = generator.build_fragments(configs, self.jobs)
+        for entry, fragment in zip(self.entries, fragments):
+            entry.fragment = fragment
+        if not self.roots:
+            self.roots = [os.path.realpath(root) for root in self.default_roots()]
+        self.refresh_watched()
+        self.assemble()
+        seconds = time.perf_counter() - start
+        return RebuildResult(rebuilt=len(fragments), seconds=seconds)
+
+    def poll(self) -> Set[str]:
+        """Names of watched modules whose file changed since the last poll."""
+        changed = set()
+        for name, (path, key) in self.watched.items():
+            current = self.stat_key(path)
+            if current != key:
+                self.watched[name] = (path, current)
+                changed.add(name)
+        if self.scanning:
+            changed |= self.poll_new_modules()
+        return changed
+
+    def poll_new_modules(self) -> Set[str]:
+        """Scanned modules that gained an endpoint marker since the last poll.
+
+        Modules without one are read again only when their stat changed.
+        """
+        known = {e.module for e in self.entries}
+        unmarked = {}
+        changed = set()
+        for name, path in self.scan_modules().items():
+            if name in self.watched or name in known:
+                continue
+            key = self.stat_key(path)
+            if self.unmarked.get(name) == (path, key):
+                unmarked[name] = (path, key)
+                continue
+            try:
+                with open(path, "rb") as f:
+                    source = f.read()
+            except OSError:
+                continue
+            if not any(m.encode() in source for m in SOURCE_MARKERS):
+                unmarked[name] = (path, key)
+                continue
+            self.watched[name] = (path, key)
+            changed.add(name)
+        # Deleted modules drop out here.
+        self.unmarked = unmarked
+        return changed
+
+    def import_edges(self, names: Set[str]) -> Dict[str, Set[str]]:
+        """For each watched module, the watched modules it imports from."""
+        edges = {}
+        for name in names:
+            module = sys.modules.get(name)
+            deps = set()
+            for value in vars(module or types.SimpleNamespace()).values():
+                if isinstance(value, types.ModuleType):
+                    dep = value.__name__
+                else:
+                    dep = getattr(value, "__module__", None)
+                if dep in names and dep != name:
+                    deps.add(dep)
+            edges[name] = deps
+        return edges
+
+    def reload_order(self, changed: Set[str]) -> List[str]:
+        names = set(self.watched) | changed
+        edges = self.import_edges(names)
+        dependents: Dict[str, Set[str]] = {name: set() for name in names}
+        for name, deps in edges.items():
+            for dep in deps:
+                dependents[dep].add(name)
+
+        affected, pending = set(changed), list(changed)
+        while pending:
+            for dependent in dependents.get(pending.pop(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    pending.append(dependent)
+
+        # Dependencies first, so a dependent re-imports the fresh classes.
+        order, done = [], set()
+
+        def visit(name: str, trail: Set[str]) -> None:
+            if name in done or name in trail:
+                return
+            trail.add(name)
+            for dep in sorted(edges.get(name, ())):
+                if dep in affected:
+                    visit(dep, trail)
+            done.add(name)
+            order.append(name)
+
+        for name in sorted(affected):
+            visit(name, set())
+        return order
+
+    def reload(self, names: List[str]) -> List[str]:
+        reloaded = []
+        for name in names:
+            self.generator.resolver_cache.invalidate_module(name)
+            type_hints.invalidate_module(name)
+            module = sys.modules.get(name)
+            try:
+                if module is None:
+                    importlib.import_module(name)
+                else:
+                    importlib.reload(module)
+            except Exception:
+                logger.exception("Reloading %s failed; keeping the old version", name)
+                continue
+            reloaded.append(name)
+        return reloaded
+
+    def rebuild(self, changed: Set[str]) -> RebuildResult:
+        start = time.perf_counter()
+        result = RebuildResult(changed=sorted(changed))
+        result.reloaded = self.reload(self.reload_order(changed))
+        reloaded = set(result.reloaded)
+
+        entries: List[WatchEntry] = []
+        replaced: Set[str] = set()
+        for entry in self.entries:
+            if entry.module in reloaded:
+                if entry.module not in replaced:
+                    replaced.add(entry.module)
+                    entries.extend(self.rebind(entry.module, changed))
+                continue
+            entries.append(entry)
+        if self.scanning:
+            # New endpoint modules only join the spec when scanning for them.
+            for name in sorted(reloaded - replaced):
+                entries.extend(self.rebind(name, changed))
+        if self.scanning:
+            order = {name: idx for idx, name in enumerate(sorted(self.scan_modules()))}
+            entries = [e for e in entries if e.module in order]
+            entries.sort(key=lambda e: order[e.module])
+
+        stale = [
+            entry
+            for entry in entries
+            if entry.fragment is None or entry.modules & changed
+        ]
+        fragments = OpenApiGenerator.build_service_fragments(
+            [entry.config for entry in stale],
+            self.jobs,
+            self.generator.schema_key_format(),
+        )
+        for entry, fragment in zip(stale, fragments):
+            entry.fragment = fragment
+        result.rebuilt = len(stale)
+
+        self.entries = entries
+        self.refresh_watched()
+        self.assemble()
+        result.seconds = time.perf_counter() - start
+        logger.info(
+            "Rebuilt %d endpoints after changes to %s in %.1f ms",
+            result.rebuilt,
+            ", ".join(result.changed),
+            result.seconds * 1000,
+        )
+        return result
+
+    def rebind(self, module: str, changed: Set[str]) -> List[WatchEntry]:
+        """Entries for the configs a reloaded module now defines.
+
+        Without scanning or a registry, only the configs the generator was
+        given are kept.
+        Fragments of unchanged modules are reused, matched by attribute name.
+        """
+        previous = {e.attr: e for e in self.entries if e.module == module}
+        entries = []
+        for attr, config in self.module_configs(module):
+            if not (self.scanning or self.registering) and attr not in previous:
+                continue
+            entry = self.make_entry(config, module, attr)
+            if attr in previous and not entry.modules & changed:
+                entry.fragment = previous[attr].fragment
+            entries.append(entry)
+        return entries
+
+    def assemble(self) -> None:
+        generator = self.generator
+        generator.endpoint_config = [entry.config for entry in self.entries]
+        generator.openapi_build = copy.deepcopy(self.base)
+        for entry in self.entries:
+            fragment = entry.fragment
+            if generator.dedup_schemas:
+                # Deduplication rewrites $refs in place; keep fragments intact.
+                fragment = ServiceFragment(
+                    **clone_schema(dataclasses.asdict(fragment))
+                )
+            generator.merge_service_fragment(fragment)
+        if generator.dedup_schemas:
+            generator.deduplicate()
+        if generator.compact_output:
+            generator.compact()
+        generator.write_output()
+        self.builds += 1
+
+    def run(self, max_builds: Optional[int] = None) -> None:
+        """Poll until interrupted, or until ``max_builds`` rebuilds were made."""
+        self.start()
+        logger.info(
+            "Watching %d modules under %s", len(self.watched), ", ".join(self.roots)
+        )
+        pending: Set[str] = set()
+        last_change = 0.0
+        try:
+            while max_builds is None or self.builds <= max_builds:
+                changed = self.poll()
+                now = time.monotonic()
+                if changed:
+                    pending |= changed
+                    last_change = now
+                elif pending and now - last_change >= self.settle:
+                    self.rebuild(pending)
+                    pending = set()
+                    continue
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            pass
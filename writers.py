@@ -0,0 +1,137 @@
+import json
+from typing import Any, Dict, FrozenSet, Tuple
+
+import yaml
+from yaml.events import (
+    DocumentEndEvent,
+    DocumentStartEvent,
+    MappingEndEvent,
+    MappingStartEvent,
+    ScalarEvent,
+    SequenceEndEvent,
+    SequenceStartEvent,
+)
+from yaml.nodes import MappingNode, ScalarNode, SequenceNode
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+MAPPING_TAG = yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG
+
+YAML_OPTIONS = {"sort_keys": False, "allow_unicode": True, "indent": 2}
+
+# Flow style on one line: no indentation, which is most of a block-style
+# document's size.
+COMPACT_YAML_OPTIONS = {**YAML_OPTIONS, "default_flow_style": True, "width": 1 << 30}
+
+# Mappings whose entries are represented and emitted one at a time by
+# stream_yaml; everything below them is represented as a whole.
+STREAMED_SECTIONS: FrozenSet[Tuple[str, ...]] = frozenset(
+    {
+        (),
+        ("paths",),
+        ("components",),
+        ("components", "schemas"),
+        ("components", "parameters"),
+        ("components", "responses"),
+    }
+)
+
+
+def yaml_dumper(prefer_c: bool = True) -> type:
+    """Return the libyaml backed dumper when PyYAML was built with it."""
+    if prefer_c and getattr(yaml, "__with_libyaml__", False):
+        return yaml.CDumper
+    return yaml.Dumper
+
+
+def dump_yaml(tree: Dict[str, Any], stream, compact: bool = False) -> None:
+    yaml.dump(tree, stream, **(COMPACT_YAML_OPTIONS if compact else YAML_OPTIONS))
+
+
+def dump_json(tree: Dict[str, Any], stream, pretty: bool = False) -> None:
+    """Write ``tree`` as JSON with keys sorted at every level.
+
+    Sorting makes the document independent of endpoint discovery order, so
+    diffs between builds only show real changes. The C encoder is used to
+    build the text in one call, which is much faster than ``json.dump``'s
+    chunked Python path.
+    """
+    if pretty:
+        text = json.dumps(tree, sort_keys=True, ensure_ascii=False, indent=2)
+    else:
+        text = json.dumps(
+            tree, sort_keys=True, ensure_ascii=False, separators=(",", ":")
+        )
+    stream.write(text)
+    stream.write("\n")
+
+
+def _emit_node(dumper, node) -> None:
+    if isinstance(node, ScalarNode):
+        detected_tag = dumper.resolve(ScalarNode, node.value, (True, False))
+        default_tag = dumper.resolve(ScalarNode, node.value, (False, True))
+        implicit = (node.tag == detected_tag), (node.tag == default_tag)
+        dumper.emit(ScalarEvent(None, node.tag, implicit, node.value, style=node.style))
+    elif isinstance(node, SequenceNode):
+        implicit = node.tag == dumper.resolve(SequenceNode, node.value, True)
+        dumper.emit(
+            SequenceStartEvent(None, node.tag, implicit, flow_style=node.flow_style)
+        )
+        for item in node.value:
+            _emit_node(dumper, item)
+        dumper.emit(SequenceEndEvent())
+    elif isinstance(node, MappingNode):
+        implicit = node.tag == dumper.resolve(MappingNode, node.value, True)
+        dumper.emit(
+            MappingStartEvent(None, node.tag, implicit, flow_style=node.flow_style)
+        )
+        for key, value in node.value:
+            _emit_node(dumper, key)
+            _emit_node(dumper, value)
+        dumper.emit(MappingEndEvent())
+
+
+def _emit_data(dumper, data: Any) -> None:
+    node = dumper.represent_data(data)
+    # Forget what was represented so the node graph of one section can be
+    # released before the next one is built.
+    dumper.represented_objects = {}
+    dumper.object_keeper = []
+    dumper.alias_key = None
+    _emit_node(dumper, node)
+
+
+def _emit_mapping(
+    dumper, mapping: Dict[Any, Any], path: Tuple[str, ...], flow: bool = False
+) -> None:
+    dumper.emit(MappingStartEvent(None, MAPPING_TAG, True, flow_style=flow))
+    for key, value in mapping.items():
+        _emit_data(dumper, key)
+        child_path = path + (key,)
+        if isinstance(value, dict) and child_path in STREAMED_SECTIONS:
+            _emit_mapping(dumper, value, child_path, flow)
+        else:
+            _emit_data(dumper, value)
+    dumper.emit(MappingEndEvent())
+
+
+def stream_yaml(
+    tree: Dict[str, Any], stream, prefer_c: bool = True, compact: bool = False
+) -> None:
+    """Write ``tree`` section by section instead of as one document graph.
+
+    ``yaml.dump`` first represents the whole tree as nodes and only then
+    serializes it; here every path, component and top-level section is
+    represented, emitted and dropped in turn, so the emitter writes to
+    ``stream`` while the rest of the document is still pending.
+    """
+    options = COMPACT_YAML_OPTIONS if compact else YAML_OPTIONS
+    dumper = yaml_dumper(prefer_c)(stream, **options)
+    try:
+        dumper.open()
+        dumper.emit(DocumentStartEvent(explicit=False))
+        _emit_mapping(dumper, tree, (), flow=compact)
+        dumper.emit(DocumentEndEvent(explicit=False))
+        dumper.close()
+    finally:
+        dumper.dispose()